@@ -0,0 +1,74 @@
+"""
+Compare stdlib json and orjson encoding of a store listing payload, as
+produced by `ArtworkOutputSchema` for `GET /store/artworks`.
+
+Usage:
+    python -m benchmarks.json_encoding [--artworks 1000] [--repeat 50]
+"""
+import argparse
+import random
+import time
+
+from src.app.utils.representations import dumps_orjson, dumps_stdlib, orjson
+
+
+def build_payload(artworks, seed=42):
+    rng = random.Random(seed)
+    data = []
+    for i in range(artworks):
+        data.append({
+            'id': i + 1,
+            'title': f'Artwork {i}',
+            'price': round(rng.uniform(10, 5000), 2),
+            'price_base': round(rng.uniform(10, 5000), 2),
+            'stock': rng.randrange(10),
+            'description': 'Oil on canvas. ' * rng.randrange(1, 20),
+            'image_path': f'/uploads/{i}.jpg',
+            'category': {'id': rng.randrange(20), 'title': 'Painting'},
+            'tags': [
+                {'id': t, 'title': f'tag{t}'}
+                for t in rng.sample(range(100), rng.randrange(1, 6))],
+            'currency': {
+                'id': 1, 'title': 'Euro', 'code': 'EUR', 'symbol': '€'},
+            'artist': {
+                'id': rng.randrange(500), 'name': 'Jane Doe',
+                'email': 'jane@example.com'},
+            'upvotes': rng.randrange(1000),
+            'comments_count': rng.randrange(100),
+        })
+    return {'status': 'success', 'data': data, 'next_cursor': None}
+
+
+def time_encoder(dumps, payload, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        body = dumps(payload)
+    return (time.perf_counter() - start) / repeat, len(body)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--artworks', type=int, default=1_000)
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+
+    payload = build_payload(args.artworks)
+    results = {}
+    encoders = [('stdlib', dumps_stdlib)]
+    if orjson is not None:
+        encoders.append(('orjson', dumps_orjson))
+    else:
+        print("orjson is not installed, only timing the stdlib encoder")
+    for name, dumps in encoders:
+        results[name], size = time_encoder(dumps, payload, args.repeat)
+        print(
+            f"{name:>8}: {results[name] * 1e3:8.2f} ms/response, "
+            f"{size / 2**10:7.1f} KiB")
+
+    if 'orjson' in results:
+        print(f"speedup: {results['stdlib'] / results['orjson']:.1f}x "
+              f"({args.artworks:,} artworks)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+"""
+Measure /auth/login throughput while other threads keep reading
+/store/artworks, with bcrypt running inline on the request threads versus
+in the worker process pool.
+
+Usage:
+    python -m benchmarks.login_throughput [--seconds 5] [--login-threads 4]
+        [--read-threads 4] [--rounds 12]
+"""
+import argparse
+import os
+import tempfile
+import threading
+import time
+
+from src.app import create_app, db
+from src.app.models import Artwork, Category, User
+from src.config import Config
+
+
+def build_app(tmp, workers, rounds):
+    class BenchmarkConfig(Config):
+        SQLALCHEMY_DATABASE_URI = 'sqlite:///' + os.path.join(
+            tmp, f'bench-{workers}.db')
+        BCRYPT_LOG_ROUNDS = rounds
+        PASSWORD_HASH_WORKERS = workers
+        PASSWORD_HASH_MAX_PENDING = 1024
+        TOKEN_BLOCKLIST_PRUNE_INTERVAL = 0
+
+    app = create_app(BenchmarkConfig)
+    with app.app_context():
+        user = User(name='bench', email='bench@example.com', role_id=2)
+        user.set_password('password')
+        category = Category(title='Bench')
+        db.session.add_all([user, category])
+        db.session.flush()
+        db.session.add_all([
+            Artwork(title=f'Artwork {i}', price=10.0, currency_id=1,
+                    stock=1, artist_id=user.id, category_id=category.id)
+            for i in range(50)])
+        db.session.commit()
+    return app
+
+
+def run(app, seconds, login_threads, read_threads):
+    counts = {'login': 0, 'read': 0}
+    lock = threading.Lock()
+    deadline = time.monotonic() + seconds
+
+    def worker(kind):
+        client = app.test_client()
+        done = 0
+        while time.monotonic() < deadline:
+            if kind == 'login':
+                response = client.post('/auth/login', json={
+                    'email': 'bench@example.com', 'password': 'password'})
+            else:
+                response = client.get('/store/artworks')
+            assert response.status_code == 200, response.status_code
+            done += 1
+        with lock:
+            counts[kind] += done
+
+    threads = (
+        [threading.Thread(target=worker, args=('login',))
+         for _ in range(login_threads)]
+        + [threading.Thread(target=worker, args=('read',))
+           for _ in range(read_threads)])
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return {kind: n / seconds for kind, n in counts.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--seconds', type=float, default=5)
+    parser.add_argument('--login-threads', type=int, default=4)
+    parser.add_argument('--read-threads', type=int, default=4)
+    parser.add_argument('--rounds', type=int, default=12)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for label, workers in (('inline', 0), ('pool', args.workers)):
+            app = build_app(tmp, workers, args.rounds)
+            rates = run(
+                app, args.seconds, args.login_threads, args.read_threads)
+            print(
+                f"{label:>6} ({workers} workers): "
+                f"{rates['login']:7.1f} logins/s, "
+                f"{rates['read']:7.1f} /store/artworks reads/s")
+
+
+if __name__ == '__main__':
+    main()
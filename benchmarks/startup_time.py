@@ -0,0 +1,60 @@
+"""
+Measure how long a fresh process takes to import the app and run
+`create_app` against an up-to-date SQLite database, for each DB_INIT_MODE.
+
+Every run starts a new interpreter, as a web worker would, so import time
+is included.
+
+Usage:
+    python -m benchmarks.startup_time [--repeat 10]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+# Run in the child process; prints the startup time in milliseconds
+CHILD = """
+import time
+start = time.perf_counter()
+from src.app import create_app
+create_app()
+print((time.perf_counter() - start) * 1000)
+"""
+
+
+def measure(env, repeat):
+    timings = []
+    for _ in range(repeat):
+        output = subprocess.run(
+            [sys.executable, '-c', CHILD], env=env, check=True,
+            capture_output=True, text=True).stdout
+        timings.append(float(output.split()[-1]))
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(
+            os.environ,
+            DATABASE_URL='sqlite:///' + os.path.join(tmp, 'startup.db'),
+            TOKEN_BLOCKLIST_PRUNE_INTERVAL='0',
+            HOT_SCORE_DECAY_INTERVAL='0',
+            MAIL_OUTBOX_INTERVAL='0')
+        # The first start creates the tables and stamps the latest revision
+        measure(dict(env, DB_INIT_MODE='auto'), 1)
+        for mode in ('create', 'auto', 'none'):
+            timings = measure(dict(env, DB_INIT_MODE=mode), args.repeat)
+            print(
+                f"{mode:>6}: median {statistics.median(timings):6.1f} ms, "
+                f"min {min(timings):6.1f} ms over {args.repeat} starts")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+"""
+Compare per-target upvote COUNT latency between the legacy `upvote` layout
+(VARCHAR target_type, primary key leading with user_id) and the current one
+(SMALLINT target_type, `ix_upvote_target` index leading with the target).
+
+Usage:
+    python -m benchmarks.upvote_count [--rows 1000000] [--lookups 2000]
+"""
+import argparse
+import os
+import random
+import sqlite3
+import tempfile
+import time
+
+LEGACY_SCHEMA = """
+CREATE TABLE upvote (
+    user_id INTEGER NOT NULL,
+    created_at DATETIME,
+    target_type VARCHAR(20) NOT NULL,
+    target_id INTEGER NOT NULL,
+    PRIMARY KEY (user_id, target_type, target_id)
+)
+"""
+COMPACT_SCHEMA = """
+CREATE TABLE upvote (
+    user_id INTEGER NOT NULL,
+    created_at DATETIME,
+    target_type SMALLINT NOT NULL,
+    target_id INTEGER NOT NULL,
+    PRIMARY KEY (user_id, target_type, target_id)
+);
+CREATE INDEX ix_upvote_target ON upvote (target_type, target_id, created_at);
+"""
+COUNT_QUERY = (
+    "SELECT COUNT(*) FROM upvote WHERE target_type = ? AND target_id = ?")
+
+
+def generate_rows(rows, targets, seed=42):
+    rng = random.Random(seed)
+    seen = set()
+    while len(seen) < rows:
+        key = (
+            rng.randrange(rows // 10 + 1),
+            rng.choice(('artwork', 'comment')),
+            rng.randrange(targets))
+        if key not in seen:
+            seen.add(key)
+            yield key
+
+
+def build_database(path, schema, rows, encode):
+    conn = sqlite3.connect(path)
+    conn.executescript(schema)
+    conn.executemany(
+        "INSERT INTO upvote (user_id, created_at, target_type, target_id) "
+        "VALUES (?, '2025-01-01 00:00:00', ?, ?)",
+        ((user_id, encode(target_type), target_id)
+         for user_id, target_type, target_id in rows))
+    conn.commit()
+    conn.execute("ANALYZE")
+    return conn
+
+
+def time_counts(conn, lookups, encode):
+    start = time.perf_counter()
+    for target_type, target_id in lookups:
+        conn.execute(COUNT_QUERY, (encode(target_type), target_id)).fetchone()
+    return (time.perf_counter() - start) / len(lookups)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--targets', type=int, default=50_000)
+    parser.add_argument('--lookups', type=int, default=2_000)
+    args = parser.parse_args()
+
+    codes = {'artwork': 1, 'comment': 2}
+    rows = list(generate_rows(args.rows, args.targets))
+    rng = random.Random(7)
+    lookups = [
+        (rng.choice(('artwork', 'comment')), rng.randrange(args.targets))
+        for _ in range(args.lookups)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        results = {}
+        for name, schema, encode in (
+            ('legacy', LEGACY_SCHEMA, lambda t: t),
+            ('compact', COMPACT_SCHEMA, codes.__getitem__),
+        ):
+            path = os.path.join(tmp, f'{name}.db')
+            conn = build_database(path, schema, rows, encode)
+            results[name] = time_counts(conn, lookups, encode)
+            conn.close()
+            print(
+                f"{name:>8}: {results[name] * 1e6:10.1f} us/count, "
+                f"{os.path.getsize(path) / 2**20:7.1f} MiB")
+
+    print(f"speedup: {results['legacy'] / results['compact']:.1f}x "
+          f"({args.rows:,} upvote rows)")
+
+
+if __name__ == '__main__':
+    main()
@@ -45,6 +45,20 @@ target_db = current_app.extensions['migrate'].db
 # ... etc.
 
 
+# The FTS5 search index (see `src.app.models.search`) and its shadow tables
+# are created by a migration and not described by the models
+SEARCH_INDEX_TABLES = {
+    'artwork_search', 'artwork_search_data', 'artwork_search_idx',
+    'artwork_search_content', 'artwork_search_docsize',
+    'artwork_search_config',
+}
+
+
+def include_object(object, name, type_, reflected, compare_to):
+    """Keep autogenerate from dropping the search index tables."""
+    return not (type_ == 'table' and name in SEARCH_INDEX_TABLES)
+
+
 def get_metadata():
     if hasattr(target_db, 'metadatas'):
         return target_db.metadatas[None]
@@ -65,7 +79,8 @@ def run_migrations_offline():
     """
     url = config.get_main_option("sqlalchemy.url")
     context.configure(
-        url=url, target_metadata=get_metadata(), literal_binds=True
+        url=url, target_metadata=get_metadata(), literal_binds=True,
+        include_object=include_object
     )
 
     with context.begin_transaction():
@@ -93,6 +108,7 @@ def run_migrations_online():
     conf_args = current_app.extensions['migrate'].configure_args
     if conf_args.get("process_revision_directives") is None:
         conf_args["process_revision_directives"] = process_revision_directives
+    conf_args.setdefault("include_object", include_object)
 
     connectable = get_engine()
 
@@ -0,0 +1,51 @@
+"""Add the artwork_search FTS5 index
+
+Revision ID: 0b5d9e2c4a71
+Revises: f2c6a8d1b953
+Create Date: 2026-10-18 16:22:50.318064
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0b5d9e2c4a71'
+down_revision = 'f2c6a8d1b953'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # FTS5 only exists on SQLite; other databases have no search index
+    connection = op.get_bind()
+    if connection.dialect.name != 'sqlite':
+        return
+    # Already created along with the other tables by `db.create_all()`
+    exists = connection.execute(sa.text(
+        "SELECT 1 FROM sqlite_master WHERE name = 'artwork_search'")).first()
+    if exists:
+        return
+    # The DDL is inlined so this revision does not depend on app code
+    op.execute(
+        "CREATE VIRTUAL TABLE artwork_search USING fts5("
+        "title, description, tags, category, "
+        "tokenize = 'unicode61 remove_diacritics 2')")
+    op.execute(
+        "INSERT INTO artwork_search "
+        "(rowid, title, description, tags, category) "
+        "SELECT artwork.id, artwork.title, artwork.description, "
+        "COALESCE(GROUP_CONCAT(tag.title, ' '), ''), category.title "
+        "FROM artwork "
+        "LEFT JOIN category ON category.id = artwork.category_id "
+        "LEFT JOIN artwork_tags ON artwork_tags.artwork_id = artwork.id "
+        "LEFT JOIN tag ON tag.id = artwork_tags.tag_id "
+        "GROUP BY artwork.id")
+    op.execute(
+        "INSERT INTO artwork_search (artwork_search) VALUES ('optimize')")
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    op.execute("DROP TABLE IF EXISTS artwork_search")
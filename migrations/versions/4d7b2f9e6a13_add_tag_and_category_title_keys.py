@@ -0,0 +1,89 @@
+"""Add normalized title_key to tag and category
+
+Revision ID: 4d7b2f9e6a13
+Revises: c3e7a9d15f40
+Create Date: 2026-10-18 19:26:35.114870
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4d7b2f9e6a13'
+down_revision = 'c3e7a9d15f40'
+branch_labels = None
+depends_on = None
+
+
+def normalize_title(title):
+    # Copy of `src.app.models.art.normalize_title` as of this revision
+    return title.strip().casefold()
+
+
+def merge_duplicates(connection, table, duplicates):
+    """
+    Point the references to the `duplicates` rows of `table` (a mapping
+    of removed ID to kept ID) at the kept rows, then delete them.
+    """
+    artwork_tags = sa.table(
+        'artwork_tags', sa.column('artwork_id', sa.Integer),
+        sa.column('tag_id', sa.Integer))
+    artwork = sa.table(
+        'artwork', sa.column('id', sa.Integer),
+        sa.column('category_id', sa.Integer))
+    rows = sa.table(table, sa.column('id', sa.Integer))
+    for removed, kept in duplicates.items():
+        if table == 'tag':
+            # Artworks tagged with both keep a single link
+            tagged = sa.select(artwork_tags.c.artwork_id).where(
+                artwork_tags.c.tag_id == kept).scalar_subquery()
+            connection.execute(artwork_tags.delete().where(
+                artwork_tags.c.tag_id == removed,
+                artwork_tags.c.artwork_id.in_(tagged)))
+            connection.execute(
+                artwork_tags.update()
+                .where(artwork_tags.c.tag_id == removed)
+                .values(tag_id=kept))
+        else:
+            connection.execute(
+                artwork.update()
+                .where(artwork.c.category_id == removed)
+                .values(category_id=kept))
+        connection.execute(rows.delete().where(rows.c.id == removed))
+
+
+def upgrade():
+    connection = op.get_bind()
+    for table in ('category', 'tag'):
+        op.add_column(table, sa.Column('title_key', sa.String(length=255), nullable=True))
+        # Filled in Python: SQL TRIM/LOWER only handle spaces and ASCII, so
+        # they would disagree with the keys the app looks up
+        rows = sa.table(
+            table, sa.column('id', sa.Integer),
+            sa.column('title', sa.String), sa.column('title_key', sa.String))
+        kept, duplicates = {}, {}
+        for id, title in connection.execute(
+                sa.select(rows.c.id, rows.c.title).order_by(rows.c.id)):
+            key = normalize_title(title)
+            if key in kept:
+                duplicates[id] = kept[key][0]
+            else:
+                kept[key] = (id, title)
+        # Titles differing only by case or surrounding spaces were distinct
+        # rows before; the oldest one is kept
+        merge_duplicates(connection, table, duplicates)
+        for key, (id, title) in kept.items():
+            connection.execute(
+                rows.update().where(rows.c.id == id).values(
+                    title=title.strip(), title_key=key))
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.alter_column('title_key', existing_type=sa.String(length=255), nullable=False)
+            batch_op.create_unique_constraint(f'uq_{table}_title_key', ['title_key'])
+
+
+def downgrade():
+    for table in ('tag', 'category'):
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.drop_constraint(f'uq_{table}_title_key', type_='unique')
+            batch_op.drop_column('title_key')
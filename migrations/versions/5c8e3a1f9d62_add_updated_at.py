@@ -0,0 +1,35 @@
+"""Add updated_at to artwork and comment
+
+Revision ID: 5c8e3a1f9d62
+Revises: d41e6b9f2a07
+Create Date: 2026-10-18 13:05:44.270615
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5c8e3a1f9d62'
+down_revision = 'd41e6b9f2a07'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('artwork', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('updated_at', sa.DateTime(), nullable=True))
+
+    with op.batch_alter_table('comment', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('updated_at', sa.DateTime(), nullable=True))
+
+    op.execute("UPDATE artwork SET updated_at = created_at")
+    op.execute("UPDATE comment SET updated_at = created_at")
+
+
+def downgrade():
+    with op.batch_alter_table('comment', schema=None) as batch_op:
+        batch_op.drop_column('updated_at')
+
+    with op.batch_alter_table('artwork', schema=None) as batch_op:
+        batch_op.drop_column('updated_at')
@@ -0,0 +1,41 @@
+"""Add denormalized upvote_count to artwork and comment
+
+Revision ID: 8b27d4e0c5a1
+Revises: 3f9a1c2d7b4e
+Create Date: 2026-10-18 11:02:47.519302
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8b27d4e0c5a1'
+down_revision = '3f9a1c2d7b4e'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('artwork', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('upvote_count', sa.Integer(), server_default='0', nullable=False))
+
+    with op.batch_alter_table('comment', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('upvote_count', sa.Integer(), server_default='0', nullable=False))
+
+    # Backfill the counters from the existing upvotes
+    for table in ('artwork', 'comment'):
+        op.execute(
+            f"UPDATE {table} SET upvote_count = ("
+            f"SELECT COUNT(*) FROM upvote "
+            f"WHERE upvote.target_type = '{table}' "
+            f"AND upvote.target_id = {table}.id)"
+        )
+
+
+def downgrade():
+    with op.batch_alter_table('comment', schema=None) as batch_op:
+        batch_op.drop_column('upvote_count')
+
+    with op.batch_alter_table('artwork', schema=None) as batch_op:
+        batch_op.drop_column('upvote_count')
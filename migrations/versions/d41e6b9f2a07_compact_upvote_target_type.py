@@ -0,0 +1,61 @@
+"""Store upvote target_type as a small integer and index by target
+
+Revision ID: d41e6b9f2a07
+Revises: 8b27d4e0c5a1
+Create Date: 2026-10-18 12:20:05.881940
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd41e6b9f2a07'
+down_revision = '8b27d4e0c5a1'
+branch_labels = None
+depends_on = None
+
+# Must match UpvoteTargetType.CODES
+TARGET_TYPE_CODES = {'artwork': 1, 'comment': 2}
+
+
+def _create_upvote_table(name, target_type):
+    op.create_table(name,
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('target_type', target_type, nullable=False),
+    sa.Column('target_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('user_id', 'target_type', 'target_id'),
+    sa.UniqueConstraint('user_id', 'target_type', 'target_id', name='unique_upvote')
+    )
+
+
+def upgrade():
+    _create_upvote_table('upvote_new', sa.SmallInteger())
+    cases = ' '.join(
+        f"WHEN '{name}' THEN {code}"
+        for name, code in TARGET_TYPE_CODES.items())
+    op.execute(
+        "INSERT INTO upvote_new (user_id, created_at, target_type, target_id) "
+        f"SELECT user_id, created_at, CASE target_type {cases} END, target_id "
+        "FROM upvote"
+    )
+    op.drop_table('upvote')
+    op.rename_table('upvote_new', 'upvote')
+    op.create_index('ix_upvote_target', 'upvote', ['target_type', 'target_id', 'created_at'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_upvote_target', table_name='upvote')
+    _create_upvote_table('upvote_old', sa.String(length=20))
+    cases = ' '.join(
+        f"WHEN {code} THEN '{name}'"
+        for name, code in TARGET_TYPE_CODES.items())
+    op.execute(
+        "INSERT INTO upvote_old (user_id, created_at, target_type, target_id) "
+        f"SELECT user_id, created_at, CASE target_type {cases} END, target_id "
+        "FROM upvote"
+    )
+    op.drop_table('upvote')
+    op.rename_table('upvote_old', 'upvote')
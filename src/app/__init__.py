@@ -1,15 +1,11 @@
 from flask import Flask
-from flask_bcrypt import Bcrypt
 from flask_cors import CORS
 from flask_jwt_extended import JWTManager
-from flask_migrate import Migrate
 from flask_sqlalchemy import SQLAlchemy
 
 from src.config import Config
 
 db = SQLAlchemy()
-migrate = Migrate()
-bcrypt = Bcrypt()
 jwt = JWTManager()
 cors = CORS()
 
@@ -25,18 +21,51 @@ def create_app(config_class=Config):
     # Initialize the database
     db.init_app(app)
 
-    # Initialize Flask-Migrate
-    migrate.init_app(app, db)
-
-    # Initialize Flask-Bcrypt
-    bcrypt.init_app(app)
-
     # Initialize Flask-JWT-Extended
     jwt.init_app(app)
 
     # Initialize Flask-CORS
     cors.init_app(app=app, supports_credentials=True)
 
+    # Initialize the bcrypt worker pool
+    from src.app.utils.passwords import PasswordHasher
+    app.extensions['password_hasher'] = PasswordHasher(
+        rounds=app.config['BCRYPT_LOG_ROUNDS'],
+        workers=app.config['PASSWORD_HASH_WORKERS'],
+        max_pending=app.config['PASSWORD_HASH_MAX_PENDING'])
+
+    # Initialize the image variant worker pool
+    from src.app.utils.images import ImageProcessor
+    app.extensions['image_processor'] = ImageProcessor(
+        upload_folder=app.config['UPLOAD_FOLDER'],
+        widths=app.config['IMAGE_VARIANT_WIDTHS'],
+        workers=app.config['IMAGE_WORKERS'])
+
+    # Initialize the transactional email transport (a pooled client reused
+    # by the outbox sender)
+    from src.app.utils.mail_sender import build_mail_transport
+    app.extensions['mail_transport'] = build_mail_transport(app.config)
+
+    # Initialize the reference data (tags, categories, currencies) cache
+    from src.app.utils.cache import TTLCache, build_artwork_cache
+    app.extensions['reference_cache'] = TTLCache(
+        ttl=app.config['REFERENCE_CACHE_TTL'])
+
+    # Initialize the tag and category name to ID cache
+    app.extensions['taxonomy_cache'] = TTLCache(
+        ttl=app.config['REFERENCE_CACHE_TTL'])
+
+    # Initialize the cache of the users' current role and role version
+    app.extensions['role_cache'] = TTLCache(ttl=app.config['ROLE_CACHE_TTL'])
+
+    # Initialize the serialized artwork details cache
+    app.extensions['artwork_cache'] = build_artwork_cache(app.config)
+
+    # Initialize the in-memory copy of the JWT blocklist
+    from src.app.utils.revocation import TokenRevocationCache
+    app.extensions['revocation_cache'] = TokenRevocationCache(
+        refresh_interval=app.config['JWT_REVOCATION_REFRESH_SECONDS'])
+
     # Register blueprints
     from src.app.routes import artist_bp as artist_blueprint
     from src.app.routes import auth_bp as auth_blueprint
@@ -45,13 +74,29 @@ def create_app(config_class=Config):
     app.register_blueprint(artist_blueprint)
     app.register_blueprint(store_blueprint)
 
-    from src.scripts.initialize_currencies import initialize_currencies
-    from src.scripts.initialize_roles import initialize_roles
+    # Register the CLI commands
+    from src.app.cli import register_commands
+    register_commands(app)
+
+    # Create the tables and seed the roles and currencies (DB_INIT_MODE)
+    from src.scripts.initialize_database import initialize_database
+    initialize_database(app, db)
+
+    # Periodically remove the blocklist rows of expired tokens
+    if app.config['TOKEN_BLOCKLIST_PRUNE_INTERVAL']:
+        from src.scripts.prune_token_blocklist import start_blocklist_pruner
+        start_blocklist_pruner(
+            app, db, app.config['TOKEN_BLOCKLIST_PRUNE_INTERVAL'])
+
+    # Periodically re-decay the hot ranking of the artworks
+    if app.config['HOT_SCORE_DECAY_INTERVAL']:
+        from src.scripts.decay_hot_scores import start_hot_score_decayer
+        start_hot_score_decayer(
+            app, db, app.config['HOT_SCORE_DECAY_INTERVAL'])
 
-    # Run the role and currency initialization scripts
-    with app.app_context():
-        db.create_all()
-        initialize_roles(app, db)
-        initialize_currencies(app, db)
+    # Deliver the email outbox in the background
+    if app.config['MAIL_OUTBOX_INTERVAL']:
+        from src.scripts.send_outbox import start_outbox_sender
+        start_outbox_sender(app, db, app.config['MAIL_OUTBOX_INTERVAL'])
 
     return app
@@ -0,0 +1,139 @@
+import click
+from flask.cli import AppGroup
+
+
+class AppCommands(AppGroup):
+    """
+    The `flask` commands of the app. Flask-Migrate, which imports alembic,
+    is only set up once its `flask db` commands are looked up, so starting
+    the app (e.g. in each web worker) does not pay for the import.
+    """
+
+    def __init__(self, app, db, **kwargs):
+        super().__init__(name=app.name, **kwargs)
+        self._app = app
+        self._db = db
+
+    def get_command(self, ctx, name):
+        if name == 'db' and name not in self.commands:
+            from flask_migrate import Migrate
+            # Registers the `db` group on this group
+            Migrate(self._app, self._db,
+                    directory=self._app.config['MIGRATIONS_DIR'])
+        return super().get_command(ctx, name)
+
+    def list_commands(self, ctx):
+        return sorted(set(super().list_commands(ctx)) | {'db'})
+
+
+def register_commands(app):
+    """Register the application's `flask` CLI commands."""
+    from src.app import db
+
+    commands = AppCommands(app, db)
+    commands.commands.update(app.cli.commands)
+    app.cli = commands
+
+    @app.cli.command('init-db')
+    def init_db():
+        """Create the missing tables and seed the roles and currencies."""
+        from src.scripts.initialize_database import initialize_database
+        initialize_database(app, db, mode='auto')
+
+    @app.cli.command('reconcile-upvotes')
+    def reconcile_upvotes():
+        """Recompute drifted artwork and comment upvote counters."""
+        from src.scripts.reconcile_upvotes import reconcile_upvote_counts
+        reconcile_upvote_counts(app, db)
+
+    @app.cli.command('prune-blocklist')
+    @click.option(
+        '--batch-size', default=1000, show_default=True,
+        help='Rows deleted per transaction.')
+    def prune_blocklist(batch_size):
+        """Delete the blocklist rows of expired tokens."""
+        from src.scripts.prune_token_blocklist import prune_token_blocklist
+        prune_token_blocklist(app, db, batch_size=batch_size)
+
+    @app.cli.command('decay-hot-scores')
+    def decay_hot_scores_command():
+        """Recompute the hot ranking of the artworks."""
+        from src.scripts.decay_hot_scores import decay_hot_scores
+        decay_hot_scores(app, db)
+
+    @app.cli.command('rebuild-stats')
+    @click.option(
+        '--since', type=click.DateTime(formats=['%Y-%m-%d']),
+        help='Only rebuild the days from this date on (YYYY-MM-DD).')
+    def rebuild_stats(since):
+        """Recompute the daily artwork stats from upvotes and comments."""
+        from src.scripts.rebuild_artwork_stats import rebuild_artwork_stats
+        rebuild_artwork_stats(app, db, since=since.date() if since else None)
+
+    @app.cli.command('send-outbox')
+    def send_outbox_command():
+        """Deliver the due emails of the outbox."""
+        from src.scripts.send_outbox import send_outbox
+        sent = send_outbox(app, db)
+        print(f"Sent {sent} email(s).")
+
+    @app.cli.command('set-exchange-rates')
+    @click.argument('rates', nargs=-1, required=True)
+    def set_exchange_rates_command(rates):
+        """
+        Set exchange rates to the base currency and reprice the artworks,
+        e.g. `flask set-exchange-rates EUR=1.08 JPY=0.0067`.
+        """
+        from src.app.models import Currency
+        from src.app.utils.currency import set_exchange_rates
+
+        currencies = {c.code: c.id for c in Currency.query.all()}
+        parsed = {}
+        for pair in rates:
+            code, _, value = pair.partition('=')
+            if code.upper() not in currencies:
+                raise click.ClickException(f'Unknown currency: {code}')
+            try:
+                parsed[currencies[code.upper()]] = float(value)
+            except ValueError:
+                raise click.ClickException(f'Invalid rate: {pair}')
+        try:
+            repriced = set_exchange_rates(parsed)
+        except ValueError as e:
+            raise click.ClickException(str(e))
+        db.session.commit()
+        print(f"Repriced {repriced} artwork(s).")
+
+    @app.cli.command('set-role')
+    @click.argument('email')
+    @click.argument('role_name')
+    def set_role(email, role_name):
+        """Promote or demote a user, e.g. `flask set-role a@b.com artist`."""
+        from src.app.models import Role, User
+        from src.app.utils.cache import get_role_cache
+
+        user = User.query.filter_by(email=email).first()
+        role = Role.query.filter_by(name=role_name).first()
+        if user is None or role is None:
+            raise click.ClickException('Unknown user or role')
+        user.set_role(role.id)
+        db.session.commit()
+        # Other workers notice the change within ROLE_CACHE_TTL seconds
+        get_role_cache().invalidate(user.id)
+        print(f"{email} is now {role_name}.")
+
+    @app.cli.command('rebuild-search-index')
+    def rebuild_search_index_command():
+        """Re-index every artwork in the full-text search index."""
+        from src.app.models.search import (create_search_index,
+                                           rebuild_search_index,
+                                           search_supported)
+
+        connection = db.session.connection()
+        if not search_supported(connection):
+            raise click.ClickException(
+                'Full-text search requires SQLite with FTS5')
+        create_search_index(connection)
+        rebuild_search_index(connection)
+        db.session.commit()
+        print("Search index rebuilt.")
@@ -1,5 +1,8 @@
-from src.app.models.art import (Artwork, Category, Comment, Currency,  # noqa
-                                Tag)
+from src.app.models.art import (Artwork, ArtworkScore, Category,  # noqa
+                                Comment, Currency, ExchangeRate, Tag)
 from src.app.models.user import Role, User, TokenBlocklist  # noqa
+from src.app.models import search  # noqa
+from src.app.models.stats import ArtworkDailyStats  # noqa
+from src.app.models.outbox import OutboxEmail  # noqa
 
 # Add all models to this file to centralize imports
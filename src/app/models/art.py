@@ -1,6 +1,43 @@
 from src.app import db
 from datetime import timezone
 from datetime import datetime
+from sqlalchemy import case, event, func, inspect, select
+from sqlalchemy.orm import validates
+from sqlalchemy.types import SmallInteger, TypeDecorator
+
+# Gravity of the "hot" ranking: each upvote weighs 1 / (hours + 2) ** G,
+# hours being the age of the upvote, so recent upvotes count the most.
+HOT_GRAVITY = 1.8
+
+
+def hot_weight(upvoted_at, now=None) -> float:
+    """The contribution of an upvote cast at `upvoted_at` to a hot score."""
+    now = now or datetime.now(tz=timezone.utc)
+    if upvoted_at is None:
+        upvoted_at = now
+    elif upvoted_at.tzinfo is None:
+        # SQLite returns naive datetimes; they are stored in UTC
+        upvoted_at = upvoted_at.replace(tzinfo=timezone.utc)
+    hours = max((now - upvoted_at).total_seconds() / 3600, 0)
+    return 1 / (hours + 2) ** HOT_GRAVITY
+
+
+def normalize_title(title: str) -> str:
+    """The key tag and category titles are matched by."""
+    return title.strip().casefold()
+
+
+class TitleKeyMixin:
+    """
+    Mixin for the tag and category models: `title_key` holds the normalized
+    title, so 'Nature' and ' nature' resolve to the same row.
+    """
+    title_key = db.Column(db.String(255), unique=True, nullable=False)
+
+    @validates('title')
+    def _set_title_key(self, key, title):
+        self.title_key = normalize_title(title)
+        return title.strip()
 
 
 class UpvotableMixin:
@@ -8,7 +45,14 @@ class UpvotableMixin:
     Mixin class to add upvote functionality to models.
     This mixin provides methods to check if an item is upvoted,
     upvote an item, and remove an upvote.
+
+    The number of upvotes is denormalized into the `upvote_count` column,
+    which `upvote` and `remove_upvote` keep in sync in the same transaction
+    as the `Upvote` row. `flask reconcile-upvotes` repairs any drift.
     """
+    upvote_count = db.Column(
+        db.Integer, nullable=False, default=0, server_default='0')
+
     def is_upvoted(self, user_id):
         return Upvote.query.filter_by(
             user_id=user_id,
@@ -25,6 +69,10 @@ class UpvotableMixin:
                 target_id=getattr(self, 'id', None)  # type: ignore
             )
             db.session.add(upvote)
+            # Increment in SQL so concurrent upvotes do not overwrite
+            # each other
+            self.upvote_count = type(self).upvote_count + 1
+            self._upvote_added(upvote)
         else:
             raise ValueError(
                 f"{self.__class__.__name__} already upvoted by this user.")
@@ -37,25 +85,58 @@ class UpvotableMixin:
         ).first()
         if upvote:
             db.session.delete(upvote)
+            self.upvote_count = type(self).upvote_count - 1
+            self._upvote_removed(upvote)
         else:
             raise ValueError("No upvote found for this user.")
 
+    def _upvote_added(self, upvote):
+        """Hook called after `upvote` was added to the session."""
+
+    def _upvote_removed(self, upvote):
+        """Hook called after `upvote` was deleted from the session."""
+
     def get_upvotes_count(self) -> int:
-        return Upvote.query.filter_by(
-            target_type=self.__class__.__name__.lower(),
-            target_id=self.id).count()  # type: ignore
+        return self.upvote_count
 
     def get_upvotes(self):
         return Upvote.query.filter_by(
             target_type=self.__class__.__name__.lower(),
             target_id=self.id).all()  # type: ignore
 
+    @classmethod
+    def get_upvotes_counts(cls, ids) -> dict:
+        """
+        Read the upvote counts of many objects with a single query.
+
+        Args:
+            ids (Iterable[int]): The IDs of the objects to get counts for.
+
+        Returns:
+            dict: A mapping of object ID to upvote count. Unknown IDs are
+            included with a count of 0.
+        """
+        ids = list(ids)
+        if not ids:
+            return {}
+        rows = (
+            db.session.query(cls.id, cls.upvote_count)  # type: ignore
+            .filter(cls.id.in_(ids))  # type: ignore
+            .all()
+        )
+        counts = dict.fromkeys(ids, 0)
+        counts.update(rows)
+        return counts
+
 
 class Artwork(db.Model, UpvotableMixin):
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(255), nullable=False)
     description = db.Column(db.Text, nullable=True)
     price = db.Column(db.Float, nullable=False)
+    # The price converted to the base currency, see `_set_price_base`. None
+    # while the artwork's currency has no exchange rate.
+    price_base = db.Column(db.Float, nullable=True)
     currency_id = db.Column(
         db.Integer, db.ForeignKey('currency.id'), nullable=False)
     currency = db.relationship('Currency', back_populates='artworks')
@@ -65,8 +146,17 @@ class Artwork(db.Model, UpvotableMixin):
     artist = db.relationship('User', back_populates='artworks')
     # Path to the image file
     image_path = db.Column(db.String(255), nullable=True)
+    # For uploaded images: the SHA-256 digest of the original, and the
+    # paths of its resized variants by width once they are generated
+    image_hash = db.Column(db.String(64), nullable=True)
+    image_variants = db.Column(db.JSON, nullable=True)
     created_at = db.Column(
-        db.DateTime, default=datetime.now(tz=timezone.utc))
+        db.DateTime, default=lambda: datetime.now(tz=timezone.utc))
+    # Bumped on every write to the row except upvote count changes (see
+    # `_keep_updated_at`); versions the cached artwork details.
+    updated_at = db.Column(
+        db.DateTime, default=lambda: datetime.now(tz=timezone.utc),
+        onupdate=lambda: datetime.now(tz=timezone.utc))
     category_id = db.Column(
         db.Integer, db.ForeignKey('category.id'), nullable=False)
     category = db.relationship('Category', back_populates='artworks')
@@ -80,6 +170,27 @@ class Artwork(db.Model, UpvotableMixin):
         'Comment', back_populates='artwork', lazy='dynamic',
         cascade='all, delete-orphan')
 
+    # Created along with the artwork, see `_create_hot_score`
+    hot_score = db.relationship(
+        'ArtworkScore', uselist=False, back_populates='artwork',
+        cascade='all, delete-orphan')
+
+    __table_args__ = (
+        # Supports the keyset pagination of the store listing
+        db.Index('ix_artwork_created_at_id', 'created_at', 'id'),
+        # Support the catalog filters: browsing a category (newest first or
+        # within a price range) and an artist's artworks
+        db.Index(
+            'ix_artwork_category_id_created_at',
+            'category_id', 'created_at', 'id'),
+        db.Index(
+            'ix_artwork_category_id_price_base',
+            'category_id', 'price_base', 'id'),
+        db.Index('ix_artwork_artist_id_created_at', 'artist_id', 'created_at'),
+        # Supports sorting and filtering the whole catalog by price
+        db.Index('ix_artwork_price_base_id', 'price_base', 'id'),
+    )
+
     def __repr__(self):
         return f"<Artwork {self.title}>"
 
@@ -100,8 +211,91 @@ class Artwork(db.Model, UpvotableMixin):
         db.session.flush()
         return comment.id
 
+    def get_comments_count(self) -> int:
+        return self.comments.count()
+
+    def _upvote_added(self, upvote):
+        self._keep_updated_at()
+        self._add_to_hot_score(hot_weight(upvote.created_at))
+
+    def _upvote_removed(self, upvote):
+        self._keep_updated_at()
+        self._add_to_hot_score(-hot_weight(upvote.created_at))
+
+    def _keep_updated_at(self):
+        # Setting the column to itself keeps its onupdate from firing, so a
+        # counter change does not expire the cached details; the HTTP
+        # validators include `upvote_count` themselves. Must run before the
+        # next autoflush writes the new count.
+        self.updated_at = type(self).updated_at
+
+    def _add_to_hot_score(self, weight):
+        # Updated in SQL so concurrent upvotes do not overwrite each other;
+        # `decay-hot-scores` periodically recomputes the exact values.
+        new_score = ArtworkScore.score + weight
+        ArtworkScore.query.filter_by(artwork_id=self.id).update(
+            {ArtworkScore.score: case((new_score < 0, 0), else_=new_score)},
+            synchronize_session=False)
+
+    @classmethod
+    def get_comments_counts(cls, ids) -> dict:
+        """
+        Count the comments (including replies) of many artworks with a single
+        grouped query.
+
+        Args:
+            ids (Iterable[int]): The IDs of the artworks.
 
-class Category(db.Model):
+        Returns:
+            dict: A mapping of artwork ID to comment count.
+        """
+        ids = list(ids)
+        if not ids:
+            return {}
+        rows = (
+            db.session.query(Comment.artwork_id, func.count(Comment.id))
+            .filter(Comment.artwork_id.in_(ids))
+            .group_by(Comment.artwork_id)
+            .all()
+        )
+        counts = dict.fromkeys(ids, 0)
+        counts.update(rows)
+        return counts
+
+
+class ArtworkScore(db.Model):
+    """
+    The precomputed "hot" score of an artwork: the sum of the `hot_weight`
+    of its upvotes as of `decayed_at`. Upvotes adjust the score as they
+    happen; `flask decay-hot-scores` periodically re-decays every score.
+    """
+    __tablename__ = 'artwork_score'
+    artwork_id = db.Column(
+        db.Integer, db.ForeignKey('artwork.id'), primary_key=True)
+    score = db.Column(
+        db.Float, nullable=False, default=0, server_default='0')
+    decayed_at = db.Column(
+        db.DateTime, default=lambda: datetime.now(tz=timezone.utc))
+    artwork = db.relationship('Artwork', back_populates='hot_score')
+
+    __table_args__ = (
+        # The hot listing is a range scan of this index
+        db.Index('ix_artwork_score_score_artwork_id', 'score', 'artwork_id'),
+    )
+
+    def __repr__(self):
+        return f"<ArtworkScore artwork_id={self.artwork_id} {self.score}>"
+
+
+@event.listens_for(Artwork, 'after_insert')
+def _create_hot_score(mapper, connection, target):
+    # Every artwork has a score row so the hot listing is a plain join
+    connection.execute(ArtworkScore.__table__.insert().values(
+        artwork_id=target.id, score=0,
+        decayed_at=datetime.now(tz=timezone.utc)))
+
+
+class Category(db.Model, TitleKeyMixin):
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(255), unique=True, nullable=False)
     artworks = db.relationship('Artwork', back_populates='category')
@@ -124,7 +318,7 @@ class Category(db.Model):
         return f"<Category {self.title}>"
 
 
-class Tag(db.Model):
+class Tag(db.Model, TitleKeyMixin):
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(255), unique=True, nullable=False)
     artworks = db.relationship(
@@ -140,17 +334,78 @@ class Currency(db.Model):
     code = db.Column(db.String(10), unique=True, nullable=False)
     symbol = db.Column(db.String(10), unique=True, nullable=False)
     artworks = db.relationship('Artwork', back_populates='currency')
+    exchange_rate = db.relationship(
+        'ExchangeRate', uselist=False, back_populates='currency')
 
     def __repr__(self):
         return f"<Currency {self.title}>"
 
 
+class ExchangeRate(db.Model):
+    """
+    The value of one unit of a currency in the base currency
+    (`BASE_CURRENCY_CODE`). Change rates with `set_exchange_rates` so the
+    `price_base` of the artworks is recomputed.
+    """
+    __tablename__ = 'exchange_rate'
+    currency_id = db.Column(
+        db.Integer, db.ForeignKey('currency.id'), primary_key=True)
+    rate = db.Column(db.Float, nullable=False)
+    updated_at = db.Column(
+        db.DateTime, default=lambda: datetime.now(tz=timezone.utc),
+        onupdate=lambda: datetime.now(tz=timezone.utc))
+    currency = db.relationship('Currency', back_populates='exchange_rate')
+
+    def __repr__(self):
+        return f"<ExchangeRate currency_id={self.currency_id} {self.rate}>"
+
+
+@event.listens_for(Artwork, 'before_insert')
+@event.listens_for(Artwork, 'before_update')
+def _set_price_base(mapper, connection, target):
+    state = inspect(target)
+    if state.persistent and not (
+            state.attrs.price.history.has_changes()
+            or state.attrs.currency_id.history.has_changes()):
+        return
+    rate = connection.execute(
+        select(ExchangeRate.rate)
+        .where(ExchangeRate.currency_id == target.currency_id)
+    ).scalar()
+    target.price_base = None if rate is None else target.price * rate
+
+
+class UpvoteTargetType(TypeDecorator):
+    """
+    Store the upvote target type as a small integer while exposing it as
+    its name ('artwork' or 'comment') to Python code and queries.
+    """
+    impl = SmallInteger
+    cache_ok = True
+
+    CODES = {'artwork': 1, 'comment': 2}
+    NAMES = {code: name for name, code in CODES.items()}
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        try:
+            return self.CODES[value]
+        except KeyError:
+            raise ValueError(f"Unknown upvote target type: {value}")
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        return self.NAMES[value]
+
+
 class Upvote(db.Model):
     __tablename__ = 'upvote'
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
     created_at = db.Column(
-        db.DateTime, default=datetime.now(tz=timezone.utc))
-    target_type = db.Column(db.String(20), primary_key=True)
+        db.DateTime, default=lambda: datetime.now(tz=timezone.utc))
+    target_type = db.Column(UpvoteTargetType, primary_key=True)
     target_id = db.Column(db.Integer, primary_key=True)
 
     user = db.relationship('User', back_populates='upvotes')
@@ -158,6 +413,10 @@ class Upvote(db.Model):
     __table_args__ = (
         db.UniqueConstraint(
             'user_id', 'target_type', 'target_id', name='unique_upvote'),
+        # Per-target counts and listings lead with the target; created_at
+        # is included so time-ordered reads are served from the index.
+        db.Index(
+            'ix_upvote_target', 'target_type', 'target_id', 'created_at'),
     )
 
 
@@ -166,7 +425,10 @@ class Comment(db.Model, UpvotableMixin):
     id = db.Column(db.Integer, primary_key=True)
     content = db.Column(db.Text, nullable=False)
     created_at = db.Column(
-        db.DateTime, default=datetime.now(tz=timezone.utc))
+        db.DateTime, default=lambda: datetime.now(tz=timezone.utc))
+    updated_at = db.Column(
+        db.DateTime, default=lambda: datetime.now(tz=timezone.utc),
+        onupdate=lambda: datetime.now(tz=timezone.utc))
 
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     artwork_id = db.Column(
@@ -192,6 +454,11 @@ class Comment(db.Model, UpvotableMixin):
         cascade='all, delete-orphan'
     )
 
+    __table_args__ = (
+        # Covers the per-artwork comment counts and latest comment dates
+        db.Index('ix_comment_artwork_id_created_at', 'artwork_id', 'created_at'),
+    )
+
     def __repr__(self):
         return (
             f"<Comment user_id={self.user_id} "
@@ -224,5 +491,8 @@ artwork_tags = db.Table(
         primary_key=True),
     db.Column(
         'tag_id', db.Integer, db.ForeignKey('tag.id'),
-        primary_key=True)
+        primary_key=True),
+    # The primary key leads with artwork_id; tag filters and facets need
+    # to look up by tag
+    db.Index('ix_artwork_tags_tag_id', 'tag_id', 'artwork_id')
 )
@@ -0,0 +1,44 @@
+from datetime import datetime, timezone
+
+from src.app import db
+
+
+class OutboxEmail(db.Model):
+    """
+    A transactional email waiting to be delivered, or delivered.
+
+    Rows are added in the transaction of the request that triggers the
+    email (see `queue_email`), so an email is sent only if that transaction
+    commits, and delivered by `flask send-outbox` or the background sender
+    started by `create_app`.
+    """
+    __tablename__ = 'email_outbox'
+    # Due emails are found with one range scan of this index
+    __table_args__ = (
+        db.Index('ix_email_outbox_status_next_attempt_at',
+                 'status', 'next_attempt_at'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    to_email = db.Column(db.String(120), nullable=False)
+    subject = db.Column(db.String(255), nullable=False)
+    html_content = db.Column(db.Text, nullable=False)
+    # 'pending' until delivered ('sent') or given up on ('failed')
+    status = db.Column(
+        db.String(10), nullable=False, default='pending',
+        server_default='pending')
+    attempts = db.Column(
+        db.Integer, nullable=False, default=0, server_default='0')
+    # When a pending email is next due; pushed forward while a sender holds
+    # it and after each failed attempt
+    next_attempt_at = db.Column(
+        db.DateTime, nullable=False,
+        default=lambda: datetime.now(timezone.utc))
+    last_error = db.Column(db.Text, nullable=True)
+    created_at = db.Column(
+        db.DateTime, nullable=False,
+        default=lambda: datetime.now(timezone.utc))
+    sent_at = db.Column(db.DateTime, nullable=True)
+
+    def __repr__(self):
+        return f"<OutboxEmail {self.id} to {self.to_email} {self.status}>"
@@ -0,0 +1,158 @@
+import re
+
+from sqlalchemy import (Float, Integer, bindparam, column, event, inspect,
+                        select, text)
+from sqlalchemy.orm import Session
+
+from src.app import db
+from src.app.models.art import Artwork, Category, Tag, artwork_tags
+
+# SQLite FTS5 index over the searchable text of each artwork. The rowid of
+# an entry is the ID of its artwork.
+SEARCH_TABLE = 'artwork_search'
+
+# bm25() weights of the title, description, tags and category columns
+SEARCH_WEIGHTS = (10.0, 1.0, 5.0, 3.0)
+
+# The keys search results are paginated by
+SEARCH_KEYS = [column('rank', Float), column('id', Integer)]
+
+_SELECT_DOCUMENTS = """
+    SELECT artwork.id, artwork.title, artwork.description,
+           COALESCE(GROUP_CONCAT(tag.title, ' '), ''), category.title
+    FROM artwork
+    LEFT JOIN category ON category.id = artwork.category_id
+    LEFT JOIN artwork_tags ON artwork_tags.artwork_id = artwork.id
+    LEFT JOIN tag ON tag.id = artwork_tags.tag_id
+"""
+
+
+def search_supported(connection) -> bool:
+    """FTS5 search is only available on SQLite."""
+    return connection.dialect.name == 'sqlite'
+
+
+def create_search_index(connection):
+    """Create the FTS5 table and fill it if it did not exist yet."""
+    exists = connection.execute(
+        text("SELECT 1 FROM sqlite_master WHERE name = :name"),
+        {'name': SEARCH_TABLE}).first()
+    if exists:
+        return
+    connection.execute(text(
+        f"CREATE VIRTUAL TABLE {SEARCH_TABLE} USING fts5("
+        "title, description, tags, category, "
+        "tokenize = 'unicode61 remove_diacritics 2')"))
+    rebuild_search_index(connection)
+
+
+def rebuild_search_index(connection):
+    """Re-index every artwork and compact the index."""
+    connection.execute(text(f"DELETE FROM {SEARCH_TABLE}"))
+    connection.execute(text(
+        f"INSERT INTO {SEARCH_TABLE} "
+        "(rowid, title, description, tags, category) "
+        f"{_SELECT_DOCUMENTS} GROUP BY artwork.id"))
+    connection.execute(text(
+        f"INSERT INTO {SEARCH_TABLE} ({SEARCH_TABLE}) VALUES ('optimize')"))
+
+
+def reindex_artworks(connection, artwork_ids):
+    """Refresh the index entries of the given artworks."""
+    ids = bindparam('ids', list(artwork_ids), expanding=True)
+    connection.execute(text(
+        f"DELETE FROM {SEARCH_TABLE} WHERE rowid IN :ids").bindparams(ids))
+    # Deleted artworks are simply not found by the SELECT
+    connection.execute(text(
+        f"INSERT INTO {SEARCH_TABLE} "
+        "(rowid, title, description, tags, category) "
+        f"{_SELECT_DOCUMENTS} WHERE artwork.id IN :ids "
+        "GROUP BY artwork.id").bindparams(ids))
+
+
+def build_match_query(query: str):
+    """
+    Turn free text into an FTS5 query matching every word as a prefix,
+    e.g. 'sun paint' -> '"sun"* "paint"*'. Returns None if there is no
+    word to search for.
+    """
+    words = re.findall(r'\w+', query)
+    if not words:
+        return None
+    return ' '.join(f'"{word}"*' for word in words)
+
+
+def search_artwork_ids(connection, match_query, after=None, limit=20):
+    """
+    Return up to `limit` (rank, artwork_id) pairs matching `match_query`,
+    best match first, starting after the (rank, id) pair `after`.
+    """
+    sql = (
+        f"SELECT rank, id FROM ("
+        f"SELECT bm25({SEARCH_TABLE}, {', '.join(map(str, SEARCH_WEIGHTS))})"
+        f" AS rank, rowid AS id FROM {SEARCH_TABLE} "
+        f"WHERE {SEARCH_TABLE} MATCH :match)"
+    )
+    params = {'match': match_query, 'limit': limit}
+    if after is not None:
+        sql += (
+            " WHERE rank > :rank OR (rank = :rank AND id > :id)")
+        params.update(rank=after[0], id=after[1])
+    sql += " ORDER BY rank, id LIMIT :limit"
+    return connection.execute(text(sql), params).all()
+
+
+@event.listens_for(db.metadata, 'after_create')
+def _create_search_index(target, connection, **kw):
+    if search_supported(connection):
+        create_search_index(connection)
+
+
+@event.listens_for(db.metadata, 'before_drop')
+def _drop_search_index(target, connection, **kw):
+    if search_supported(connection):
+        connection.execute(text(f"DROP TABLE IF EXISTS {SEARCH_TABLE}"))
+
+
+def _changed(obj, *fields):
+    state = inspect(obj)
+    return any(state.attrs[field].history.has_changes() for field in fields)
+
+
+@event.listens_for(Session, 'after_flush')
+def _sync_search_index(session, flush_context):
+    """
+    Keep the index in sync within the flushing transaction: re-index the
+    artworks whose title, description, category or tags changed, and the
+    artworks of renamed tags and categories.
+    """
+    artwork_ids = {
+        obj.id for obj in session.new if isinstance(obj, Artwork)}
+    artwork_ids.update(
+        obj.id for obj in session.dirty
+        if isinstance(obj, Artwork)
+        and _changed(obj, 'title', 'description', 'category_id', 'tags'))
+    artwork_ids.update(
+        obj.id for obj in session.deleted if isinstance(obj, Artwork))
+    tag_ids = [
+        obj.id for obj in session.dirty
+        if isinstance(obj, Tag) and _changed(obj, 'title')]
+    category_ids = [
+        obj.id for obj in session.dirty
+        if isinstance(obj, Category) and _changed(obj, 'title')]
+    if not (artwork_ids or tag_ids or category_ids):
+        return
+
+    connection = session.connection()
+    if not search_supported(connection):
+        return
+    if tag_ids:
+        artwork_ids.update(connection.execute(
+            select(artwork_tags.c.artwork_id)
+            .where(artwork_tags.c.tag_id.in_(tag_ids))).scalars())
+    if category_ids:
+        artwork_ids.update(connection.execute(
+            select(Artwork.id)
+            .where(Artwork.category_id.in_(category_ids))).scalars())
+    if artwork_ids:
+        reindex_artworks(connection, sorted(artwork_ids))
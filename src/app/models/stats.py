@@ -0,0 +1,120 @@
+from collections import defaultdict
+
+from sqlalchemy import delete, event, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from src.app import db
+from src.app.models.art import Artwork, Comment, Upvote
+
+
+class ArtworkDailyStats(db.Model):
+    """
+    Daily rollup of the engagement of each artwork: the upvotes and comments
+    created that day that still exist. Kept up to date by
+    `_update_daily_stats` as upvotes and comments are flushed;
+    `flask rebuild-stats` recomputes it from the raw tables.
+    """
+    __tablename__ = 'artwork_daily_stats'
+    # Leads with the artist so a dashboard time range is one index range
+    artist_id = db.Column(
+        db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    day = db.Column(db.Date, primary_key=True)
+    # Cascades so an artwork can be deleted where foreign keys are enforced;
+    # `_update_daily_stats` runs after the artwork DELETE has been sent
+    artwork_id = db.Column(
+        db.Integer, db.ForeignKey('artwork.id', ondelete='CASCADE'),
+        primary_key=True)
+    upvotes = db.Column(
+        db.Integer, nullable=False, default=0, server_default='0')
+    comments = db.Column(
+        db.Integer, nullable=False, default=0, server_default='0')
+
+    def __repr__(self):
+        return (
+            f"<ArtworkDailyStats artwork_id={self.artwork_id} {self.day}>")
+
+
+def increment_daily_stats(connection, rows):
+    """
+    Add the `upvotes` and `comments` deltas of `rows` (dicts holding
+    artist_id, artwork_id, day, upvotes and comments) to the rollup,
+    creating the missing days.
+    """
+    table = ArtworkDailyStats.__table__
+    dialect = connection.dialect.name
+    if dialect in ('postgresql', 'sqlite'):
+        module = postgresql if dialect == 'postgresql' else sqlite
+        statement = module.insert(table)
+        connection.execute(
+            statement.on_conflict_do_update(
+                index_elements=['artist_id', 'day', 'artwork_id'],
+                set_={
+                    'upvotes': table.c.upvotes + statement.excluded.upvotes,
+                    'comments': (
+                        table.c.comments + statement.excluded.comments),
+                }),
+            rows)
+        return
+    for row in rows:
+        result = connection.execute(
+            update(table)
+            .where(
+                table.c.artist_id == row['artist_id'],
+                table.c.day == row['day'],
+                table.c.artwork_id == row['artwork_id'])
+            .values(
+                upvotes=table.c.upvotes + row['upvotes'],
+                comments=table.c.comments + row['comments']))
+        if not result.rowcount:
+            connection.execute(table.insert(), row)
+
+
+@event.listens_for(Session, 'after_flush')
+def _update_daily_stats(session, flush_context):
+    """
+    Apply the upvotes and comments created or deleted by the flush to the
+    daily rollup, in the same transaction, and drop the rollup rows of
+    deleted artworks (for databases not enforcing the cascading foreign
+    key).
+    """
+    deltas = defaultdict(lambda: [0, 0])
+    for objects, sign in ((session.new, 1), (session.deleted, -1)):
+        for obj in objects:
+            if isinstance(obj, Upvote) and obj.target_type == 'artwork':
+                deltas[obj.target_id, obj.created_at.date()][0] += sign
+            elif isinstance(obj, Comment):
+                deltas[obj.artwork_id, obj.created_at.date()][1] += sign
+    deleted_artworks = [
+        obj.id for obj in session.deleted if isinstance(obj, Artwork)]
+    if not (deltas or deleted_artworks):
+        return
+
+    connection = session.connection()
+    if deleted_artworks:
+        connection.execute(
+            delete(ArtworkDailyStats)
+            .where(ArtworkDailyStats.artwork_id.in_(deleted_artworks)))
+    deltas = {
+        key: delta for key, delta in deltas.items()
+        if key[0] not in deleted_artworks and any(delta)
+    }
+    if not deltas:
+        return
+    artists = dict(connection.execute(
+        select(Artwork.id, Artwork.artist_id)
+        .where(Artwork.id.in_({artwork_id for artwork_id, _ in deltas}))
+    ).all())
+    rows = [
+        {
+            'artist_id': artists[artwork_id],
+            'artwork_id': artwork_id,
+            'day': day,
+            'upvotes': upvotes,
+            'comments': comments,
+        }
+        for (artwork_id, day), (upvotes, comments) in sorted(deltas.items())
+        if artwork_id in artists
+    ]
+    if rows:
+        increment_daily_stats(connection, rows)
@@ -3,7 +3,7 @@ import os
 import jwt as pyjwt
 from src.app import jwt
 from src.app import db
-from src.app import bcrypt
+from src.app.utils.passwords import get_password_hasher
 
 
 class User(db.Model):
@@ -13,6 +13,10 @@ class User(db.Model):
     role_id = db.Column(
         db.Integer, db.ForeignKey('role.id'), nullable=False, default=3)
     role = db.relationship('Role', back_populates='users')
+    # Incremented on every role change; access tokens carry the version
+    # they were issued with so tokens issued before a demotion are refused
+    role_version = db.Column(
+        db.Integer, nullable=False, default=0, server_default='0')
     password_hash = db.Column(db.String(128), nullable=False)
     artworks = db.relationship('Artwork', back_populates='artist')
     upvotes = db.relationship('Upvote', back_populates='user')
@@ -22,11 +26,23 @@ class User(db.Model):
         return f"<User {self.name}>"
 
     def set_password(self, password):
-        self.password_hash = bcrypt.generate_password_hash(
-            password).decode('utf-8')
+        self.password_hash = get_password_hasher().hash(password)
 
     def check_password(self, password):
-        return bcrypt.check_password_hash(self.password_hash, password)
+        return get_password_hasher().check(self.password_hash, password)
+
+    def set_role(self, role_id: int):
+        """Change the user's role, invalidating tokens of the old role."""
+        self.role_id = role_id
+        self.role_version = (self.role_version or 0) + 1
+
+    def token_claims(self) -> dict:
+        """Claims added to the user's access tokens."""
+        return {'role_id': self.role_id, 'role_version': self.role_version}
+
+    def password_needs_rehash(self) -> bool:
+        """Whether the password was hashed with an outdated work factor."""
+        return get_password_hasher().needs_rehash(self.password_hash)
 
     def generate_reset_token(self) -> str:
         return pyjwt.encode(
@@ -80,6 +96,12 @@ class Role(db.Model):
 
 class TokenBlocklist(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    jti = db.Column(db.String(36), nullable=False)
+    jti = db.Column(db.String(36), nullable=False, unique=True, index=True)
+    # Indexed for the incremental refresh of the revocation cache
     created_at = db.Column(
-        db.DateTime, nullable=False, default=datetime.now(timezone.utc))
+        db.DateTime, nullable=False, index=True,
+        default=lambda: datetime.now(timezone.utc))
+    # Expiry of the revoked token; the row is useless after it and is
+    # removed by `flask prune-blocklist`. Null for rows from before the
+    # column existed.
+    expires_at = db.Column(db.DateTime, nullable=True, index=True)
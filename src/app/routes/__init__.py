@@ -1,6 +1,8 @@
 from flask import Blueprint
 from flask_restx import Namespace, Api
 
+from src.app.utils.representations import register_representations
+
 auth_bp = Blueprint('auth', __name__, url_prefix='/auth')
 store_bp = Blueprint('store', __name__, url_prefix='/store')
 artist_bp = Blueprint('artist', __name__, url_prefix='/artist')
@@ -14,6 +16,9 @@ auth_namespace = Namespace('', description='Authentication operations')
 store_namespace = Namespace('', description='Store operations for browsing and interacting with artworks')
 artist_namespace = Namespace('', description='Artist operations for managing artworks')
 
+# Encode responses with orjson when it is installed
+register_representations(auth_api, store_api, artist_api)
+
 auth_api.add_namespace(auth_namespace)
 artist_api.add_namespace(artist_namespace)
 store_api.add_namespace(store_namespace)
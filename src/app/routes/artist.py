@@ -1,15 +1,56 @@
+from datetime import datetime, timezone
+
 from flask import abort, request, current_app
 from marshmallow import ValidationError
-from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
+from flask_jwt_extended import (get_jwt, get_jwt_identity,
+                                verify_jwt_in_request)
 from flask_restx import Resource
 
 from src.app import db
 from src.app.models import Artwork, Category, Currency, Tag, User
+from src.app.models.art import normalize_title
 from src.app.routes import artist_bp
 from src.app.routes import artist_namespace as artist_ns
 from src.app.schemas.art_schema import (ArtworkInputSchema,
                                         ArtworkOutputSchema, CategorySchema,
-                                        CurrencySchema, TagSchema)
+                                        CurrencySchema,
+                                        DashboardArtworkSchema, TagSchema)
+from src.app.utils.bulk_import import (BulkImportError, import_artworks,
+                                       read_bulk_rows)
+from src.app.utils.cache import (get_artwork_cache, get_reference_cache,
+                                 get_role_cache)
+from src.app.utils.dashboard import (InvalidSortError, dashboard_query,
+                                     dashboard_stats)
+from src.app.utils.images import (IMAGE_TYPES, ImageTooLargeError,
+                                  InvalidImageError, get_image_processor,
+                                  store_upload)
+from src.app.utils.pagination import (InvalidCursorError, keyset_paginate,
+                                      parse_page_args)
+from src.app.utils.stats import (InvalidStatsQueryError, artist_stats,
+                                 parse_stats_args)
+from src.app.utils.taxonomy import UnresolvedTitleError, resolve_titles
+
+
+def load_user_role(user_id):
+    """
+    Return the current (role_id, role_version) of a user, served from the
+    per-process role cache, or None if the user does not exist.
+    """
+    def load():
+        return (
+            db.session.query(User.role_id, User.role_version)
+            .filter_by(id=user_id)
+            .first()
+        )
+    role = get_role_cache().get_or_set(int(user_id), load)
+    return tuple(role) if role is not None else None
+
+
+@artist_ns.errorhandler(UnresolvedTitleError)
+def handle_unresolved_title(error):
+    """Reject tags or categories clashing with a row of another key."""
+    current_app.logger.warning(str(error))
+    return {"message": str(error)}, 409
 
 
 @artist_bp.before_request
@@ -18,21 +59,69 @@ def check_admin_access():
         return
     current_app.logger.debug('Running check_admin_access()')
     verify_jwt_in_request()
-    current_user_id = get_jwt_identity()
-    user = db.session.get(User, current_user_id)
-    if not user or user.role_id != 2:
-        return {"message": "Access forbidden: Artists only"}, 403
+    claims = get_jwt()
+    if 'role_id' in claims:
+        # Reject other roles from the signed claim alone, then make sure
+        # the role has not changed since the token was issued
+        if claims['role_id'] != 2:
+            return {"message": "Access forbidden: Artists only"}, 403
+        role = load_user_role(get_jwt_identity())
+        if role != (2, claims.get('role_version')):
+            return {"message": "Access forbidden: Artists only"}, 403
+    else:
+        # Tokens issued before role claims were added
+        user = db.session.get(User, get_jwt_identity())
+        if not user or user.role_id != 2:
+            return {"message": "Access forbidden: Artists only"}, 403
 
 
 @artist_ns.route('/dashboard', methods=['GET'])
 class ArtistDashboard(Resource):
+    @artist_ns.doc(params={
+        'cursor': 'Cursor returned with the previous page',
+        'limit': 'Maximum number of artworks to return (default 20)',
+        'sort': "'new' (default), 'upvotes', 'comments' or 'activity' "
+                "(latest comment or upvote), all descending"
+    })
     def get(self):
+        """A page of the artist's artworks with their engagement stats"""
         current_app.logger.debug('Running ArtistDashboard.get()')
-        # TODO: Paginate the artworks
-        artworks = Artwork.query.filter_by(artist_id=get_jwt_identity()).all()
-        schema = ArtworkOutputSchema(many=True)
-        validated_artworks = schema.dump(artworks)
-        return validated_artworks, 200
+        try:
+            cursor, limit = parse_page_args(request.args)
+            query, keys, cursor_values = dashboard_query(
+                int(get_jwt_identity()), request.args.get('sort', 'new'))
+            rows, next_cursor = keyset_paginate(
+                query, keys, cursor=cursor, limit=limit,
+                cursor_values=cursor_values)
+        except (InvalidCursorError, InvalidSortError) as e:
+            return {"message": str(e)}, 400
+        schema = DashboardArtworkSchema(
+            many=True, context=dashboard_stats(rows))
+        return {
+            "data": schema.dump([row.Artwork for row in rows]),
+            "next_cursor": next_cursor
+        }, 200
+
+
+@artist_ns.route('/stats', methods=['GET'])
+class ArtistStats(Resource):
+    @artist_ns.doc(params={
+        'from': 'First day of the range, YYYY-MM-DD (default: 29 days '
+                'before to)',
+        'to': 'Last day of the range, YYYY-MM-DD (default: today)',
+        'granularity': "'day' (default), 'week' or 'month'",
+        'artwork_id': 'Only count this artwork'
+    })
+    def get(self):
+        """Upvotes and comments received over time"""
+        try:
+            start, end, granularity = parse_stats_args(request.args)
+        except InvalidStatsQueryError as e:
+            return {"message": str(e)}, 400
+        artwork_id = request.args.get('artwork_id', type=int)
+        return artist_stats(
+            int(get_jwt_identity()), start, end, granularity,
+            artwork_id=artwork_id), 200
 
 
 @artist_ns.route('/artwork/<int:artwork_id>', methods=['GET', 'PUT', 'DELETE'])
@@ -51,30 +140,17 @@ class ArtworkResource(Resource):
     @staticmethod
     def add_artwork_tags(artwork, tag_names):
         """Helper method to handle artwork tags"""
-        # Clear existing tags
-        artwork.tags.clear()
-        for tag_name in tag_names:
-            # Check if tag exists
-            tag = Tag.query.filter_by(title=tag_name.strip()).first()
-            if not tag:
-                # Create new tag if it doesn't exist
-                tag = Tag(title=tag_name)
-                db.session.add(tag)
-                db.session.flush()
-            artwork.tags.append(tag)
+        tag_ids = resolve_titles(Tag, tag_names)
+        artwork.tags = (
+            Tag.query.filter(Tag.id.in_(tag_ids.values())).all()
+            if tag_ids else [])
 
     @staticmethod
     def add_artwork_category(artwork, category_name):
         """Helper method to handle artwork category"""
-        # Check if category exists
-        category = Category.query.filter_by(
-            title=category_name.strip()).first()
-        if not category:
-            # Create new category if it doesn't exist
-            category = Category(title=category_name)
-            db.session.add(category)
-            db.session.flush()
-        artwork.category_id = category.id
+        category_ids = resolve_titles(Category, [category_name])
+        if category_ids:
+            artwork.category_id = category_ids[normalize_title(category_name)]
 
     def get(self, artwork_id):
         current_app.logger.debug('Running... ArtworkResource.get()')
@@ -143,6 +219,10 @@ class ArtworkResource(Resource):
         # Handle tags
         if tag_names:
             ArtworkResource.add_artwork_tags(artwork, tag_names)
+        # Tag changes alone do not update the artwork row, so bump
+        # updated_at explicitly to invalidate the store's ETags
+        artwork.updated_at = datetime.now(timezone.utc)
+        get_artwork_cache().invalidate_on_commit(db.session, artwork.id)
 
         db.session.commit()
         return (
@@ -154,19 +234,110 @@ class ArtworkResource(Resource):
         """
         # Check if the artwork exists
         artwork = ArtworkResource.get_artwork_or_404(artwork_id)
+        get_artwork_cache().invalidate_on_commit(db.session, artwork.id)
         db.session.delete(artwork)
         db.session.commit()
         return (
             {"message": "Artwork deleted"}, 200)
 
 
+@artist_ns.route('/artworks/bulk', methods=['POST'])
+class BulkArtworkResource(Resource):
+    def post(self):
+        """
+        Create many artworks at once from a JSON array, or from a CSV or
+        NDJSON body or `file` upload. Valid rows are created even if others
+        are rejected; the response lists the errors by row index.
+        """
+        try:
+            rows = read_bulk_rows(request)
+        except BulkImportError as e:
+            return {"message": "Invalid input", "error": str(e)}, 400
+        max_rows = current_app.config['BULK_IMPORT_MAX_ROWS']
+        if len(rows) > max_rows:
+            return {
+                "message": f"At most {max_rows} artworks can be imported "
+                           "at once"
+            }, 413
+
+        created, errors = import_artworks(
+            rows, int(get_jwt_identity()),
+            batch_size=current_app.config['BULK_IMPORT_BATCH_SIZE'])
+        db.session.commit()
+        return {
+            "message": f"{len(created)} artwork(s) created, "
+                       f"{len(errors)} rejected",
+            "artwork_ids": created,
+            "errors": errors
+        }, 201 if created else 400
+
+
+@artist_ns.route('/artwork/<int:artwork_id>/image', methods=['POST'])
+class ArtworkImageResource(Resource):
+    @artist_ns.doc(responses={
+        202: 'Image stored, variants are being generated',
+        400: 'The body is not a valid image',
+        404: 'Artwork not found',
+        413: 'Image too large',
+        415: 'Unsupported image type'
+    })
+    def post(self, artwork_id):
+        """
+        Upload the image of an artwork as the raw request body
+        (Content-Type image/jpeg, image/png or image/webp)
+        """
+        artwork = ArtworkResource.get_artwork_or_404(artwork_id)
+        if request.mimetype not in IMAGE_TYPES:
+            return {"message": "Unsupported image type"}, 415
+        max_bytes = current_app.config['MAX_IMAGE_UPLOAD_BYTES']
+        if (request.content_length or 0) > max_bytes:
+            return {"message": "Image too large"}, 413
+        try:
+            # Read from the WSGI stream so the upload is never held in
+            # memory as a whole
+            digest, image_path = store_upload(
+                request.stream, request.mimetype,
+                current_app.config['UPLOAD_FOLDER'], max_bytes)
+        except ImageTooLargeError as e:
+            return {"message": str(e)}, 413
+        except InvalidImageError as e:
+            return {"message": str(e)}, 400
+
+        artwork.image_path = image_path
+        artwork.image_hash = digest
+        artwork.image_variants = None
+        get_artwork_cache().invalidate_on_commit(db.session, artwork.id)
+        db.session.commit()
+
+        app = current_app._get_current_object()
+
+        def record_variants(variants):
+            with app.app_context():
+                if variants is None:
+                    app.logger.error(
+                        f"Could not resize the image of artwork {artwork_id}")
+                    return
+                # Skipped if another image was uploaded in the meantime
+                Artwork.query.filter_by(
+                    id=artwork_id, image_hash=digest
+                ).update({'image_variants': variants})
+                db.session.commit()
+                get_artwork_cache().invalidate(artwork_id)
+
+        get_image_processor().submit(image_path, digest, record_variants)
+        return {
+            "message": "Image uploaded",
+            "artwork_id": artwork.id,
+            "image_path": image_path
+        }, 202
+
+
 @artist_ns.route('/tags', methods=['GET'])
 class TagList(Resource):
     def get(self):
         """Get all tags"""
-        tags = Tag.query.all()
-        schema = TagSchema(many=True)
-        validated_tags = schema.dump(tags)
+        validated_tags = get_reference_cache().get_or_set(
+            'tags', lambda: TagSchema(many=True).dump(Tag.query.all()))
         return validated_tags, 200
 
 
@@ -174,11 +345,10 @@ class TagList(Resource):
 class CategoryList(Resource):
     def get(self):
         """Get all categories"""
-        categories = Category.query.all()
-        # Serialize the categories
-        schema = CategorySchema(many=True)
-        validated_categories = schema.dump(categories)
-        # Return the serialized categories
+        # Serve the serialized categories from the cache when possible
+        validated_categories = get_reference_cache().get_or_set(
+            'categories',
+            lambda: CategorySchema(many=True).dump(Category.query.all()))
         return validated_categories, 200
 
 
@@ -186,7 +356,7 @@ class CategoryList(Resource):
 class CurrencyList(Resource):
     def get(self):
         """Get all currencies"""
-        currencies = Currency.query.all()
-        schema = CurrencySchema(many=True)
-        validated_currencies = schema.dump(currencies)
+        validated_currencies = get_reference_cache().get_or_set(
+            'currencies',
+            lambda: CurrencySchema(many=True).dump(Currency.query.all()))
         return validated_currencies, 200
@@ -1,3 +1,5 @@
+from datetime import datetime, timezone
+
 from flask import current_app, request
 from flask_restx import Resource
 from marshmallow import ValidationError
@@ -5,19 +7,27 @@ from flask_jwt_extended import (
     create_access_token, get_jwt, get_jwt_identity, jwt_required
 )
 
-from src.app.utils.mail_sender import send_reset_password_email
+from src.app.utils.mail_sender import queue_reset_password_email
 from src.app import db, jwt
 from src.app.models import User, TokenBlocklist
 from src.app.routes import auth_namespace as api
 from src.app.schemas.user_schema import UserSchema, ResetPasswordSchema
+from src.app.utils.cache import get_artwork_cache
+from src.app.utils.passwords import PasswordHasherBusy
+from src.app.utils.revocation import get_revocation_cache
+
+
+@api.errorhandler(PasswordHasherBusy)
+def handle_password_hasher_busy(error):
+    """Reject the request when the bcrypt worker pool is saturated."""
+    current_app.logger.warning(str(error))
+    return {"message": "Server busy, please try again later"}, 503
 
 
 @jwt.token_in_blocklist_loader
 def check_if_token_revoked(jwt_header, jwt_payload: dict) -> bool:
-    """Check if the token is in the blocklist."""
-    jti = jwt_payload["jti"]
-    token = db.session.query(TokenBlocklist.id).filter_by(jti=jti).scalar()
-    return token is not None
+    """Check if the token is in the blocklist (served from memory)."""
+    return get_revocation_cache().is_revoked(jwt_payload["jti"])
 
 
 @api.route('/register', methods=['POST'])
@@ -63,7 +73,12 @@ class LoginUserResource(Resource):
         if user and user.check_password(
             validate_data['password']  # type: ignore
         ):
-            access_token = create_access_token(identity=str(user.id))
+            # Transparently upgrade hashes made with an older work factor
+            if user.password_needs_rehash():
+                user.set_password(validate_data['password'])  # type: ignore
+                db.session.commit()
+            access_token = create_access_token(
+                identity=str(user.id), additional_claims=user.token_claims())
             return {"access_token": access_token}, 200
         return {"message": "Invalid credentials"}, 401
 
@@ -80,14 +95,29 @@ class UserProfileResource(Resource):
         return schema.dump(user), 200
 
 
+@api.route('/cache-stats', methods=['GET'])
+class CacheStatsResource(Resource):
+    @jwt_required()
+    def get(self):
+        """Artwork detail cache hits and misses of this worker (admins only)"""
+        user = db.session.get(User, get_jwt_identity())
+        if user is None or user.role_id != 1:
+            return {"message": "Access forbidden: Admins only"}, 403
+        return get_artwork_cache().stats, 200
+
+
 @api.route('/logout', methods=['POST'])
 class LogoutUserResource(Resource):
     @jwt_required()
     def post(self):
         """Logout the current user by blacklisting their JWT token."""
-        jti = get_jwt()["jti"]
-        db.session.add(TokenBlocklist(jti=jti))  # type: ignore
+        token = get_jwt()
+        jti = token["jti"]
+        expires_at = datetime.fromtimestamp(token["exp"], timezone.utc)
+        db.session.add(TokenBlocklist(
+            jti=jti, expires_at=expires_at))  # type: ignore
         db.session.commit()
+        get_revocation_cache().add(jti, expires_at)
         return {"message": "Successfully logged out"}, 200
 
 
@@ -108,8 +138,10 @@ class ForgotPasswordResource(Resource):
         if user:
             # Generate a reset token
             reset_token = user.generate_reset_token()
-            # Send the reset email
-            send_reset_password_email(user.email, reset_token)
+            # Queue the reset email; it is sent in the background once
+            # committed
+            queue_reset_password_email(user.email, reset_token)
+            db.session.commit()
             return {"message": "Reset Password Request Received Successfully"}
 
 
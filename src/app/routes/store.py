@@ -1,14 +1,33 @@
-from flask import current_app, request
+import zlib
+
+from flask import (current_app, request, send_from_directory,
+                   stream_with_context)
 from flask_jwt_extended import get_jwt_identity, jwt_required
 from flask_restx import Resource, fields
 from marshmallow import ValidationError
 
 from src.app import db
 from src.app.models import Artwork, Comment
+from src.app.models.search import (SEARCH_KEYS, build_match_query,
+                                   search_artwork_ids, search_supported)
 from src.app.routes import store_namespace as store_ns
 from src.app.schemas.art_schema import ArtworkOutputSchema
 from src.app.schemas.store_schema import CommentOutputSchema
-from src.app.utils.artwork import get_object_or_404
+from src.app.utils.artwork import (artwork_listing_options,
+                                   engagement_context, get_object_or_404,
+                                   iter_artwork_chunks)
+from src.app.utils.cache import get_artwork_cache
+from src.app.utils.catalog import (InvalidFilterError, apply_catalog_filters,
+                                   catalog_facets, catalog_order,
+                                   parse_catalog_filters, parse_sort)
+from src.app.utils.comment_tree import (comment_thread_marker,
+                                       load_comment_tree)
+from src.app.utils.conditional import (compute_etag, not_modified_response,
+                                       validator_headers)
+from src.app.utils.pagination import (InvalidCursorError, decode_cursor,
+                                      encode_cursor, keyset_paginate,
+                                      parse_page_args)
+from src.app.utils.representations import dumps
 
 # Define base models
 error_model = store_ns.model('Error', {
@@ -31,6 +50,10 @@ artwork_model = store_ns.model('Artwork', {
     'updated_at': fields.DateTime(description='Last update timestamp'),
     'user_id': fields.Integer(
         description='ID of the user who created the artwork'
+    ),
+    'upvotes': fields.Integer(description='Number of upvotes'),
+    'comments_count': fields.Integer(
+        description='Number of comments, including replies'
     )
 })
 
@@ -54,7 +77,12 @@ comment_model = store_ns.model('Comment', {
 # Define response models
 artwork_list_response = store_ns.model('ArtworkListResponse', {
     'status': fields.String(description='Status of the response'),
-    'data': fields.List(fields.Nested(artwork_model))
+    'data': fields.List(fields.Nested(artwork_model)),
+    'next_cursor': fields.String(
+        description='Cursor of the next page, null on the last page'),
+    'facets': fields.Raw(
+        description='Counts per category, tag and price bucket of the '
+                    'filtered artworks (first page only)')
 })
 
 artwork_response = store_ns.model('ArtworkResponse', {
@@ -85,33 +113,83 @@ comment_response = store_ns.model('CommentResponse', {
 class GetAllArtResource(Resource):
     @store_ns.doc(
         'list_artworks',
+        params={
+            'cursor': 'Cursor returned with the previous page',
+            'limit': 'Maximum number of artworks to return (default 20)',
+            'sort': "'new' (default) for newest first, 'hot' for the "
+                    "artworks with the most recent upvotes first, 'price' "
+                    "or 'price_desc' to sort by price in the base currency",
+            'category_id': 'Category IDs (repeatable or comma separated)',
+            'tag_id': 'Tag IDs (repeatable or comma separated)',
+            'tag_mode': "Match 'any' (default) or 'all' of the tags",
+            'min_price': 'Minimum price in the base currency',
+            'max_price': 'Maximum price in the base currency',
+            'currency_id': 'Currency IDs (repeatable or comma separated)',
+            'artist_id': 'Artist IDs (repeatable or comma separated)',
+            'in_stock': 'Only artworks in stock when true'
+        },
         responses={
             200: (
-                'Successfully retrieved all artworks', artwork_list_response),
+                'Successfully retrieved artworks', artwork_list_response),
+            400: ('Invalid cursor, limit or filter', error_model),
             404: ('No artworks found', error_model),
             500: ('Internal server error', error_model)
         }
     )
     def get(self):
-        """Get all artwork from the database.
+        """Get a page of artworks, newest, hottest or by price, optionally
+        filtered.
 
         Returns:
-            A list of all artwork with their details.
-            If no artworks are found, returns a 404 error.
+            A list of artworks with their details and the cursor of the
+            next page. The first page also carries the facet counts of the
+            filtered artworks. If no artworks are found, returns a 404
+            error.
         """
         try:
-            artworks = Artwork.query.all()
-            if not artworks:
+            cursor, limit = parse_page_args(request.args)
+            filters = parse_catalog_filters(request.args)
+            query, keys, order_options = catalog_order(
+                apply_catalog_filters(
+                    Artwork.query.options(*artwork_listing_options()),
+                    filters),
+                parse_sort(request.args))
+            artworks, next_cursor = keyset_paginate(
+                query,
+                keys=keys,
+                cursor=cursor,
+                limit=limit,
+                **order_options,
+            )
+        except (InvalidCursorError, InvalidFilterError) as e:
+            return {
+                'status': 'error',
+                'message': str(e)
+            }, 400
+        try:
+            if not artworks and cursor is None:
                 return {
                     'status': 'error',
                     'message': 'No artworks found'
                 }, 404
-            schema = ArtworkOutputSchema(many=True)
-            validated_data = schema.dump(artworks)
-            return {
-                'status': 'success',
-                'data': validated_data
-            }, 200
+            response = {'status': 'success'}
+            if cursor is None:
+                response['facets'] = catalog_facets(filters)
+            context = engagement_context(artworks)
+            etag = compute_etag(next_cursor, response.get('facets'), [
+                (artwork.id, artwork.updated_at, artwork.upvote_count,
+                 context['comments_count'][artwork.id])
+                for artwork in artworks
+            ])
+            # No Last-Modified: new comments and artworks leaving the page
+            # change the body without moving any updated_at
+            not_modified = not_modified_response(etag)
+            if not_modified:
+                return not_modified
+            schema = ArtworkOutputSchema(many=True, context=context)
+            response['data'] = schema.dump(artworks)
+            response['next_cursor'] = next_cursor
+            return response, 200, validator_headers(etag)
         except Exception as e:
             return {
                 'status': 'error',
@@ -119,6 +197,144 @@ class GetAllArtResource(Resource):
             }, 500
 
 
+@store_ns.route('/search', methods=['GET'])
+class SearchArtworkResource(Resource):
+    @store_ns.doc(
+        'search_artworks',
+        params={
+            'q': 'Words to search for in titles, descriptions, tags and '
+                 'categories (prefixes match)',
+            'cursor': 'Cursor returned with the previous page',
+            'limit': 'Maximum number of artworks to return (default 20)'
+        },
+        responses={
+            200: ('Matching artworks, best first', artwork_list_response),
+            400: ('Missing query, invalid cursor or limit', error_model),
+            501: ('Search is not available', error_model)
+        }
+    )
+    def get(self):
+        """Full-text search over the artworks, ranked with BM25.
+
+        Returns:
+            A page of matching artworks, best match first, and the cursor
+            of the next page.
+        """
+        connection = db.session.connection()
+        if not search_supported(connection):
+            return {
+                'status': 'error',
+                'message': 'Search is not available'
+            }, 501
+        match_query = build_match_query(request.args.get('q', ''))
+        if match_query is None:
+            return {
+                'status': 'error',
+                'message': 'A search query is required'
+            }, 400
+        try:
+            cursor, limit = parse_page_args(request.args)
+            after = decode_cursor(cursor, SEARCH_KEYS) if cursor else None
+        except InvalidCursorError as e:
+            return {
+                'status': 'error',
+                'message': str(e)
+            }, 400
+
+        rows = search_artwork_ids(
+            connection, match_query, after=after, limit=limit + 1)
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1])
+        ids = [artwork_id for _, artwork_id in rows]
+        artworks_by_id = {
+            artwork.id: artwork for artwork in
+            Artwork.query.options(*artwork_listing_options())
+            .filter(Artwork.id.in_(ids))
+        }
+        artworks = [artworks_by_id[i] for i in ids if i in artworks_by_id]
+        schema = ArtworkOutputSchema(
+            many=True, context=engagement_context(artworks))
+        return {
+            'status': 'success',
+            'data': schema.dump(artworks),
+            'next_cursor': next_cursor
+        }, 200
+
+
+@store_ns.route('/artworks/export', methods=['GET'])
+class ExportArtworksResource(Resource):
+    @store_ns.doc(
+        'export_artworks',
+        params={
+            'after_id': 'Only export artworks with a greater ID, to resume '
+                        'an interrupted export from the last received ID'
+        },
+        responses={
+            200: 'Newline-delimited JSON, one artwork per line in ID order',
+            400: ('Invalid after_id', error_model)
+        }
+    )
+    def get(self):
+        """Stream the whole catalog as newline-delimited JSON.
+
+        The response is gzip-compressed when the client accepts it.
+        """
+        # None when after_id is given but is not an integer
+        after_id = request.args.get(
+            'after_id', None if 'after_id' in request.args else 0, type=int)
+        if after_id is None or after_id < 0:
+            return {
+                'status': 'error',
+                'message': 'after_id must be a non-negative integer'
+            }, 400
+        chunk_size = current_app.config['CATALOG_EXPORT_CHUNK_SIZE']
+        gzip = bool(request.accept_encodings['gzip'])
+
+        def generate():
+            compressor = zlib.compressobj(wbits=31) if gzip else None
+            for chunk in iter_artwork_chunks(after_id, chunk_size):
+                schema = ArtworkOutputSchema(
+                    many=True, context=engagement_context(chunk))
+                body = b''.join(dumps(item) for item in schema.dump(chunk))
+                if compressor is not None:
+                    # Flush each chunk so the client receives it right away
+                    body = (
+                        compressor.compress(body)
+                        + compressor.flush(zlib.Z_SYNC_FLUSH))
+                yield body
+            if compressor is not None:
+                yield compressor.flush()
+
+        response = current_app.response_class(
+            stream_with_context(generate()),
+            mimetype='application/x-ndjson')
+        response.vary.add('Accept-Encoding')
+        if gzip:
+            response.headers['Content-Encoding'] = 'gzip'
+        return response
+
+
+@store_ns.route('/images/<path:image_path>', methods=['GET'])
+class ImageResource(Resource):
+    @store_ns.doc(
+        'get_image',
+        params={'image_path': 'The image_path or a value of image_variants'},
+        responses={200: 'The image', 404: 'Image not found'}
+    )
+    def get(self, image_path):
+        """Serve an uploaded artwork image or one of its variants.
+
+        Files are named after their content, so they are cached for a year.
+        """
+        response = send_from_directory(
+            current_app.config['UPLOAD_FOLDER'], image_path,
+            max_age=365 * 24 * 3600)
+        response.cache_control.immutable = True
+        return response
+
+
 @store_ns.route('/artworks/<int:artwork_id>', methods=['GET'])
 class GetArtworkResource(Resource):
     @store_ns.doc(
@@ -140,19 +356,45 @@ class GetArtworkResource(Resource):
             The artwork details if found, or an error message if not found
         """
         artwork = get_object_or_404('artwork', artwork_id)
-        schema = ArtworkOutputSchema()
-        try:
-            validated_data = schema.dump(artwork)
-        except ValidationError as err:
-            return {
-                'status': 'error',
-                'message': 'Invalid input',
-                'error': str(err)
-            }, 400
+        comments_count = Artwork.get_comments_counts([artwork.id])[artwork.id]
+        etag = compute_etag(
+            artwork.id, artwork.updated_at, artwork.upvote_count,
+            comments_count)
+        # No Last-Modified: adding or deleting a comment changes
+        # comments_count without moving the artwork's updated_at
+        not_modified = not_modified_response(etag)
+        if not_modified:
+            return not_modified
+
+        # The cached details leave out the counters, which change far more
+        # often than the artwork itself.
+        cache = get_artwork_cache()
+        version = str(artwork.updated_at)
+        validated_data = cache.get(artwork.id, version)
+        cache_status = 'HIT'
+        if validated_data is None:
+            cache_status = 'MISS'
+            schema = ArtworkOutputSchema(
+                exclude=('upvotes', 'comments_count'))
+            try:
+                validated_data = schema.dump(artwork)
+            except ValidationError as err:
+                return {
+                    'status': 'error',
+                    'message': 'Invalid input',
+                    'error': str(err)
+                }, 400
+            cache.set(artwork.id, version, validated_data)
+        headers = validator_headers(etag)
+        headers['X-Cache'] = cache_status
         return {
             'status': 'success',
-            'data': validated_data
-        }, 200
+            'data': {
+                **validated_data,
+                'upvotes': artwork.upvote_count,
+                'comments_count': comments_count
+            }
+        }, 200, headers
 
 
 @store_ns.route(
@@ -349,14 +591,20 @@ class CommentArtworkResource(Resource):
 
     @store_ns.doc(
         'list_comments',
-        params={'artwork_id': 'The ID of the artwork to get comments for'},
+        params={
+            'artwork_id': 'The ID of the artwork to get comments for',
+            'max_depth': (
+                'Depth of replies to include, 0 for top-level comments '
+                'only (default: the whole thread)')
+        },
         responses={
             200: ('Successfully retrieved comments', comment_list_response),
+            400: ('Invalid max_depth', error_model),
             404: ('Artwork not found', error_model)
         }
     )
     def get(self, artwork_id):
-        """List comments for an artwork.
+        """List comments for an artwork, with their nested replies.
 
         Args:
             artwork_id (int): The ID of the artwork to get comments for
@@ -364,20 +612,33 @@ class CommentArtworkResource(Resource):
         Returns:
             A list of comments for the artwork
         """
+        # None when max_depth is missing or is not an integer
+        max_depth = request.args.get('max_depth', type=int)
+        if 'max_depth' in request.args and (
+                max_depth is None or max_depth < 0):
+            return {
+                'status': 'error',
+                'message': 'max_depth must be a non-negative integer'
+            }, 400
         artwork = get_object_or_404('artwork', artwork_id)
         assert isinstance(artwork, Artwork)
-        comments = (
-            artwork.comments
-            .filter_by(parent_id=None)
-            .order_by(Comment.created_at.desc())
-            .all()
-        )
-        schema = CommentOutputSchema(many=True)
+        # No Last-Modified: deleting a comment lowers the count without
+        # moving the latest updated_at
+        comments_count, last_updated_at = comment_thread_marker(artwork.id)
+        etag = compute_etag(
+            'comments', artwork.id, max_depth, comments_count,
+            last_updated_at)
+        not_modified = not_modified_response(etag)
+        if not_modified:
+            return not_modified
+        comments, replies = load_comment_tree(
+            artwork_id=artwork.id, max_depth=max_depth)
+        schema = CommentOutputSchema(many=True, context={'replies': replies})
         data = schema.dump(comments)
         return {
             'status': 'success',
             'data': data
-        }, 200
+        }, 200, validator_headers(etag)
 
 
 @store_ns.route(
@@ -490,14 +751,18 @@ class CommentResource(Resource):
         """
         comment = get_object_or_404('comment', comment_id)
         assert isinstance(comment, Comment)
-        comment_replies = (
-            comment.replies  # type: ignore
-            .order_by(Comment.created_at.desc())
-            .all()
-        )
-        schema = CommentOutputSchema(many=True)
+        # Any change in the artwork's thread invalidates the replies listing
+        comments_count, last_updated_at = comment_thread_marker(
+            comment.artwork_id)
+        etag = compute_etag(
+            'replies', comment.id, comments_count, last_updated_at)
+        not_modified = not_modified_response(etag)
+        if not_modified:
+            return not_modified
+        comment_replies, replies = load_comment_tree(parent_id=comment.id)
+        schema = CommentOutputSchema(many=True, context={'replies': replies})
         data = schema.dump(comment_replies)
         return {
             'status': 'success',
             'data': data
-        }, 200
+        }, 200, validator_headers(etag)
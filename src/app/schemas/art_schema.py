@@ -19,13 +19,63 @@ class ArtworkOutputSchema(Schema):
     id = fields.Int(dump_only=True)
     title = fields.Str(required=True)
     price = fields.Float(required=True)
+    price_base = fields.Float(dump_only=True)
     stock = fields.Int(required=True)
     description = fields.Str(required=True)
     image_path = fields.Str(required=False)
+    image_variants = fields.Dict(
+        keys=fields.Str(), values=fields.Str(), dump_only=True)
     category = fields.Nested('CategorySchema', required=True)
     tags = fields.List(fields.Nested('TagSchema'), required=False)
     currency = fields.Nested('CurrencySchema', required=True)
     artist = fields.Nested('UserSchema', required=True)
+    upvotes = fields.Int(attribute='upvote_count', dump_only=True)
+    comments_count = fields.Method('get_comments_count')
+
+    # Listings pass the comment counts of the whole page in the schema
+    # context (see `engagement_context`) to avoid one COUNT query per artwork.
+    def get_comments_count(self, obj):
+        counts = self.context.get('comments_count')
+        if counts is None:
+            return obj.get_comments_count()
+        return counts.get(obj.id, 0)
+
+
+# A compact artwork with its engagement stats for the artist dashboard
+class DashboardArtworkSchema(Schema):
+    id = fields.Int(dump_only=True)
+    title = fields.Str()
+    price = fields.Float()
+    currency = fields.Str(attribute='currency.code')
+    stock = fields.Int()
+    image_path = fields.Str()
+    category = fields.Str(attribute='category.title')
+    created_at = fields.DateTime()
+    upvotes = fields.Int(attribute='upvote_count')
+    comments_count = fields.Method('get_comments_count')
+    last_comment_at = fields.Method('get_last_comment_at')
+    last_upvote_at = fields.Method('get_last_upvote_at')
+    last_activity_at = fields.Method('get_last_activity_at')
+
+    # The stats are computed for the whole page by `dashboard_query` and
+    # passed in the schema context (see `dashboard_stats`)
+    def _stat(self, obj, name):
+        value = self.context['stats'][obj.id][name]
+        if hasattr(value, 'isoformat'):
+            return value.isoformat()
+        return value
+
+    def get_comments_count(self, obj):
+        return self._stat(obj, 'comments_count')
+
+    def get_last_comment_at(self, obj):
+        return self._stat(obj, 'last_comment_at')
+
+    def get_last_upvote_at(self, obj):
+        return self._stat(obj, 'last_upvote_at')
+
+    def get_last_activity_at(self, obj):
+        return self._stat(obj, 'last_activity_at')
 
 
 class CurrencySchema(Schema):
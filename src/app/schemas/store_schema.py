@@ -1,6 +1,8 @@
 from marshmallow import Schema
 from marshmallow import fields
 
+from src.app.models import Comment
+
 
 class CommentOutputSchema(Schema):
     id = fields.Int()
@@ -9,7 +11,7 @@ class CommentOutputSchema(Schema):
     user_id = fields.Int()
     upvotes = fields.Method('get_upvotes_count')
     # For nested replies (recursive)
-    replies = fields.Nested(lambda: CommentOutputSchema(), many=True)
+    replies = fields.Method('get_replies')
 
     def get_upvotes_count(self, obj):
         return (
@@ -18,3 +20,13 @@ class CommentOutputSchema(Schema):
             else 0
         )
 
+    def get_replies(self, obj):
+        # A thread loaded with `load_comment_tree` passes its replies in the
+        # context so that no query is run per comment.
+        tree = self.context.get('replies')
+        if tree is not None:
+            replies = tree.get(obj.id, [])
+        else:
+            replies = obj.replies.order_by(Comment.created_at.desc()).all()
+        return CommentOutputSchema(
+            many=True, context=self.context).dump(replies)
@@ -1,7 +1,10 @@
-from src.app.models import Artwork, Comment
+from src.app.models import Artwork, Category, Comment, Currency, Tag, User
 from typing import Union
-from flask import abort
+from flask import abort, has_app_context
+from sqlalchemy import event, inspect, select
+from sqlalchemy.orm import Session, joinedload, selectinload
 from src.app import db
+from src.app.utils.cache import get_artwork_cache
 
 
 def get_object_or_404(
@@ -25,3 +28,96 @@ def get_object_or_404(
         return comment
     else:
         abort(400, description="Invalid object type")
+
+
+def artwork_listing_options():
+    """
+    Loader options for serializing a list of artworks with
+    `ArtworkOutputSchema`.
+
+    The many-to-one relationships are joined into the main query and the tags
+    are fetched with a single extra `IN` query, so the number of queries does
+    not depend on the number of artworks.
+    """
+    return (
+        joinedload(Artwork.category),
+        joinedload(Artwork.currency),
+        joinedload(Artwork.artist),
+        selectinload(Artwork.tags),
+    )
+
+
+def iter_artwork_chunks(after_id=0, chunk_size=500):
+    """
+    Stream every artwork with an ID above `after_id` in ID order, as lists
+    of at most `chunk_size` artworks loaded with `artwork_listing_options`.
+
+    The IDs are read through a server-side cursor; each chunk of IDs is
+    then loaded with its relationships and the session is cleared before
+    the next one, so memory use does not grow with the size of the catalog.
+    Do not keep references to the artworks of a chunk once the next one is
+    requested.
+    """
+    # Only IDs go through the cursor: clearing the session while an ORM
+    # result is still being iterated is not allowed
+    ids = db.session.execute(
+        select(Artwork.id)
+        .where(Artwork.id > after_id)
+        .order_by(Artwork.id)
+        .execution_options(yield_per=chunk_size)
+    )
+    try:
+        for partition in ids.scalars().partitions():
+            yield (
+                Artwork.query
+                .options(*artwork_listing_options())
+                .filter(Artwork.id.in_(partition))
+                .order_by(Artwork.id)
+                .all()
+            )
+            db.session.expunge_all()
+    finally:
+        ids.close()
+
+
+def engagement_context(artworks) -> dict:
+    """
+    Build the `ArtworkOutputSchema` context holding the comment counts of a
+    page of artworks, computed with one grouped query. Upvote counts need no
+    query as they are stored on the artwork row.
+    """
+    ids = [artwork.id for artwork in artworks]
+    return {
+        'comments_count': Artwork.get_comments_counts(ids),
+    }
+
+
+# Fields of the related models nested in the cached artwork details
+_ARTWORK_RELATED_FIELDS = {
+    Category: ('title',),
+    Currency: ('title', 'code', 'symbol'),
+    Tag: ('title',),
+    User: ('name', 'email'),
+}
+
+
+@event.listens_for(Session, 'after_flush')
+def _invalidate_artwork_cache_on_related_change(session, flush_context):
+    """
+    Drop every cached artwork detail when a category, currency, tag or user
+    shown in the details is modified or deleted. These changes are rare and
+    may affect many artworks, so the whole cache is cleared once the session
+    commits.
+    """
+    if not has_app_context():
+        return
+    changed = any(
+        isinstance(obj, tuple(_ARTWORK_RELATED_FIELDS))
+        for obj in session.deleted
+    ) or any(
+        inspect(obj).attrs[field].history.has_changes()
+        for obj in session.dirty
+        for field in _ARTWORK_RELATED_FIELDS.get(type(obj), ())
+    )
+    if changed:
+        get_artwork_cache().invalidate_on_commit(session)
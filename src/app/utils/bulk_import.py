@@ -0,0 +1,198 @@
+import csv
+import io
+import json
+from datetime import datetime, timezone
+
+from marshmallow import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.exc import SQLAlchemyError
+
+from src.app import db
+from src.app.models import (Artwork, ArtworkScore, Category, Currency,
+                            ExchangeRate, Tag)
+from src.app.models.art import artwork_tags, normalize_title
+from src.app.models.search import reindex_artworks, search_supported
+from src.app.schemas.art_schema import ArtworkInputSchema
+from src.app.utils.taxonomy import resolve_titles
+
+# Content types of the accepted uploads besides a JSON array
+CSV_TYPES = ('text/csv', 'application/csv')
+NDJSON_TYPES = ('application/x-ndjson', 'application/jsonl')
+
+
+class BulkImportError(ValueError):
+    """Raised when a bulk import payload cannot be read at all."""
+
+
+def _read_csv(text):
+    rows = []
+    for record in csv.DictReader(io.StringIO(text)):
+        # Empty cells are treated as missing fields
+        row = {key: value for key, value in record.items() if value}
+        if 'tag_names' in row:
+            row['tag_names'] = [
+                name for name in row['tag_names'].split(',') if name.strip()]
+        rows.append(row)
+    return rows
+
+
+def _read_ndjson(text):
+    try:
+        return [json.loads(line) for line in text.splitlines() if line.strip()]
+    except ValueError as e:
+        raise BulkImportError(f'Invalid NDJSON: {e}')
+
+
+def read_bulk_rows(request) -> list:
+    """
+    Read the artworks of a bulk import request: a JSON array body, a CSV or
+    NDJSON body, or a CSV or NDJSON file uploaded as the `file` form field.
+
+    :raises BulkImportError: If the payload is malformed.
+    """
+    upload = request.files.get('file')
+    if upload is not None:
+        name = (upload.filename or '').lower()
+        content_type = upload.mimetype
+        text = upload.read().decode('utf-8-sig')
+        if name.endswith('.csv'):
+            content_type = 'text/csv'
+        elif name.endswith(('.ndjson', '.jsonl')):
+            content_type = 'application/x-ndjson'
+    else:
+        content_type = request.mimetype
+        text = request.get_data(as_text=True)
+
+    if content_type in CSV_TYPES:
+        rows = _read_csv(text)
+    elif content_type in NDJSON_TYPES:
+        rows = _read_ndjson(text)
+    else:
+        try:
+            rows = json.loads(text)
+        except ValueError as e:
+            raise BulkImportError(f'Invalid JSON: {e}')
+    if not isinstance(rows, list) or not all(
+            isinstance(row, dict) for row in rows):
+        raise BulkImportError('Expected a list of artworks')
+    return rows
+
+
+def validate_rows(rows):
+    """
+    Validate the rows with `ArtworkInputSchema(many=True)`.
+
+    Returns:
+        tuple: (valid, errors) where valid is a list of (index, data) pairs
+        and errors maps the index of each invalid row to its messages.
+    """
+    try:
+        loaded = ArtworkInputSchema(many=True).load(rows)
+        errors = {}
+    except ValidationError as err:
+        loaded, errors = err.valid_data, err.messages
+    valid = [
+        (index, data) for index, data in enumerate(loaded)
+        if index not in errors
+    ]
+
+    # Currencies are checked against the table once for the whole import
+    currency_ids = {
+        id for (id,) in db.session.query(Currency.id).filter(
+            Currency.id.in_({data['currency_id'] for _, data in valid}))
+    }
+    for index, data in list(valid):
+        if data['currency_id'] not in currency_ids:
+            errors[index] = {'currency_id': ['Unknown currency.']}
+    valid = [(index, data) for index, data in valid if index not in errors]
+    return valid, errors
+
+
+def import_artworks(rows, artist_id, batch_size=500):
+    """
+    Create the valid artworks of a bulk import, reporting the invalid ones.
+
+    Categories and tags of the whole import are resolved with
+    `resolve_titles`, then the artworks, their tags and their hot score
+    rows are inserted `batch_size` artworks at a time with executemany.
+    Each batch runs in a savepoint so a failing batch does not undo the
+    others. The caller commits the session.
+
+    ORM events do not fire for bulk inserts, so `price_base`, the hot score
+    rows and the search index are filled in here.
+
+    Returns:
+        tuple: (created, errors) where created lists the IDs of the new
+        artworks in input order and errors is a list of
+        {'index': ..., 'errors': ...} for the rejected rows.
+    """
+    valid, errors = validate_rows(rows)
+    created = []
+    if valid:
+        category_ids = resolve_titles(
+            Category, (data['category_name'] for _, data in valid))
+        tag_ids = resolve_titles(
+            Tag, (
+                name for _, data in valid
+                for name in data.get('tag_names') or ()))
+        rates = dict(
+            db.session.query(ExchangeRate.currency_id, ExchangeRate.rate))
+
+        for start in range(0, len(valid), batch_size):
+            batch = valid[start:start + batch_size]
+            try:
+                with db.session.begin_nested():
+                    created.extend(_insert_batch(
+                        batch, artist_id, category_ids, tag_ids, rates))
+            except SQLAlchemyError as e:
+                for index, _ in batch:
+                    errors[index] = {'_schema': [
+                        f'Could not be saved: {e.__class__.__name__}']}
+
+    return created, [
+        {'index': index, 'errors': messages}
+        for index, messages in sorted(errors.items())
+    ]
+
+
+def _insert_batch(batch, artist_id, category_ids, tag_ids, rates):
+    now = datetime.now(timezone.utc)
+    artworks = []
+    for _, data in batch:
+        rate = rates.get(data['currency_id'])
+        artworks.append({
+            'title': data['title'],
+            'description': data['description'],
+            'price': data['price'],
+            'price_base': None if rate is None else data['price'] * rate,
+            'currency_id': data['currency_id'],
+            'stock': data['stock'],
+            'image_path': data.get('image_path'),
+            'artist_id': artist_id,
+            'category_id': category_ids[
+                normalize_title(data['category_name'])],
+        })
+    # Each multi-row INSERT assigns increasing IDs in VALUES order, so the
+    # sorted IDs line up with the batch. (sort_by_parameter_order would
+    # fall back to one INSERT per row on SQLite.)
+    ids = sorted(db.session.scalars(
+        insert(Artwork).returning(Artwork.id), artworks))
+
+    links = {
+        (artwork_id, tag_ids[normalize_title(name)])
+        for artwork_id, (_, data) in zip(ids, batch)
+        for name in data.get('tag_names') or ()
+        if name.strip()
+    }
+    if links:
+        db.session.execute(
+            artwork_tags.insert(),
+            [{'artwork_id': a, 'tag_id': t} for a, t in sorted(links)])
+    db.session.execute(
+        insert(ArtworkScore),
+        [{'artwork_id': id, 'score': 0, 'decayed_at': now} for id in ids])
+
+    connection = db.session.connection()
+    if search_supported(connection):
+        reindex_artworks(connection, ids)
+    return ids
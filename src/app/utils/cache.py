@@ -0,0 +1,303 @@
+import json
+import threading
+from abc import ABC, abstractmethod
+import time
+from collections import OrderedDict
+
+from flask import current_app
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+_PENDING_INVALIDATIONS = 'pending_cache_invalidations'
+_PENDING_SETS = 'pending_cache_sets'
+
+
+class TTLCache:
+    """
+    A small thread-safe in-process cache whose entries expire after a
+    time-to-live.
+
+    Each worker process holds its own copy, so an explicit invalidation only
+    applies to the current process; other workers see the change once
+    their entry expires.
+    """
+
+    def __init__(self, ttl: float = 60):
+        self.ttl = ttl
+        self._entries = {}
+        # Bumped by `invalidate`, per key and for the whole cache, so a load
+        # that started before an invalidation is not stored after it
+        self._generations = {}
+        self._epoch = 0
+        self._lock = threading.Lock()
+
+    def get_or_set(self, key, loader):
+        """
+        Return the cached value for `key`, calling `loader()` to compute and
+        store it if it is missing or expired.
+
+        The value is not stored if `key` was invalidated while it loaded, as
+        it may have been read before the change that caused the
+        invalidation.
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                return entry[1]
+            generation = (self._epoch, self._generations.get(key, 0))
+        # Load outside the lock so a slow query does not block other keys
+        value = loader()
+        with self._lock:
+            if generation == (self._epoch, self._generations.get(key, 0)):
+                self._entries[key] = (now + self.ttl, value)
+        return value
+
+    def get(self, key, default=None):
+        """Return the cached value for `key`, or `default` if missing."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                return entry[1]
+        return default
+
+    def set_many(self, items):
+        """Store every (key, value) pair of the `items` mapping."""
+        expires = time.monotonic() + self.ttl
+        with self._lock:
+            for key, value in items.items():
+                self._entries[key] = (expires, value)
+
+    def set_on_commit(self, session, items):
+        """
+        Store the `items` mapping once `session` commits, so that values
+        read or created in a transaction that rolls back are never cached.
+        """
+        pending = session.info.setdefault(_PENDING_SETS, [])
+        pending.append((self, items))
+
+    def invalidate(self, *keys):
+        """Drop the given keys, or every entry if no key is given."""
+        with self._lock:
+            if not keys:
+                self._entries.clear()
+                self._generations.clear()
+                self._epoch += 1
+            for key in keys:
+                self._entries.pop(key, None)
+                self._generations[key] = self._generations.get(key, 0) + 1
+
+    def invalidate_on_commit(self, session, *keys):
+        """
+        Drop the given keys once `session` commits, so that no request can
+        cache the data as it was before the commit. Nothing is dropped if
+        the session rolls back.
+        """
+        pending = session.info.setdefault(_PENDING_INVALIDATIONS, [])
+        pending.append((self, keys))
+
+
+@event.listens_for(Session, 'after_commit')
+def _run_pending_invalidations(session):
+    for cache, keys in session.info.pop(_PENDING_INVALIDATIONS, []):
+        cache.invalidate(*keys)
+    for cache, items in session.info.pop(_PENDING_SETS, []):
+        cache.set_many(items)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_pending_invalidations(session):
+    session.info.pop(_PENDING_INVALIDATIONS, None)
+    session.info.pop(_PENDING_SETS, None)
+
+
+class CacheBackend(ABC):
+    """
+    Interface of the storage behind `ArtworkDetailCache`. Values are
+    JSON-serializable objects.
+    """
+
+    @abstractmethod
+    def get(self, key):
+        """Return the value stored under `key`, or None."""
+
+    @abstractmethod
+    def set(self, key, value, ttl=None):
+        """Store `value` under `key` for `ttl` seconds (forever if None)."""
+
+    @abstractmethod
+    def delete(self, *keys):
+        """Remove the given keys."""
+
+    @abstractmethod
+    def clear(self):
+        """Remove every key of this cache."""
+
+
+class LRUBackend(CacheBackend):
+    """
+    In-process backend keeping at most `max_entries` values, evicting the
+    least recently used one first.
+    """
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class RedisBackend(CacheBackend):
+    """
+    Backend shared by every worker, for any client exposing the redis-py
+    `get`, `set`, `delete` and `scan_iter` methods.
+    """
+
+    def __init__(self, client, prefix='artwork-cache:'):
+        self.client = client
+        self.prefix = prefix
+
+    @classmethod
+    def from_url(cls, url, **kwargs):
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError(
+                "The redis package is required for the redis cache backend"
+            ) from e
+        return cls(redis.Redis.from_url(url), **kwargs)
+
+    def get(self, key):
+        raw = self.client.get(self.prefix + str(key))
+        return json.loads(raw) if raw is not None else None
+
+    def set(self, key, value, ttl=None):
+        self.client.set(
+            self.prefix + str(key), json.dumps(value),
+            ex=int(ttl) if ttl else None)
+
+    def delete(self, *keys):
+        if keys:
+            self.client.delete(*[self.prefix + str(key) for key in keys])
+
+    def clear(self):
+        keys = list(self.client.scan_iter(match=self.prefix + '*'))
+        if keys:
+            self.client.delete(*keys)
+
+
+class ArtworkDetailCache:
+    """
+    Cache of serialized artwork details keyed by artwork ID, counting hits
+    and misses.
+
+    Entries remember the `updated_at` of the artwork they were built from;
+    an entry older than the row is treated as a miss, so a stale entry is
+    never served even if another worker missed the invalidation.
+
+    The counters are kept per process; see `GET /auth/cache-stats`.
+    """
+
+    def __init__(self, backend: CacheBackend, ttl=None):
+        self.backend = backend
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._stats_lock = threading.Lock()
+
+    def get(self, artwork_id, version: str):
+        entry = self.backend.get(artwork_id)
+        hit = entry is not None and entry['version'] == version
+        with self._stats_lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+        return entry['data'] if hit else None
+
+    def set(self, artwork_id, version: str, data):
+        self.backend.set(
+            artwork_id, {'version': version, 'data': data}, ttl=self.ttl)
+
+    def invalidate(self, *artwork_ids):
+        """Drop the given artworks, or every artwork if none is given."""
+        if artwork_ids:
+            self.backend.delete(*artwork_ids)
+        else:
+            self.backend.clear()
+
+    def invalidate_on_commit(self, session, *artwork_ids):
+        """Drop the given artworks once `session` commits."""
+        pending = session.info.setdefault(_PENDING_INVALIDATIONS, [])
+        pending.append((self, artwork_ids))
+
+    @property
+    def stats(self) -> dict:
+        with self._stats_lock:
+            hits, misses = self.hits, self.misses
+        total = hits + misses
+        return {
+            'hits': hits,
+            'misses': misses,
+            'hit_ratio': hits / total if total else 0.0,
+        }
+
+
+def build_artwork_cache(config) -> ArtworkDetailCache:
+    """Create the artwork detail cache described by the app config."""
+    backend_name = config['ARTWORK_CACHE_BACKEND']
+    if backend_name == 'redis':
+        backend = RedisBackend.from_url(config['ARTWORK_CACHE_REDIS_URL'])
+    elif backend_name == 'lru':
+        backend = LRUBackend(max_entries=config['ARTWORK_CACHE_SIZE'])
+    else:
+        raise ValueError(f"Unknown artwork cache backend: {backend_name}")
+    return ArtworkDetailCache(backend, ttl=config['ARTWORK_CACHE_TTL'])
+
+
+def get_reference_cache() -> TTLCache:
+    """Return the tags, categories and currencies cache of the current app."""
+    return current_app.extensions['reference_cache']
+
+
+def get_taxonomy_cache() -> TTLCache:
+    """Return the tag and category name to ID cache of the current app."""
+    return current_app.extensions['taxonomy_cache']
+
+
+def get_role_cache() -> TTLCache:
+    """Return the user role cache of the current app."""
+    return current_app.extensions['role_cache']
+
+
+def get_artwork_cache() -> ArtworkDetailCache:
+    """Return the artwork detail cache of the current app."""
+    return current_app.extensions['artwork_cache']
@@ -0,0 +1,196 @@
+from sqlalchemy import case, func, select
+from sqlalchemy.orm import contains_eager
+
+from src.app import db
+from src.app.models import Artwork, ArtworkScore, Category, Tag
+from src.app.models.art import artwork_tags
+
+# Upper bounds of the price facet buckets; the last bucket is open-ended
+PRICE_BUCKETS = (50, 100, 500, 1000, 5000)
+
+# Orders of the store listing: newest first, by decayed upvotes, or by
+# price in the base currency (cheapest or most expensive first)
+SORT_ORDERS = ('new', 'hot', 'price', 'price_desc')
+
+
+class InvalidFilterError(ValueError):
+    """Raised when a catalog filter in the query string is malformed."""
+
+
+def _int_list(args, name):
+    values = []
+    for raw in args.getlist(name):
+        for part in raw.split(','):
+            if part.strip():
+                try:
+                    values.append(int(part))
+                except ValueError:
+                    raise InvalidFilterError(f'{name} must be integers')
+    return values
+
+
+def _number(args, name):
+    raw = args.get(name)
+    if raw in (None, ''):
+        return None
+    try:
+        return float(raw)
+    except ValueError:
+        raise InvalidFilterError(f'{name} must be a number')
+
+
+def parse_catalog_filters(args) -> dict:
+    """
+    Read the catalog filters from the request query string.
+
+    Supported filters: category_id, tag_id (both repeatable or comma
+    separated), tag_mode ('any' or 'all'), min_price, max_price,
+    currency_id, artist_id and in_stock.
+
+    :raises InvalidFilterError: If a value is malformed.
+    """
+    filters = {
+        'category_ids': _int_list(args, 'category_id'),
+        'tag_ids': _int_list(args, 'tag_id'),
+        'tag_mode': args.get('tag_mode', 'any'),
+        'min_price': _number(args, 'min_price'),
+        'max_price': _number(args, 'max_price'),
+        'currency_ids': _int_list(args, 'currency_id'),
+        'artist_ids': _int_list(args, 'artist_id'),
+        'in_stock': args.get('in_stock', '').lower() in ('1', 'true', 'yes'),
+    }
+    if filters['tag_mode'] not in ('any', 'all'):
+        raise InvalidFilterError("tag_mode must be 'any' or 'all'")
+    return filters
+
+
+def parse_sort(args) -> str:
+    """
+    Read the listing order from the request query string.
+
+    :raises InvalidFilterError: If the order is unknown.
+    """
+    sort = args.get('sort') or 'new'
+    if sort not in SORT_ORDERS:
+        raise InvalidFilterError(
+            f"sort must be one of {', '.join(SORT_ORDERS)}")
+    return sort
+
+
+def catalog_order(query, sort):
+    """
+    Prepare an `Artwork` query for keyset pagination in the `sort` order.
+
+    :return: A tuple of (query, keys, options) where options are extra
+        keyword arguments of `keyset_paginate`.
+    """
+    if sort == 'hot':
+        # Walks ix_artwork_score_score_artwork_id from the top
+        query = (
+            query
+            .join(Artwork.hot_score)
+            .options(contains_eager(Artwork.hot_score))
+        )
+        return (
+            query,
+            [ArtworkScore.score, ArtworkScore.artwork_id],
+            {'cursor_values': lambda a: [a.hot_score.score, a.id]},
+        )
+    if sort in ('price', 'price_desc'):
+        # Walks ix_artwork_price_base_id; artworks whose currency has no
+        # exchange rate cannot be ranked by price
+        return (
+            query.filter(Artwork.price_base.isnot(None)),
+            [Artwork.price_base, Artwork.id],
+            {'descending': sort == 'price_desc'},
+        )
+    return query, [Artwork.created_at, Artwork.id], {}
+
+
+def apply_catalog_filters(query, filters):
+    """Restrict an `Artwork` query to the artworks matching `filters`."""
+    if filters['category_ids']:
+        query = query.filter(Artwork.category_id.in_(filters['category_ids']))
+    if filters['currency_ids']:
+        query = query.filter(Artwork.currency_id.in_(filters['currency_ids']))
+    if filters['artist_ids']:
+        query = query.filter(Artwork.artist_id.in_(filters['artist_ids']))
+    # Prices are compared in the base currency
+    if filters['min_price'] is not None:
+        query = query.filter(Artwork.price_base >= filters['min_price'])
+    if filters['max_price'] is not None:
+        query = query.filter(Artwork.price_base <= filters['max_price'])
+    if filters['in_stock']:
+        query = query.filter(Artwork.stock > 0)
+    tag_ids = filters['tag_ids']
+    if tag_ids:
+        tagged = (
+            select(artwork_tags.c.artwork_id)
+            .where(artwork_tags.c.tag_id.in_(tag_ids))
+        )
+        if filters['tag_mode'] == 'all':
+            tagged = (
+                tagged
+                .group_by(artwork_tags.c.artwork_id)
+                .having(
+                    func.count(func.distinct(artwork_tags.c.tag_id))
+                    == len(set(tag_ids)))
+            )
+        query = query.filter(Artwork.id.in_(tagged))
+    return query
+
+
+def catalog_facets(filters) -> dict:
+    """
+    Count the artworks matching `filters` per category, per tag and per
+    price bucket (in the base currency), with one aggregate query each.
+    """
+    matching = (
+        apply_catalog_filters(db.session.query(Artwork.id), filters)
+        .subquery()
+    )
+
+    categories = (
+        db.session.query(Category.id, Category.title, func.count())
+        .join(Artwork, Artwork.category_id == Category.id)
+        .join(matching, matching.c.id == Artwork.id)
+        .group_by(Category.id, Category.title)
+        .order_by(func.count().desc(), Category.title)
+        .all()
+    )
+    tags = (
+        db.session.query(Tag.id, Tag.title, func.count())
+        .join(artwork_tags, artwork_tags.c.tag_id == Tag.id)
+        .join(matching, matching.c.id == artwork_tags.c.artwork_id)
+        .group_by(Tag.id, Tag.title)
+        .order_by(func.count().desc(), Tag.title)
+        .all()
+    )
+
+    bucket = case(
+        *[
+            (Artwork.price_base < bound, i)
+            for i, bound in enumerate(PRICE_BUCKETS)],
+        else_=len(PRICE_BUCKETS))
+    bucket_counts = dict(
+        db.session.query(bucket, func.count())
+        .join(matching, matching.c.id == Artwork.id)
+        .filter(Artwork.price_base.isnot(None))
+        .group_by(bucket)
+        .all()
+    )
+    bounds = (0,) + PRICE_BUCKETS + (None,)
+    price = [
+        {'min': bounds[i], 'max': bounds[i + 1], 'count': bucket_counts[i]}
+        for i in range(len(bounds) - 1) if bucket_counts.get(i)
+    ]
+
+    return {
+        'categories': [
+            {'id': id, 'title': title, 'count': count}
+            for id, title, count in categories],
+        'tags': [
+            {'id': id, 'title': title, 'count': count}
+            for id, title, count in tags],
+        'price': price,
+    }
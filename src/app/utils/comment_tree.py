@@ -0,0 +1,83 @@
+from collections import defaultdict
+
+from sqlalchemy import func, literal, select
+from sqlalchemy.orm import aliased
+
+from src.app import db
+from src.app.models import Comment
+
+
+def load_comment_tree(artwork_id=None, parent_id=None, max_depth=None):
+    """
+    Load a comment thread with a single recursive query.
+
+    The thread starts either at the top-level comments of an artwork or at
+    the direct replies of a comment. Upvote counts are read from the
+    denormalized `upvote_count` column, so no further query is needed to
+    serialize the thread.
+
+    Args:
+        artwork_id (int): Load the top-level comments of this artwork.
+        parent_id (int): Load the replies of this comment instead.
+        max_depth (int): Depth to stop at, 0 being the first level only.
+            None loads the whole thread.
+
+    Returns:
+        tuple: (roots, replies) where roots is the list of first level
+        comments and replies maps a comment ID to the list of its loaded
+        replies. Both are ordered newest first.
+    """
+    if parent_id is not None:
+        anchor = Comment.parent_id == parent_id
+    else:
+        anchor = (
+            (Comment.artwork_id == artwork_id) & Comment.parent_id.is_(None))
+
+    tree = (
+        select(Comment.id, literal(0).label('depth'))
+        .where(anchor)
+        .cte('comment_tree', recursive=True)
+    )
+    reply = aliased(Comment)
+    recursive_step = (
+        select(reply.id, tree.c.depth + 1)
+        .join(tree, reply.parent_id == tree.c.id)
+    )
+    if max_depth is not None:
+        recursive_step = recursive_step.where(tree.c.depth < max_depth)
+    tree = tree.union_all(recursive_step)
+
+    rows = (
+        db.session.query(Comment, tree.c.depth)
+        .join(tree, Comment.id == tree.c.id)
+        .order_by(Comment.created_at.desc(), Comment.id.desc())
+        .all()
+    )
+
+    # Rows are already sorted, so appending keeps every level sorted
+    roots = []
+    replies = defaultdict(list)
+    for comment, depth in rows:
+        if depth == 0:
+            roots.append(comment)
+        else:
+            replies[comment.parent_id].append(comment)
+    return roots, replies
+
+
+def comment_thread_marker(artwork_id):
+    """
+    Summarize the state of an artwork's comments for HTTP validators.
+
+    Any added, deleted or upvoted comment changes either the count or the
+    latest `updated_at` of the thread.
+
+    Returns:
+        tuple: (comments_count, last_updated_at)
+    """
+    return (
+        db.session.query(
+            func.count(Comment.id), func.max(Comment.updated_at))
+        .filter(Comment.artwork_id == artwork_id)
+        .one()
+    )
@@ -0,0 +1,44 @@
+import hashlib
+import json
+from datetime import datetime
+
+from flask import current_app, request
+
+
+def compute_etag(*parts) -> str:
+    """
+    Build a strong ETag from the values that determine a response body.
+    Datetimes are serialized in ISO format.
+    """
+    raw = json.dumps(parts, default=_json_default, separators=(',', ':'))
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+
+def not_modified_response(etag: str):
+    """
+    Evaluate the request's If-None-Match header against the current ETag
+    of the resource.
+
+    Returns:
+        A 304 response if the client's copy is still fresh, None otherwise.
+    """
+    if not request.if_none_match.contains(etag):
+        return None
+    response = current_app.response_class(status=304)
+    response.headers.extend(validator_headers(etag))
+    return response
+
+
+def validator_headers(etag: str) -> dict:
+    """Headers carrying the validators of a 200 response."""
+    return {
+        'ETag': f'"{etag}"',
+        # Let browsers and the CDN store the response but revalidate it
+        'Cache-Control': 'no-cache',
+    }
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Cannot serialize {type(value).__name__} in an ETag")
@@ -0,0 +1,56 @@
+from sqlalchemy import select, update
+
+from src.app import db
+from src.app.models import Artwork, ExchangeRate
+
+
+def set_exchange_rates(rates) -> int:
+    """
+    Create or update exchange rates and recompute the `price_base` of the
+    artworks priced in the affected currencies with a single UPDATE.
+
+    The caller commits the session.
+
+    Args:
+        rates (dict): A mapping of currency ID to the value of one unit of
+            that currency in the base currency.
+
+    Returns:
+        int: The number of repriced artworks.
+    """
+    if not rates:
+        return 0
+    existing = {
+        row.currency_id: row for row in
+        ExchangeRate.query.filter(ExchangeRate.currency_id.in_(rates))
+    }
+    for currency_id, rate in rates.items():
+        if rate <= 0:
+            raise ValueError("Exchange rates must be positive.")
+        if currency_id in existing:
+            existing[currency_id].rate = rate
+        else:
+            db.session.add(ExchangeRate(currency_id=currency_id, rate=rate))
+    db.session.flush()
+    return reprice_artworks(list(rates))
+
+
+def reprice_artworks(currency_ids) -> int:
+    """
+    Recompute the `price_base` of the artworks priced in `currency_ids`
+    from the current exchange rates, with a single UPDATE.
+
+    Returns:
+        int: The number of repriced artworks.
+    """
+    rate = (
+        select(ExchangeRate.rate)
+        .where(ExchangeRate.currency_id == Artwork.currency_id)
+        .scalar_subquery()
+    )
+    result = db.session.execute(
+        update(Artwork)
+        .where(Artwork.currency_id.in_(currency_ids))
+        .values(price_base=Artwork.price * rate)
+        .execution_options(synchronize_session=False))
+    return result.rowcount
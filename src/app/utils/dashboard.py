@@ -0,0 +1,105 @@
+from sqlalchemy import case, func
+from sqlalchemy.orm import joinedload
+
+from src.app import db
+from src.app.models import Artwork, Comment
+from src.app.models.art import Upvote
+
+# Orders of the artist dashboard, all descending
+DASHBOARD_SORTS = ('new', 'upvotes', 'comments', 'activity')
+
+
+class InvalidSortError(ValueError):
+    """Raised when the dashboard is asked for an unknown order."""
+
+
+def dashboard_query(artist_id, sort='new'):
+    """
+    Build the query of an artist's artworks with their engagement stats,
+    ready for `keyset_paginate`.
+
+    The stats come from two grouped subqueries outer-joined to the
+    artworks, so a page costs one query whatever its size. Each row holds
+    the `Artwork`, its `comments_count`, `last_comment_at`,
+    `last_upvote_at` and `last_activity_at` (the latest comment or upvote,
+    or the creation date if there was none).
+
+    :return: A tuple of (query, keys, cursor_values).
+    :raises InvalidSortError: If `sort` is not one of `DASHBOARD_SORTS`.
+    """
+    if sort not in DASHBOARD_SORTS:
+        raise InvalidSortError(
+            f"sort must be one of {', '.join(DASHBOARD_SORTS)}")
+
+    comments = (
+        db.session.query(
+            Comment.artwork_id.label('artwork_id'),
+            func.count(Comment.id).label('count'),
+            func.max(Comment.created_at).label('last_at'))
+        .join(Artwork, Artwork.id == Comment.artwork_id)
+        .filter(Artwork.artist_id == artist_id)
+        .group_by(Comment.artwork_id)
+        .subquery()
+    )
+    upvotes = (
+        db.session.query(
+            Upvote.target_id.label('artwork_id'),
+            func.max(Upvote.created_at).label('last_at'))
+        .join(Artwork, Artwork.id == Upvote.target_id)
+        .filter(
+            Upvote.target_type == 'artwork',
+            Artwork.artist_id == artist_id)
+        .group_by(Upvote.target_id)
+        .subquery()
+    )
+    comments_count = func.coalesce(comments.c.count, 0)
+    last_comment = func.coalesce(comments.c.last_at, Artwork.created_at)
+    last_upvote = func.coalesce(upvotes.c.last_at, Artwork.created_at)
+    last_activity = case(
+        (last_comment > last_upvote, last_comment), else_=last_upvote)
+
+    query = (
+        db.session.query(
+            Artwork,
+            comments_count.label('comments_count'),
+            comments.c.last_at.label('last_comment_at'),
+            upvotes.c.last_at.label('last_upvote_at'),
+            last_activity.label('last_activity_at'))
+        .options(joinedload(Artwork.category), joinedload(Artwork.currency))
+        .outerjoin(comments, comments.c.artwork_id == Artwork.id)
+        .outerjoin(upvotes, upvotes.c.artwork_id == Artwork.id)
+        .filter(Artwork.artist_id == artist_id)
+    )
+    sort_key, attribute = {
+        'new': (Artwork.created_at, None),
+        'upvotes': (Artwork.upvote_count, None),
+        'comments': (comments_count, 'comments_count'),
+        'activity': (last_activity, 'last_activity_at'),
+    }[sort]
+
+    def cursor_values(row):
+        if attribute is None:
+            value = getattr(row.Artwork, sort_key.key)
+        else:
+            value = getattr(row, attribute)
+        return [value, row.Artwork.id]
+
+    return query, [sort_key, Artwork.id], cursor_values
+
+
+def dashboard_stats(rows) -> dict:
+    """
+    Build the `DashboardArtworkSchema` context from the rows of
+    `dashboard_query`.
+    """
+    return {
+        'stats': {
+            row.Artwork.id: {
+                'comments_count': row.comments_count,
+                'last_comment_at': row.last_comment_at,
+                'last_upvote_at': row.last_upvote_at,
+                'last_activity_at': row.last_activity_at,
+            }
+            for row in rows
+        }
+    }
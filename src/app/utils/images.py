@@ -0,0 +1,167 @@
+import hashlib
+import os
+import tempfile
+from concurrent.futures import Future
+
+from flask import current_app
+
+from src.app.utils.process_pool import ProcessPool
+
+# Accepted upload types, their file extension and leading magic bytes
+IMAGE_TYPES = {
+    'image/jpeg': ('.jpg', (b'\xff\xd8\xff',)),
+    'image/png': ('.png', (b'\x89PNG\r\n\x1a\n',)),
+    'image/webp': ('.webp', (b'RIFF',)),
+}
+CHUNK_SIZE = 64 * 1024
+
+
+class InvalidImageError(ValueError):
+    """Raised when an upload is not an accepted image."""
+
+
+class ImageTooLargeError(InvalidImageError):
+    """Raised when an upload exceeds the size limit."""
+
+
+def original_path(digest: str, extension: str) -> str:
+    """Storage path of an original image, relative to the upload folder."""
+    return f'originals/{digest[:2]}/{digest}{extension}'
+
+
+def variant_path(digest: str, width: int) -> str:
+    """Storage path of a resized image, relative to the upload folder."""
+    return f'variants/{digest[:2]}/{digest}/{width}.webp'
+
+
+def _matches_type(head: bytes, content_type: str) -> bool:
+    _, signatures = IMAGE_TYPES[content_type]
+    if not any(head.startswith(signature) for signature in signatures):
+        return False
+    return content_type != 'image/webp' or head[8:12] == b'WEBP'
+
+
+def store_upload(stream, content_type, upload_folder, max_bytes):
+    """
+    Copy an uploaded image from `stream` to the upload folder, `CHUNK_SIZE`
+    bytes at a time, naming it after its SHA-256 digest. Identical images
+    are stored once.
+
+    :return: A tuple of (digest, path relative to the upload folder).
+    :raises InvalidImageError: If the type is not accepted or the content
+        does not match it.
+    :raises ImageTooLargeError: If the upload exceeds `max_bytes`.
+    """
+    if content_type not in IMAGE_TYPES:
+        raise InvalidImageError(
+            f"Images must be one of {', '.join(sorted(IMAGE_TYPES))}")
+    tmp_dir = os.path.join(upload_folder, 'tmp')
+    os.makedirs(tmp_dir, exist_ok=True)
+    digest = hashlib.sha256()
+    size = 0
+    fd, tmp_path = tempfile.mkstemp(dir=tmp_dir)
+    try:
+        with os.fdopen(fd, 'wb') as tmp:
+            head = b''
+            while True:
+                chunk = stream.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > max_bytes:
+                    raise ImageTooLargeError(
+                        f"Images cannot exceed {max_bytes} bytes")
+                if len(head) < 12:
+                    head += chunk[:12]
+                digest.update(chunk)
+                tmp.write(chunk)
+        if not _matches_type(head, content_type):
+            raise InvalidImageError(f"The upload is not a {content_type}")
+
+        digest = digest.hexdigest()
+        relative = original_path(digest, IMAGE_TYPES[content_type][0])
+        target = os.path.join(upload_folder, relative)
+        if os.path.exists(target):
+            os.remove(tmp_path)
+        else:
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            os.replace(tmp_path, target)
+        return digest, relative
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def render_variants(upload_folder, source, digest, widths) -> dict:
+    """
+    Write a WebP copy of the image `source` (relative to the upload folder)
+    for each of `widths` that is narrower than the original, plus the
+    original size. Variants already on disk are reused.
+
+    Runs in the worker processes of `ImageProcessor`.
+
+    :return: A mapping of width (as a string) to variant path.
+    """
+    from PIL import Image, ImageOps
+
+    variants = {}
+    with Image.open(os.path.join(upload_folder, source)) as image:
+        image = ImageOps.exif_transpose(image)
+        if image.mode not in ('RGB', 'RGBA'):
+            image = image.convert('RGBA' if 'A' in image.getbands() else 'RGB')
+        sizes = sorted({w for w in widths if w < image.width} | {image.width})
+        for width in sizes:
+            relative = variant_path(digest, width)
+            target = os.path.join(upload_folder, relative)
+            if not os.path.exists(target):
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                resized = image.copy()
+                resized.thumbnail((width, image.height))
+                # Write then rename so readers never see a partial file
+                resized.save(target + '.tmp', 'WEBP', quality=80)
+                os.replace(target + '.tmp', target)
+            variants[str(width)] = relative
+    return variants
+
+
+class ImageProcessor:
+    """
+    Generate the resized variants of uploaded images in a pool of worker
+    processes, so resizing never runs on a request thread.
+
+    `callback(variants)` is called in the web process once the variants of
+    an image are ready, or with None if they could not be generated. With
+    `workers=0` the variants are generated inline, which is meant for tests.
+    """
+
+    def __init__(self, upload_folder, widths, workers=2):
+        self.upload_folder = upload_folder
+        self.widths = tuple(widths)
+        self.workers = workers
+        self._pool = ProcessPool(workers)
+
+    def submit(self, source, digest, callback) -> Future:
+        args = (self.upload_folder, source, digest, self.widths)
+        if self.workers:
+            future = self._pool.submit(render_variants, *args)
+        else:
+            future = Future()
+            try:
+                future.set_result(render_variants(*args))
+            except Exception as e:
+                future.set_exception(e)
+
+        def done(future):
+            callback(None if future.exception() else future.result())
+        future.add_done_callback(done)
+        return future
+
+    def shutdown(self):
+        """Stop the worker processes started by this process, if any."""
+        self._pool.shutdown()
+
+
+def get_image_processor() -> ImageProcessor:
+    """Return the image processor of the current app."""
+    return current_app.extensions['image_processor']
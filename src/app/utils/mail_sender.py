@@ -1,12 +1,210 @@
 import os
+import smtplib
+import threading
+from email.message import EmailMessage
 
 from flask import current_app
-from sendgrid import SendGridAPIClient
-from sendgrid.helpers.mail import Content, Email, Mail, To
+from sqlalchemy import event
+from sqlalchemy.orm import Session
 
+from src.app import db
+from src.app.models import OutboxEmail
 
-def send_email(to_email: str, subject: str, html_content: str) -> bool:
-    """Send an email using SendGrid API.
+# Most recipients SendGrid accepts in one mail send request
+SENDGRID_MAX_PERSONALIZATIONS = 1000
+
+# session.info key of the sender wake-up events to set on commit
+_PENDING_WAKEUPS = 'mail_sender_pending_wakeups'
+
+
+class MailDeliveryError(Exception):
+    """
+    Raised when an email could not be delivered. `permanent` errors (e.g. a
+    rejected recipient) are not retried.
+    """
+
+    def __init__(self, message, permanent=False):
+        super().__init__(message)
+        self.permanent = permanent
+
+
+class SendGridTransport:
+    """
+    Deliver emails through the SendGrid v3 mail send API.
+
+    One `requests.Session` is kept for the life of the transport, so
+    consecutive requests reuse pooled keep-alive connections. Emails with
+    the same subject and content are sent in one request, one
+    personalization per recipient. `api_url` can point to a local stand-in.
+
+    `requests` is imported when the first email is sent rather than at app
+    startup.
+    """
+
+    def __init__(self, api_key, from_email,
+                 api_url='https://api.sendgrid.com', timeout=10,
+                 pool_size=4):
+        self.from_email = from_email
+        self.url = api_url.rstrip('/') + '/v3/mail/send'
+        self.timeout = timeout
+        self._api_key = api_key
+        self._pool_size = pool_size
+        self._session = None
+        # Guards the creation of the session only; its connection pool
+        # lets up to `pool_size` requests run concurrently
+        self._lock = threading.Lock()
+
+    def send(self, emails) -> dict:
+        """
+        Send `emails` (objects with to_email, subject and html_content).
+
+        :return: A mapping of the index in `emails` of each email that
+            could not be sent to its `MailDeliveryError`.
+        """
+        groups = {}
+        for index, email in enumerate(emails):
+            groups.setdefault(
+                (email.subject, email.html_content), []).append(index)
+
+        errors = {}
+        for (subject, html_content), indexes in groups.items():
+            for start in range(
+                    0, len(indexes), SENDGRID_MAX_PERSONALIZATIONS):
+                chunk = indexes[start:start + SENDGRID_MAX_PERSONALIZATIONS]
+                payload = {
+                    'personalizations': [
+                        {'to': [{'email': emails[i].to_email}]}
+                        for i in chunk],
+                    'from': {'email': self.from_email},
+                    'subject': subject,
+                    'content': [{'type': 'text/html', 'value': html_content}],
+                }
+                try:
+                    self._post(payload)
+                except MailDeliveryError as e:
+                    errors.update((i, e) for i in chunk)
+        return errors
+
+    def _get_session(self):
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        with self._lock:
+            if self._session is None:
+                session = requests.Session()
+                session.headers['Authorization'] = f'Bearer {self._api_key}'
+                adapter = HTTPAdapter(
+                    pool_connections=1, pool_maxsize=self._pool_size)
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                self._session = session
+            return self._session
+
+    def _post(self, payload):
+        import requests
+
+        try:
+            response = self._get_session().post(
+                self.url, json=payload, timeout=self.timeout)
+        except requests.RequestException as e:
+            raise MailDeliveryError(f"SendGrid request failed: {e}")
+        if response.status_code >= 300:
+            # Throttling and server errors are worth retrying, other client
+            # errors will fail again
+            raise MailDeliveryError(
+                f"SendGrid returned {response.status_code}: "
+                f"{response.text[:500]}",
+                permanent=(
+                    response.status_code < 500
+                    and response.status_code != 429))
+
+
+class SMTPTransport:
+    """
+    Deliver emails to an SMTP server (e.g. SendGrid's SMTP relay or a local
+    stand-in), sending each batch over a single connection.
+    """
+
+    def __init__(self, host, port, from_email, username=None,
+                 password=None, use_tls=False, timeout=10):
+        self.host = host
+        self.port = port
+        self.from_email = from_email
+        self.username = username
+        self.password = password
+        self.use_tls = use_tls
+        self.timeout = timeout
+
+    def send(self, emails) -> dict:
+        """
+        Send `emails` (objects with to_email, subject and html_content).
+
+        :return: A mapping of the index in `emails` of each email that
+            could not be sent to its `MailDeliveryError`.
+        """
+        errors = {}
+        try:
+            with smtplib.SMTP(
+                    self.host, self.port, timeout=self.timeout) as smtp:
+                if self.use_tls:
+                    smtp.starttls()
+                if self.username:
+                    smtp.login(self.username, self.password)
+                for index, email in enumerate(emails):
+                    message = EmailMessage()
+                    message['From'] = self.from_email
+                    message['To'] = email.to_email
+                    message['Subject'] = email.subject
+                    message.set_content(email.html_content, subtype='html')
+                    try:
+                        smtp.send_message(message)
+                    except smtplib.SMTPRecipientsRefused as e:
+                        errors[index] = MailDeliveryError(
+                            f"Recipient refused: {e.recipients}",
+                            permanent=True)
+                    except smtplib.SMTPResponseException as e:
+                        errors[index] = MailDeliveryError(
+                            f"SMTP error {e.smtp_code}: {e.smtp_error}",
+                            permanent=500 <= e.smtp_code < 600)
+        except (OSError, smtplib.SMTPException) as e:
+            error = MailDeliveryError(f"SMTP delivery failed: {e}")
+            for index in range(len(emails)):
+                errors.setdefault(index, error)
+        return errors
+
+
+def build_mail_transport(config):
+    """Create the email transport described by the app config."""
+    name = config['MAIL_TRANSPORT']
+    if name == 'sendgrid':
+        return SendGridTransport(
+            api_key=config['SENDGRID_API_KEY'],
+            from_email=config['MAIL_FROM_EMAIL'],
+            api_url=config['SENDGRID_API_URL'],
+            timeout=config['MAIL_SEND_TIMEOUT'])
+    if name == 'smtp':
+        return SMTPTransport(
+            host=config['SMTP_HOST'],
+            port=config['SMTP_PORT'],
+            from_email=config['MAIL_FROM_EMAIL'],
+            username=config['SMTP_USERNAME'],
+            password=config['SMTP_PASSWORD'],
+            use_tls=config['SMTP_USE_TLS'],
+            timeout=config['MAIL_SEND_TIMEOUT'])
+    raise ValueError(f"Unknown mail transport: {name}")
+
+
+def get_mail_transport():
+    """Return the email transport of the current app."""
+    return current_app.extensions['mail_transport']
+
+
+def queue_email(to_email: str, subject: str,
+                html_content: str) -> OutboxEmail:
+    """Add an email to the outbox in the current transaction.
+
+    The email is delivered in the background once the transaction commits,
+    and never if it rolls back.
 
     Args:
         to_email (str): Recipient's email address
@@ -14,31 +212,38 @@ def send_email(to_email: str, subject: str, html_content: str) -> bool:
         html_content (str): HTML content of the email
 
     Returns:
-        bool: True if email was sent successfully, False otherwise
+        OutboxEmail: The queued email
     """
-    try:
-        sg = SendGridAPIClient(os.getenv('SENDGRID_API_KEY'))
-        from_email = Email(os.getenv('SENDGRID_FROM_EMAIL'))
-        recipient_email = To(to_email)
-        content = Content("text/html", html_content)
-        mail = Mail(from_email, recipient_email, subject, content)
-        sg.send(mail)
-        current_app.logger.info(f"Email sent successfully to {to_email}")
-        return True
-    except Exception as e:
-        current_app.logger.error(f"Failed to send email: {str(e)}")
-        return False
+    email = OutboxEmail(
+        to_email=to_email, subject=subject, html_content=html_content)
+    db.session.add(email)
+    wakeup = current_app.extensions.get('mail_outbox_wakeup')
+    if wakeup is not None:
+        db.session().info.setdefault(_PENDING_WAKEUPS, set()).add(wakeup)
+    return email
+
+
+@event.listens_for(Session, 'after_commit')
+def _wake_outbox_sender(session):
+    for wakeup in session.info.pop(_PENDING_WAKEUPS, ()):
+        wakeup.set()
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_outbox_wakeups(session):
+    session.info.pop(_PENDING_WAKEUPS, None)
 
 
-def send_reset_password_email(to_email: str, reset_token: str) -> bool:
-    """Send a password reset email using SendGrid API.
+def queue_reset_password_email(to_email: str,
+                               reset_token: str) -> OutboxEmail:
+    """Add a password reset email to the outbox in the current transaction.
 
     Args:
         to_email (str): Recipient's email address
         reset_token (str): Password reset token
 
     Returns:
-        bool: True if email was sent successfully, False otherwise
+        OutboxEmail: The queued email
     """
     frontend_url = os.getenv('FRONTEND_URL')
     reset_url = f"{frontend_url}/reset-password?token={reset_token}"
@@ -55,4 +260,4 @@ def send_reset_password_email(to_email: str, reset_token: str) -> bool:
         </body>
     </html>
     """
-    return send_email(to_email, subject, html_content)
+    return queue_email(to_email, subject, html_content)
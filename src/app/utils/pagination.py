@@ -0,0 +1,111 @@
+import base64
+import json
+from datetime import datetime
+
+from sqlalchemy import and_, or_
+from sqlalchemy.types import DateTime
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a pagination cursor or limit cannot be parsed."""
+
+
+def encode_cursor(values) -> str:
+    """
+    Encode the sort-key values of the last row of a page into an opaque,
+    URL-safe cursor string.
+    """
+    payload = [
+        value.isoformat() if isinstance(value, datetime) else value
+        for value in values
+    ]
+    raw = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str, keys) -> list:
+    """
+    Decode a cursor produced by `encode_cursor` back into sort-key values.
+
+    :param cursor: The opaque cursor string sent by the client.
+    :param keys: The column expressions the page is ordered by.
+    :return: A list of values, one per key.
+    :raises InvalidCursorError: If the cursor is malformed.
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded))
+        if not isinstance(payload, list) or len(payload) != len(keys):
+            raise ValueError('Cursor does not match the sort keys')
+        return [
+            datetime.fromisoformat(value)
+            if isinstance(key.type, DateTime) and value is not None
+            else value
+            for key, value in zip(keys, payload)
+        ]
+    except (ValueError, TypeError) as e:
+        raise InvalidCursorError('Invalid cursor') from e
+
+
+def parse_page_args(args):
+    """
+    Read `cursor` and `limit` from the request query string.
+
+    :return: A tuple of (cursor, limit).
+    :raises InvalidCursorError: If the limit is not a positive integer.
+    """
+    cursor = args.get('cursor') or None
+    try:
+        limit = int(args.get('limit', DEFAULT_PAGE_SIZE))
+    except (TypeError, ValueError) as e:
+        raise InvalidCursorError('Limit must be an integer') from e
+    if limit < 1:
+        raise InvalidCursorError('Limit must be a positive integer')
+    return cursor, min(limit, MAX_PAGE_SIZE)
+
+
+def keyset_paginate(query, keys, cursor=None, limit=DEFAULT_PAGE_SIZE,
+                    cursor_values=None, descending=True):
+    """
+    Fetch one page of `query` ordered by `keys`, descending by default.
+
+    The last key must be unique (usually the primary key) so the ordering is
+    stable and no row is skipped or repeated between pages.
+
+    :param query: The query to paginate.
+    :param keys: Model attributes to order by, most significant first.
+    :param cursor: The cursor returned with the previous page, if any.
+    :param limit: The maximum number of rows to return.
+    :param cursor_values: Returns the values of `keys` for a row; by default
+        they are read from the row's attributes of the same name.
+    :param descending: Order by `keys` descending (True) or ascending.
+    :return: A tuple of (items, next_cursor). next_cursor is None on the
+        last page.
+    """
+    if cursor:
+        values = decode_cursor(cursor, keys)
+        conditions = []
+        for i, key in enumerate(keys):
+            equal_prefix = [keys[j] == values[j] for j in range(i)]
+            after = key < values[i] if descending else key > values[i]
+            conditions.append(and_(*equal_prefix, after))
+        query = query.filter(or_(*conditions))
+
+    items = (
+        query
+        .order_by(*[key.desc() if descending else key.asc() for key in keys])
+        .limit(limit + 1)
+        .all()
+    )
+    next_cursor = None
+    if len(items) > limit:
+        items = items[:limit]
+        if cursor_values is None:
+            values = [getattr(items[-1], key.key) for key in keys]
+        else:
+            values = cursor_values(items[-1])
+        next_cursor = encode_cursor(values)
+    return items, next_cursor
@@ -0,0 +1,78 @@
+import os
+import threading
+
+import bcrypt
+from flask import current_app
+
+from src.app.utils.process_pool import ProcessPool
+
+
+class PasswordHasherBusy(Exception):
+    """Raised when too many password hashes are already queued."""
+
+
+def _hash_password(password: bytes, rounds: int) -> str:
+    return bcrypt.hashpw(password, bcrypt.gensalt(rounds)).decode('utf-8')
+
+
+def _check_password(password: bytes, password_hash: bytes) -> bool:
+    return bcrypt.checkpw(password, password_hash)
+
+
+def get_cost(password_hash: str) -> int:
+    """Return the work factor of a bcrypt hash ('$2b$<cost>$...')."""
+    return int(password_hash.split('$')[2])
+
+
+class PasswordHasher:
+    """
+    Run bcrypt in a bounded pool of worker processes so that a burst of
+    logins cannot occupy every request thread.
+
+    At most `max_pending` operations may be queued or running at once;
+    beyond that `PasswordHasherBusy` is raised instead of queueing more
+    work. With `workers=0` hashing runs inline, which is meant for tests
+    and single-user scripts.
+    """
+
+    def __init__(self, rounds=12, workers=None, max_pending=None):
+        self.rounds = rounds
+        if workers is None:
+            workers = os.cpu_count() or 1
+        self.workers = workers
+        self.max_pending = max_pending or max(self.workers, 1) * 4
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._pool = ProcessPool(self.workers)
+
+    def hash(self, password: str) -> str:
+        """Hash `password` with the configured work factor."""
+        return self._run(_hash_password, password.encode('utf-8'), self.rounds)
+
+    def check(self, password_hash: str, password: str) -> bool:
+        """Check `password` against a bcrypt hash."""
+        return self._run(
+            _check_password, password.encode('utf-8'),
+            password_hash.encode('utf-8'))
+
+    def needs_rehash(self, password_hash: str) -> bool:
+        """Whether the hash was made with another work factor."""
+        return get_cost(password_hash) != self.rounds
+
+    def _run(self, func, *args):
+        if not self._slots.acquire(blocking=False):
+            raise PasswordHasherBusy("Too many password operations queued")
+        try:
+            if not self.workers:
+                return func(*args)
+            return self._pool.submit(func, *args).result()
+        finally:
+            self._slots.release()
+
+    def shutdown(self):
+        """Stop the worker processes started by this process, if any."""
+        self._pool.shutdown()
+
+
+def get_password_hasher() -> PasswordHasher:
+    """Return the password hasher of the current app."""
+    return current_app.extensions['password_hasher']
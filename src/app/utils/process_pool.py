@@ -0,0 +1,41 @@
+import atexit
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+
+
+class ProcessPool:
+    """
+    A pool of `workers` spawned processes, started on first use in each
+    process and stopped at interpreter exit (or by `shutdown`).
+    """
+
+    def __init__(self, workers):
+        self.workers = workers
+        self._executor = None
+        self._executor_pid = None
+        self._lock = threading.Lock()
+
+    def submit(self, func, *args) -> Future:
+        return self._get_executor().submit(func, *args)
+
+    def shutdown(self):
+        """Stop the worker processes started by this process, if any."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None and self._executor_pid == os.getpid():
+            executor.shutdown(wait=True, cancel_futures=True)
+        atexit.unregister(self.shutdown)
+
+    def _get_executor(self):
+        # A pool inherited through fork() is unusable, so each process
+        # starts its own on first use
+        with self._lock:
+            if self._executor is None or self._executor_pid != os.getpid():
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context('spawn'))
+                self._executor_pid = os.getpid()
+                atexit.register(self.shutdown)
+            return self._executor
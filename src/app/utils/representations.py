@@ -0,0 +1,60 @@
+import json
+from datetime import date, datetime, time
+from decimal import Decimal
+from uuid import UUID
+
+from flask import current_app, make_response
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None
+
+
+def _default(value):
+    """Encode the types the stdlib encoder does not know about."""
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, UUID):
+        return str(value)
+    raise TypeError(
+        f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps_stdlib(data, indent=None) -> bytes:
+    return json.dumps(
+        data, default=_default, indent=indent).encode('utf-8') + b'\n'
+
+
+def dumps_orjson(data, indent=None) -> bytes:
+    # orjson handles datetimes and UUIDs natively; integer dict keys are
+    # turned into strings as the stdlib encoder does
+    option = orjson.OPT_NON_STR_KEYS | orjson.OPT_APPEND_NEWLINE
+    if indent:
+        option |= orjson.OPT_INDENT_2
+    return orjson.dumps(data, default=_default, option=option)
+
+
+def dumps(data, indent=None) -> bytes:
+    """Encode `data` with orjson when it is installed, stdlib json if not."""
+    if orjson is not None and current_app.config.get('JSON_FAST_ENCODER'):
+        return dumps_orjson(data, indent)
+    return dumps_stdlib(data, indent)
+
+
+def output_json(data, code, headers=None):
+    """
+    flask-restx representation of `application/json` responses, replacing
+    its stdlib based default with `dumps`.
+    """
+    indent = 4 if current_app.debug else None
+    response = make_response(dumps(data, indent), code)
+    response.headers.extend(headers or {})
+    return response
+
+
+def register_representations(*apis):
+    for api in apis:
+        api.representation('application/json')(output_json)
@@ -0,0 +1,85 @@
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+from flask import current_app
+
+from src.app import db
+from src.app.models import TokenBlocklist
+
+
+class TokenRevocationCache:
+    """
+    Per-process copy of the revoked token IDs (jti) of `TokenBlocklist`.
+
+    Checks are answered from memory. The copy is refreshed incrementally
+    from the table at most every `refresh_interval` seconds, reading only
+    the rows created since the last refresh (minus a `lookback` margin
+    covering transactions that committed after a refresh but were stamped
+    before it). A token revoked through another worker is therefore
+    rejected here within `refresh_interval` seconds; tokens revoked through
+    this worker are rejected immediately.
+
+    Entries are dropped once their token has expired, since an expired
+    token is rejected anyway.
+    """
+
+    def __init__(self, refresh_interval=2.0, lookback=timedelta(seconds=30)):
+        self.refresh_interval = refresh_interval
+        self.lookback = lookback
+        # jti -> naive UTC expiry (None when unknown)
+        self._jtis = {}
+        self._watermark = None
+        self._next_refresh = 0.0
+        self._lock = threading.Lock()
+
+    def is_revoked(self, jti: str) -> bool:
+        if time.monotonic() >= self._next_refresh:
+            self.refresh(only_if_due=True)
+        return jti in self._jtis
+
+    def add(self, jti: str, expires_at=None):
+        """Record a token revoked by this process."""
+        with self._lock:
+            self._jtis[jti] = _naive_utc(expires_at)
+
+    def refresh(self, only_if_due=False):
+        """
+        Load the revocations created since the last refresh and forget the
+        expired ones.
+        """
+        with self._lock:
+            # Another thread may have refreshed while we waited
+            if only_if_due and time.monotonic() < self._next_refresh:
+                return
+            query = db.session.query(
+                TokenBlocklist.jti, TokenBlocklist.created_at,
+                TokenBlocklist.expires_at)
+            if self._watermark is not None:
+                query = query.filter(
+                    TokenBlocklist.created_at
+                    >= self._watermark - self.lookback)
+            for jti, created_at, expires_at in query:
+                self._jtis[jti] = _naive_utc(expires_at)
+                if self._watermark is None or created_at > self._watermark:
+                    self._watermark = created_at
+
+            now = _naive_utc(datetime.now(timezone.utc))
+            expired = [
+                jti for jti, expires_at in self._jtis.items()
+                if expires_at is not None and expires_at < now]
+            for jti in expired:
+                del self._jtis[jti]
+            self._next_refresh = time.monotonic() + self.refresh_interval
+
+
+def _naive_utc(value):
+    # The database stores naive UTC datetimes
+    if value is not None and value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def get_revocation_cache() -> TokenRevocationCache:
+    """Return the token revocation cache of the current app."""
+    return current_app.extensions['revocation_cache']
@@ -0,0 +1,107 @@
+from datetime import date, datetime, timedelta, timezone
+
+from sqlalchemy import func
+
+from src.app import db
+from src.app.models import ArtworkDailyStats
+
+GRANULARITIES = ('day', 'week', 'month')
+DEFAULT_RANGE_DAYS = 30
+MAX_RANGE_DAYS = 3 * 366
+
+
+class InvalidStatsQueryError(ValueError):
+    """Raised when the stats range or granularity is malformed."""
+
+
+def parse_stats_args(args):
+    """
+    Read `from`, `to` (YYYY-MM-DD, inclusive) and `granularity` from the
+    request query string. The range defaults to the last 30 days (UTC).
+
+    :return: A tuple of (start, end, granularity).
+    :raises InvalidStatsQueryError: If a value is malformed.
+    """
+    try:
+        end = date.fromisoformat(args['to']) if args.get('to') else (
+            datetime.now(timezone.utc).date())
+        start = date.fromisoformat(args['from']) if args.get('from') else (
+            end - timedelta(days=DEFAULT_RANGE_DAYS - 1))
+    except ValueError:
+        raise InvalidStatsQueryError('Dates must be formatted YYYY-MM-DD')
+    if start > end:
+        raise InvalidStatsQueryError('from must not be after to')
+    if (end - start).days >= MAX_RANGE_DAYS:
+        raise InvalidStatsQueryError(
+            f'The range cannot exceed {MAX_RANGE_DAYS} days')
+    granularity = args.get('granularity') or 'day'
+    if granularity not in GRANULARITIES:
+        raise InvalidStatsQueryError(
+            f"granularity must be one of {', '.join(GRANULARITIES)}")
+    return start, end, granularity
+
+
+def period_start(day: date, granularity: str) -> date:
+    """The first day of the period `day` falls in (weeks start on Monday)."""
+    if granularity == 'week':
+        return day - timedelta(days=day.weekday())
+    if granularity == 'month':
+        return day.replace(day=1)
+    return day
+
+
+def _periods(start, end, granularity):
+    period = period_start(start, granularity)
+    while period <= end:
+        yield period
+        if granularity == 'day':
+            period += timedelta(days=1)
+        elif granularity == 'week':
+            period += timedelta(weeks=1)
+        else:
+            period = (period + timedelta(days=32)).replace(day=1)
+
+
+def artist_stats(artist_id, start, end, granularity='day', artwork_id=None):
+    """
+    Summarize an artist's upvotes and comments between `start` and `end`
+    (inclusive) from the daily rollup only: one range scan summing the
+    artworks per day, bucketed into periods here.
+
+    Returns:
+        dict: The totals and one entry per period, including empty ones.
+    """
+    query = (
+        db.session.query(
+            ArtworkDailyStats.day,
+            func.sum(ArtworkDailyStats.upvotes),
+            func.sum(ArtworkDailyStats.comments))
+        .filter(
+            ArtworkDailyStats.artist_id == artist_id,
+            ArtworkDailyStats.day.between(start, end))
+        .group_by(ArtworkDailyStats.day)
+    )
+    if artwork_id is not None:
+        query = query.filter(ArtworkDailyStats.artwork_id == artwork_id)
+
+    series = {
+        period: {'upvotes': 0, 'comments': 0}
+        for period in _periods(start, end, granularity)
+    }
+    for day, upvotes, comments in query:
+        bucket = series[period_start(day, granularity)]
+        bucket['upvotes'] += upvotes
+        bucket['comments'] += comments
+    return {
+        'from': start.isoformat(),
+        'to': end.isoformat(),
+        'granularity': granularity,
+        'totals': {
+            'upvotes': sum(p['upvotes'] for p in series.values()),
+            'comments': sum(p['comments'] for p in series.values()),
+        },
+        'series': [
+            {'period': period.isoformat(), **counts}
+            for period, counts in series.items()
+        ],
+    }
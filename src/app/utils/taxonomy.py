@@ -0,0 +1,96 @@
+from sqlalchemy import insert
+from sqlalchemy.dialects import postgresql, sqlite
+
+from src.app import db
+from src.app.models.art import normalize_title
+from src.app.utils.cache import get_reference_cache, get_taxonomy_cache
+
+# Reference cache entry listing the rows of each table
+_REFERENCE_KEYS = {'tag': 'tags', 'category': 'categories'}
+
+
+class UnresolvedTitleError(LookupError):
+    """
+    Raised when a title can neither be found by its key nor inserted, i.e.
+    an existing row has the same title but a different `title_key`.
+    """
+
+
+def insert_ignoring_conflicts(model):
+    """
+    An INSERT of `model` rows that skips the rows conflicting with a unique
+    constraint instead of failing, on the dialects supporting it.
+    """
+    dialect = db.session.get_bind().dialect.name
+    if dialect == 'postgresql':
+        return postgresql.insert(model).on_conflict_do_nothing()
+    if dialect == 'sqlite':
+        return sqlite.insert(model).on_conflict_do_nothing()
+    return insert(model)
+
+
+def resolve_titles(model, titles) -> dict:
+    """
+    Map tag or category titles to their IDs, creating the missing rows.
+
+    Titles are matched by their normalized form (`normalize_title`). IDs
+    are served from the per-process taxonomy cache first; the others are
+    read with one `IN` query, and the missing rows are inserted with one
+    INSERT ... ON CONFLICT DO NOTHING and read back, so a row created
+    concurrently by another request is reused instead of failing on the
+    unique constraint.
+
+    Args:
+        model: `Tag` or `Category`.
+        titles (Iterable[str]): The titles to resolve.
+
+    Returns:
+        dict: A mapping of normalized title to ID, holding every title.
+
+    Raises:
+        UnresolvedTitleError: If a title could not be resolved.
+    """
+    wanted = {}
+    for title in titles:
+        if title and title.strip():
+            wanted.setdefault(normalize_title(title), title.strip())
+    if not wanted:
+        return {}
+
+    cache = get_taxonomy_cache()
+    namespace = model.__tablename__
+    ids = {}
+    for key in wanted:
+        cached = cache.get((namespace, key))
+        if cached is not None:
+            ids[key] = cached
+    missing = [key for key in wanted if key not in ids]
+    if not missing:
+        return ids
+
+    def read(keys):
+        return dict(
+            db.session.query(model.title_key, model.id)
+            .filter(model.title_key.in_(keys))
+            .all()
+        )
+
+    found = read(missing)
+    new = [key for key in missing if key not in found]
+    if new:
+        db.session.execute(
+            insert_ignoring_conflicts(model),
+            [{'title': wanted[key], 'title_key': key} for key in new])
+        found.update(read(new))
+        unresolved = [wanted[key] for key in new if key not in found]
+        if unresolved:
+            raise UnresolvedTitleError(
+                f"Could not resolve {namespace} title(s) "
+                f"{', '.join(map(repr, unresolved))}: a row with the same "
+                f"title has a different title_key")
+        get_reference_cache().invalidate_on_commit(
+            db.session, _REFERENCE_KEYS[namespace])
+    cache.set_on_commit(
+        db.session, {(namespace, key): id for key, id in found.items()})
+    ids.update(found)
+    return ids
@@ -1,5 +1,6 @@
 from datetime import timedelta
 import os
+import tempfile
 from pathlib import Path
 
 
@@ -20,6 +21,98 @@ class Config:
     JWT_BLOCKLIST_ENABLED = True
     # TODO: Add refresh token too.
     JWT_BLOCKLIST_TOKEN_CHECKS = ['access']
+    # Seconds between refreshes of each worker's in-memory blocklist copy;
+    # a token revoked on another worker is accepted at most this long
+    JWT_REVOCATION_REFRESH_SECONDS = float(
+        os.getenv('JWT_REVOCATION_REFRESH_SECONDS', 2))
+    # Seconds between automatic prunes of expired blocklist rows in each
+    # worker, 0 to rely on `flask prune-blocklist` (e.g. from cron) only
+    TOKEN_BLOCKLIST_PRUNE_INTERVAL = int(
+        os.getenv('TOKEN_BLOCKLIST_PRUNE_INTERVAL', 3600))
+    # bcrypt work factor of new password hashes; older hashes are upgraded
+    # on login
+    BCRYPT_LOG_ROUNDS = int(os.getenv('BCRYPT_LOG_ROUNDS', 12))
+    # Worker processes hashing passwords (0 hashes inline) and how many
+    # hashes may be queued before requests are rejected with a 503
+    PASSWORD_HASH_WORKERS = int(
+        os.getenv('PASSWORD_HASH_WORKERS', os.cpu_count() or 1))
+    PASSWORD_HASH_MAX_PENDING = int(
+        os.getenv('PASSWORD_HASH_MAX_PENDING', 32))
+    # Seconds each worker trusts its cached copy of a user's role version;
+    # a token issued before a role change is refused after at most this long
+    ROLE_CACHE_TTL = int(os.getenv('ROLE_CACHE_TTL', 30))
+    # Seconds the tag, category and currency lists are cached per process
+    REFERENCE_CACHE_TTL = int(os.getenv('REFERENCE_CACHE_TTL', 300))
+    # Serialized artwork details cache: 'lru' (per process) or 'redis'
+    ARTWORK_CACHE_BACKEND = os.getenv('ARTWORK_CACHE_BACKEND', 'lru')
+    ARTWORK_CACHE_REDIS_URL = os.getenv(
+        'ARTWORK_CACHE_REDIS_URL', 'redis://localhost:6379/0')
+    ARTWORK_CACHE_SIZE = int(os.getenv('ARTWORK_CACHE_SIZE', 1024))
+    ARTWORK_CACHE_TTL = int(os.getenv('ARTWORK_CACHE_TTL', 3600))
+    # Encode API responses with orjson when it is installed (falls back to
+    # the stdlib json module otherwise)
+    JSON_FAST_ENCODER = os.getenv(
+        'JSON_FAST_ENCODER', 'true').lower() in ('1', 'true', 'yes')
+    # Largest number of artworks accepted by one bulk import, and how many
+    # are inserted per executemany batch
+    BULK_IMPORT_MAX_ROWS = int(os.getenv('BULK_IMPORT_MAX_ROWS', 1000))
+    BULK_IMPORT_BATCH_SIZE = int(os.getenv('BULK_IMPORT_BATCH_SIZE', 500))
+    # Artworks loaded per query chunk by the NDJSON catalog export
+    CATALOG_EXPORT_CHUNK_SIZE = int(
+        os.getenv('CATALOG_EXPORT_CHUNK_SIZE', 500))
+    # Uploaded artwork images: where they are stored, the largest accepted
+    # upload, the widths of the generated WebP variants and the number of
+    # processes generating them (0 generates them inline)
+    UPLOAD_FOLDER = os.getenv(
+        'UPLOAD_FOLDER', os.path.join(base_dir, 'uploads'))
+    MAX_IMAGE_UPLOAD_BYTES = int(
+        os.getenv('MAX_IMAGE_UPLOAD_BYTES', 20 * 1024 * 1024))
+    IMAGE_VARIANT_WIDTHS = tuple(
+        int(width) for width in
+        os.getenv('IMAGE_VARIANT_WIDTHS', '160,480,960,1600').split(','))
+    IMAGE_WORKERS = int(os.getenv('IMAGE_WORKERS', 2))
+    # Transactional email: 'sendgrid' (HTTP API) or 'smtp'. SENDGRID_API_URL
+    # and the SMTP settings can point to a local stand-in in development
+    MAIL_TRANSPORT = os.getenv('MAIL_TRANSPORT', 'sendgrid')
+    MAIL_FROM_EMAIL = (
+        os.getenv('MAIL_FROM_EMAIL') or os.getenv('SENDGRID_FROM_EMAIL'))
+    SENDGRID_API_KEY = os.getenv('SENDGRID_API_KEY')
+    SENDGRID_API_URL = os.getenv(
+        'SENDGRID_API_URL', 'https://api.sendgrid.com')
+    SMTP_HOST = os.getenv('SMTP_HOST', 'localhost')
+    SMTP_PORT = int(os.getenv('SMTP_PORT', 25))
+    SMTP_USERNAME = os.getenv('SMTP_USERNAME')
+    SMTP_PASSWORD = os.getenv('SMTP_PASSWORD')
+    SMTP_USE_TLS = os.getenv(
+        'SMTP_USE_TLS', 'false').lower() in ('1', 'true', 'yes')
+    MAIL_SEND_TIMEOUT = int(os.getenv('MAIL_SEND_TIMEOUT', 10))
+    # Email outbox delivery: seconds between polls of each worker's sender
+    # (0 to rely on `flask send-outbox` only), emails per batch, attempts
+    # before giving up, the first retry delay (doubled after each failure,
+    # up to the max), how long a sender may hold a batch and how long sent
+    # emails are kept (their content is cleared once sent)
+    MAIL_OUTBOX_INTERVAL = int(os.getenv('MAIL_OUTBOX_INTERVAL', 30))
+    MAIL_BATCH_SIZE = int(os.getenv('MAIL_BATCH_SIZE', 15))
+    MAIL_MAX_ATTEMPTS = int(os.getenv('MAIL_MAX_ATTEMPTS', 8))
+    MAIL_RETRY_DELAY = int(os.getenv('MAIL_RETRY_DELAY', 30))
+    MAIL_RETRY_MAX_DELAY = int(os.getenv('MAIL_RETRY_MAX_DELAY', 3600))
+    MAIL_CLAIM_TIMEOUT = int(os.getenv('MAIL_CLAIM_TIMEOUT', 300))
+    MAIL_SENT_RETENTION = int(
+        os.getenv('MAIL_SENT_RETENTION', 7 * 24 * 3600))
+    # Startup database initialization (see `initialize_database`): 'auto'
+    # leaves databases managed by Alembic to `flask db upgrade`, 'create'
+    # always creates the missing tables, 'none' skips it for workers of a
+    # deployment running `flask init-db` once
+    DB_INIT_MODE = os.getenv('DB_INIT_MODE', 'auto')
+    MIGRATIONS_DIR = os.path.join(base_dir, 'migrations')
+    # Currency that `Artwork.price_base` is expressed in; catalog price
+    # filters and sorting use it
+    BASE_CURRENCY_CODE = os.getenv('BASE_CURRENCY_CODE', 'USD')
+    # Seconds between re-decays of the hot ranking in each worker. Off by
+    # default: every worker would repeat the same full recompute, so run
+    # `flask decay-hot-scores` once per deployment from cron instead
+    HOT_SCORE_DECAY_INTERVAL = int(
+        os.getenv('HOT_SCORE_DECAY_INTERVAL', 0))
 
 
 class TestingConfig(Config):
@@ -29,5 +122,14 @@ class TestingConfig(Config):
     """
     TESTING = True
     SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+    TOKEN_BLOCKLIST_PRUNE_INTERVAL = 0
+    HOT_SCORE_DECAY_INTERVAL = 0
+    MAIL_OUTBOX_INTERVAL = 0
+    DB_INIT_MODE = 'create'
+    BCRYPT_LOG_ROUNDS = 4
+    PASSWORD_HASH_WORKERS = 0
+    IMAGE_WORKERS = 0
+    UPLOAD_FOLDER = os.path.join(
+        tempfile.gettempdir(), 'art-gallery-test-uploads')
     JWT_SECRET_KEY = 'test-secret-key'
     SECRET_KEY = 'test-secret-key'
@@ -0,0 +1,75 @@
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import update
+
+from src.app.models import ArtworkScore
+from src.app.models.art import Upvote, hot_weight
+
+# Upvotes older than this weigh less than 1e-4 and are left out
+HOT_SCORE_HORIZON = timedelta(days=7)
+
+
+def decay_hot_scores(app, db, batch_size=1000):
+    """
+    Recompute the hot score of every artwork from its recent upvotes.
+
+    The upvotes are streamed `batch_size` rows at a time and summed in
+    memory; the scores are then rewritten with batched executemany UPDATEs
+    in a single transaction, so readers never see a half-decayed ranking.
+
+    Returns:
+        int: The number of artworks with a non-zero score.
+    """
+    with app.app_context():
+        now = datetime.now(timezone.utc)
+        scores = defaultdict(float)
+        # Upvotes of deleted artworks outlive them; joining the scores
+        # leaves them out, as only existing rows can be updated
+        upvotes = (
+            db.session.query(Upvote.target_id, Upvote.created_at)
+            .join(ArtworkScore, ArtworkScore.artwork_id == Upvote.target_id)
+            .filter(
+                Upvote.target_type == 'artwork',
+                Upvote.created_at >= now - HOT_SCORE_HORIZON)
+            .yield_per(batch_size)
+        )
+        for artwork_id, created_at in upvotes:
+            scores[artwork_id] += hot_weight(created_at, now)
+
+        db.session.execute(
+            update(ArtworkScore)
+            .where(ArtworkScore.score != 0)
+            .values(score=0, decayed_at=now)
+            .execution_options(synchronize_session=False))
+        rows = [
+            {'artwork_id': artwork_id, 'score': score, 'decayed_at': now}
+            for artwork_id, score in scores.items()
+        ]
+        for start in range(0, len(rows), batch_size):
+            db.session.execute(
+                update(ArtworkScore), rows[start:start + batch_size])
+        db.session.commit()
+        print(f"Decayed the hot scores of {len(rows)} artwork(s).")
+    return len(rows)
+
+
+def start_hot_score_decayer(app, db, interval):
+    """
+    Re-decay the hot scores every `interval` seconds in a daemon thread of
+    the current process.
+    """
+    def run():
+        while True:
+            time.sleep(interval)
+            try:
+                decay_hot_scores(app, db)
+            except Exception as e:
+                app.logger.error(f"Failed to decay hot scores: {e}")
+
+    thread = threading.Thread(
+        target=run, name='hot-score-decayer', daemon=True)
+    thread.start()
+    return thread
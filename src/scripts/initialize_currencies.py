@@ -1,35 +1,59 @@
-from src.app.models import Currency
+from datetime import datetime, timezone
+
+from sqlalchemy import literal, select
+
+from src.app.models import Currency, ExchangeRate
+from src.app.utils.currency import reprice_artworks
+from src.app.utils.taxonomy import insert_ignoring_conflicts
+
+CURRENCIES = [
+    {"id": 1, "title": "Euro", "symbol": "€", "code": "EUR"},
+    {"id": 2, "title": "United States Dollar",
+     "symbol": "$", "code": "USD"},
+    {"id": 3, "title": "Canadian Dollar", "symbol": "C$", "code": "CAD"},
+    {"id": 4, "title": "Iranian Rial", "symbol": "﷼", "code": "IRR"},
+    {"id": 5, "title": "Toman", "symbol": "تومان", "code": "TOMAN"},
+    {"id": 7, "title": "Pound Sterling", "symbol": "£", "code": "GBP"},
+    {"id": 8, "title": "Yen", "symbol": "¥", "code": "JPY"},
+    {"id": 9, "title": "Ruble", "symbol": "₽", "code": "RUB"},
+]
 
 
 def initialize_currencies(app, db):
     '''
     Initialize the IRR, USD, CAD, EUR currencies in the Currency table
+
+    The currencies, then the exchange rate of the base currency, are each
+    written with one INSERT ... ON CONFLICT DO NOTHING, so existing rows are
+    left untouched and running it again is a no-op. When the base rate is
+    created, the artworks priced in the base currency are repriced.
     '''
-    currencies = [
-        {"id": 1, "title": "Euro", "symbol": "€", "code": "EUR"},
-        {"id": 2, "title": "United States Dollar",
-         "symbol": "$", "code": "USD"},
-        {"id": 3, "title": "Canadian Dollar", "symbol": "C$", "code": "CAD"},
-        {"id": 4, "title": "Iranian Rial", "symbol": "﷼", "code": "IRR"},
-        {"id": 5, "title": "Toman", "symbol": "تومان", "code": "TOMAN"},
-        {"id": 7, "title": "Pound Sterling", "symbol": "£", "code": "GBP"},
-        {"id": 8, "title": "Yen", "symbol": "¥", "code": "JPY"},
-        {"id": 9, "title": "Ruble", "symbol": "₽", "code": "RUB"},
-    ]
     with app.app_context():
-        for currency in currencies:
-            # Check if the currency exist
-            existing_currency = Currency.query.filter_by(
-                title=currency["title"]
-            ).first()
-            if not existing_currency:
-                # Create the currency if it doesn't exist
-                new_currency = Currency(
-                    id=currency["id"],
-                    title=currency["title"],
-                    symbol=currency["symbol"],
-                    code=currency["code"],
-                )
-                db.session.add(new_currency)
+        currencies = CURRENCIES
+        upsert = db.session.get_bind().dialect.name in ('postgresql', 'sqlite')
+        if not upsert:
+            existing = set(db.session.scalars(select(Currency.title)))
+            currencies = [
+                c for c in currencies if c["title"] not in existing]
+        if currencies:
+            db.session.execute(
+                insert_ignoring_conflicts(Currency).values(currencies))
+
+        # The base currency is always worth exactly one unit of itself
+        base = select(
+            Currency.id, literal(1.0), literal(datetime.now(timezone.utc))
+        ).where(Currency.code == app.config['BASE_CURRENCY_CODE'])
+        if not upsert:
+            base = base.where(~Currency.exchange_rate.has())
+        inserted = db.session.execute(
+            insert_ignoring_conflicts(ExchangeRate).from_select(
+                ['currency_id', 'rate', 'updated_at'], base))
+        if inserted.rowcount:
+            # Artworks created before the rate existed have no price_base
+            reprice_artworks(db.session.scalars(
+                select(Currency.id).where(
+                    Currency.code == app.config['BASE_CURRENCY_CODE'])
+            ).all())
         db.session.commit()
+        app.extensions['reference_cache'].invalidate('currencies')
         print("Currencies initialized successfully.")
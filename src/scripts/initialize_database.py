@@ -0,0 +1,126 @@
+import hashlib
+import os
+import re
+import tempfile
+from contextlib import contextmanager
+
+from sqlalchemy import func, inspect, select, text
+
+from src.scripts.initialize_currencies import initialize_currencies
+from src.scripts.initialize_roles import initialize_roles
+
+# Modes of `initialize_database`, set with DB_INIT_MODE
+DB_INIT_MODES = ('auto', 'create', 'none')
+
+# `revision = '...'` and `down_revision = ...` lines of the revision files
+_REVISION_LINE = re.compile(
+    r"^(revision|down_revision)\b[^=\n]*=(.*)$", re.MULTILINE)
+
+
+@contextmanager
+def initialization_lock(app, db):
+    """
+    Hold a lock shared by every process initializing the same database, so
+    that workers started together do not create tables or seed rows
+    concurrently.
+
+    PostgreSQL databases use an advisory lock; other databases a lock file
+    in the temporary directory (no lock where `fcntl` is unavailable).
+    """
+    uri = app.config['SQLALCHEMY_DATABASE_URI']
+    key = int.from_bytes(
+        hashlib.sha256(uri.encode()).digest()[:8], 'big', signed=True)
+    if db.engine.dialect.name == 'postgresql':
+        with db.engine.connect() as connection:
+            connection.execute(select(func.pg_advisory_lock(key)))
+            try:
+                yield
+            finally:
+                connection.execute(select(func.pg_advisory_unlock(key)))
+                connection.commit()
+        return
+    try:
+        import fcntl
+    except ImportError:
+        yield
+        return
+    path = os.path.join(
+        tempfile.gettempdir(), f'art-gallery-init-{key & 0xffffffff:08x}.lock')
+    with open(path, 'w') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def _migration_heads(app):
+    """
+    The head revisions of the migrations: those no other revision follows.
+    They are read from the revision files rather than through alembic, so
+    starting a worker does not import it.
+    """
+    versions = os.path.join(app.config['MIGRATIONS_DIR'], 'versions')
+    revisions, parents = set(), set()
+    for name in os.listdir(versions):
+        if not name.endswith('.py'):
+            continue
+        with open(os.path.join(versions, name), encoding='utf-8') as f:
+            source = f.read()
+        for key, value in _REVISION_LINE.findall(source):
+            ids = re.findall(r"['\"]([^'\"]+)['\"]", value)
+            (revisions if key == 'revision' else parents).update(ids)
+    return revisions - parents
+
+
+def _stamp_head(app, db):
+    from alembic.runtime.migration import MigrationContext
+    from alembic.script import ScriptDirectory
+    with db.engine.begin() as connection:
+        MigrationContext.configure(connection).stamp(
+            ScriptDirectory(app.config['MIGRATIONS_DIR']), 'head')
+
+
+def initialize_database(app, db, mode=None):
+    """
+    Create the tables and seed the roles and currencies, as configured by
+    `mode` (DB_INIT_MODE by default):
+
+    - 'auto': databases managed by Alembic are left to `flask db upgrade`;
+      they are seeded only when at the latest revision. Other databases
+      get the missing tables, and an empty one is stamped with the latest
+      revision, since its tables now match the models.
+    - 'create': create the missing tables and seed, without looking at
+      Alembic (used by the tests).
+    - 'none': do nothing, for workers of a deployment that runs
+      `flask init-db` once before starting them.
+
+    Alembic is only imported to stamp an empty database, as importing it
+    takes longer than the rest of the startup.
+    """
+    mode = mode or app.config['DB_INIT_MODE']
+    if mode not in DB_INIT_MODES:
+        raise ValueError(f"Unknown database initialization mode: {mode}")
+    if mode == 'none':
+        return
+    with app.app_context(), initialization_lock(app, db):
+        if mode == 'auto':
+            tables = set(inspect(db.engine).get_table_names())
+            if 'alembic_version' in tables:
+                with db.engine.connect() as connection:
+                    current = set(connection.scalars(
+                        text('SELECT version_num FROM alembic_version')))
+                if current != _migration_heads(app):
+                    app.logger.warning(
+                        "The database is not at the latest migration; run "
+                        "`flask db upgrade`. Roles and currencies were not "
+                        "seeded.")
+                    return
+            else:
+                db.create_all()
+                if not tables and os.path.isdir(app.config['MIGRATIONS_DIR']):
+                    _stamp_head(app, db)
+        else:
+            db.create_all()
+        initialize_roles(app, db)
+        initialize_currencies(app, db)
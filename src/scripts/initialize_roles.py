@@ -1,23 +1,28 @@
+from sqlalchemy import select
+
 from src.app.models import Role
+from src.app.utils.taxonomy import insert_ignoring_conflicts
+
+ROLES = [
+    {"id": 1, "name": "admin"},
+    {"id": 2, "name": "artist"},
+    {"id": 3, "name": "user"}
+]
 
 
 def initialize_roles(app, db):
     """
     Initialize default roles in the database with hardcoded IDs.
-    """
-    roles = [
-        {"id": 1, "name": "admin"},
-        {"id": 2, "name": "artist"},
-        {"id": 3, "name": "user"}
-    ]
 
+    All roles are written with one INSERT ... ON CONFLICT DO NOTHING, so
+    existing roles are left untouched and running it again is a no-op.
+    """
     with app.app_context():
-        for role in roles:
-            # Check if the role already exists
-            existing_role = Role.query.filter_by(id=role["id"]).first()
-            if not existing_role:
-                # Create the role if it doesn't exist
-                new_role = Role(id=role["id"], name=role["name"])
-                db.session.add(new_role)
+        roles = ROLES
+        if db.session.get_bind().dialect.name not in ('postgresql', 'sqlite'):
+            existing = set(db.session.scalars(select(Role.id)))
+            roles = [role for role in roles if role["id"] not in existing]
+        if roles:
+            db.session.execute(insert_ignoring_conflicts(Role).values(roles))
         db.session.commit()
         print("Roles initialized successfully.")
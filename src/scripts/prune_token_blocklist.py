@@ -0,0 +1,70 @@
+import threading
+import time
+from datetime import datetime, timezone
+
+from sqlalchemy import and_, or_
+
+from src.app.models import TokenBlocklist
+
+
+def prune_token_blocklist(app, db, batch_size=1000, pause=0.0):
+    """
+    Delete the blocklist rows of tokens that have expired.
+
+    Rows are deleted `batch_size` at a time, each batch in its own short
+    transaction, so writers (logouts) are never blocked for long. Rows
+    without an expiry date are considered expired once the access token
+    lifetime has passed since they were created.
+
+    Args:
+        batch_size (int): Maximum rows deleted per transaction.
+        pause (float): Seconds to sleep between batches.
+
+    Returns:
+        int: The number of deleted rows.
+    """
+    deleted = 0
+    with app.app_context():
+        now = datetime.now(timezone.utc)
+        expired = or_(
+            TokenBlocklist.expires_at < now,
+            and_(
+                TokenBlocklist.expires_at.is_(None),
+                TokenBlocklist.created_at
+                < now - app.config['JWT_ACCESS_TOKEN_EXPIRES']))
+        while True:
+            ids = [
+                row.id for row in
+                db.session.query(TokenBlocklist.id)
+                .filter(expired)
+                .limit(batch_size)
+            ]
+            if not ids:
+                break
+            TokenBlocklist.query.filter(TokenBlocklist.id.in_(ids)).delete(
+                synchronize_session=False)
+            db.session.commit()
+            deleted += len(ids)
+            if pause:
+                time.sleep(pause)
+        print(f"Pruned {deleted} expired blocklist token(s).")
+    return deleted
+
+
+def start_blocklist_pruner(app, db, interval):
+    """
+    Prune the blocklist every `interval` seconds in a daemon thread of the
+    current process.
+    """
+    def run():
+        while True:
+            time.sleep(interval)
+            try:
+                prune_token_blocklist(app, db)
+            except Exception as e:
+                app.logger.error(f"Failed to prune token blocklist: {e}")
+
+    thread = threading.Thread(
+        target=run, name='blocklist-pruner', daemon=True)
+    thread.start()
+    return thread
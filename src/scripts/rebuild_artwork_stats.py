@@ -0,0 +1,60 @@
+from sqlalchemy import Date, delete, func, literal, select, union_all
+
+from src.app.models import Artwork, ArtworkDailyStats, Comment
+from src.app.models.art import Upvote
+
+
+def rebuild_artwork_stats(app, db, since=None):
+    """
+    Recompute the daily artwork stats rollup from the `upvote` and
+    `comment` tables, from the day `since` on (all days if None).
+
+    The rollup is rebuilt with one DELETE and one INSERT ... SELECT that
+    groups the raw rows by artwork and day in the database, in a single
+    transaction.
+
+    Returns:
+        int: The number of rollup rows written.
+    """
+    with app.app_context():
+        def day(column):
+            return func.date(column, type_=Date)
+
+        upvotes = select(
+            Upvote.target_id.label('artwork_id'),
+            day(Upvote.created_at).label('day'),
+            literal(1).label('upvotes'),
+            literal(0).label('comments'),
+        ).where(Upvote.target_type == 'artwork')
+        comments = select(
+            Comment.artwork_id.label('artwork_id'),
+            day(Comment.created_at).label('day'),
+            literal(0).label('upvotes'),
+            literal(1).label('comments'),
+        )
+        if since is not None:
+            upvotes = upvotes.where(day(Upvote.created_at) >= since)
+            comments = comments.where(day(Comment.created_at) >= since)
+        events = union_all(upvotes, comments).subquery()
+        rollup = (
+            select(
+                Artwork.artist_id,
+                events.c.artwork_id,
+                events.c.day,
+                func.sum(events.c.upvotes),
+                func.sum(events.c.comments))
+            .join(Artwork, Artwork.id == events.c.artwork_id)
+            .group_by(Artwork.artist_id, events.c.artwork_id, events.c.day)
+        )
+
+        stale = delete(ArtworkDailyStats)
+        if since is not None:
+            stale = stale.where(ArtworkDailyStats.day >= since)
+        db.session.execute(stale)
+        result = db.session.execute(
+            ArtworkDailyStats.__table__.insert().from_select(
+                ['artist_id', 'artwork_id', 'day', 'upvotes', 'comments'],
+                rollup))
+        db.session.commit()
+        print(f"Rebuilt {result.rowcount} daily artwork stats row(s).")
+    return result.rowcount
@@ -0,0 +1,38 @@
+from sqlalchemy import func, select, update
+
+from src.app.models import Artwork, Comment
+from src.app.models.art import Upvote
+
+
+def reconcile_upvote_counts(app, db):
+    """
+    Recompute the denormalized `upvote_count` of every artwork and comment
+    from the `upvote` table, only rewriting the rows that drifted.
+
+    Returns:
+        dict: The number of corrected rows per target type.
+    """
+    corrected = {}
+    with app.app_context():
+        for model in (Artwork, Comment):
+            target_type = model.__name__.lower()
+            actual_count = (
+                select(func.count())
+                .where(
+                    Upvote.target_type == target_type,
+                    Upvote.target_id == model.id)
+                .scalar_subquery()
+            )
+            result = db.session.execute(
+                update(model)
+                .where(model.upvote_count != actual_count)
+                .values(upvote_count=actual_count)
+                .execution_options(synchronize_session=False)
+            )
+            corrected[target_type] = result.rowcount
+        db.session.commit()
+        print(
+            "Upvote counts reconciled: "
+            + ", ".join(f"{n} {t}(s)" for t, n in corrected.items())
+            + " corrected.")
+    return corrected
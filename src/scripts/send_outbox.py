@@ -0,0 +1,148 @@
+import threading
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import delete, select, update
+
+from src.app.models import OutboxEmail
+
+
+def retry_delay(attempts, base_delay, max_delay) -> float:
+    """
+    Seconds to wait before the next attempt of an email that failed
+    `attempts` times: `base_delay` doubled after each failure, up to
+    `max_delay`.
+    """
+    return min(base_delay * 2 ** (attempts - 1), max_delay)
+
+
+def send_outbox(app, db, transport=None, batch_size=None):
+    """
+    Deliver the due emails of the outbox, `batch_size` at a time.
+
+    Each batch is claimed with a single UPDATE that pushes its emails'
+    `next_attempt_at` past `MAIL_CLAIM_TIMEOUT`, so concurrent senders (one
+    per worker process) never pick the same email, and an email held by a
+    sender that died is retried once the claim expires. Batches are kept
+    small enough to be sent, one `MAIL_SEND_TIMEOUT` per email at worst,
+    in half the claim timeout, so a slow batch is not claimed and sent
+    again by another sender. Emails that fail are retried with exponential
+    backoff until `MAIL_MAX_ATTEMPTS`; permanent errors are not retried.
+
+    The content of sent emails, which may hold password reset links, is
+    cleared, and sent emails older than `MAIL_SENT_RETENTION` are deleted.
+
+    Returns:
+        int: The number of emails sent.
+    """
+    sent = 0
+    with app.app_context():
+        config = app.config
+        transport = transport or app.extensions['mail_transport']
+        batch_size = min(
+            batch_size or config['MAIL_BATCH_SIZE'],
+            max(config['MAIL_CLAIM_TIMEOUT']
+                // (2 * config['MAIL_SEND_TIMEOUT']), 1))
+        while True:
+            now = datetime.now(timezone.utc)
+            due = (
+                select(OutboxEmail.id)
+                .where(
+                    OutboxEmail.status == 'pending',
+                    OutboxEmail.next_attempt_at <= now)
+                .order_by(OutboxEmail.next_attempt_at)
+                .limit(batch_size)
+            )
+            claimed = db.session.scalars(
+                update(OutboxEmail)
+                .where(
+                    OutboxEmail.id.in_(due),
+                    OutboxEmail.status == 'pending',
+                    OutboxEmail.next_attempt_at <= now)
+                .values(
+                    attempts=OutboxEmail.attempts + 1,
+                    next_attempt_at=now + timedelta(
+                        seconds=config['MAIL_CLAIM_TIMEOUT']))
+                .returning(OutboxEmail.id)
+                .execution_options(synchronize_session=False)
+            ).all()
+            db.session.commit()
+            if not claimed:
+                break
+
+            emails = (
+                OutboxEmail.query
+                .filter(OutboxEmail.id.in_(claimed))
+                .order_by(OutboxEmail.id)
+                .all()
+            )
+            errors = transport.send(emails)
+
+            now = datetime.now(timezone.utc)
+            results = []
+            for index, email in enumerate(emails):
+                error = errors.get(index)
+                if error is None:
+                    results.append({
+                        'id': email.id, 'status': 'sent', 'sent_at': now,
+                        'html_content': '', 'last_error': None})
+                    continue
+                app.logger.warning(
+                    f"Failed to send email {email.id} "
+                    f"(attempt {email.attempts}): {error}")
+                if (error.permanent
+                        or email.attempts >= config['MAIL_MAX_ATTEMPTS']):
+                    status, next_attempt_at = 'failed', email.next_attempt_at
+                else:
+                    status = 'pending'
+                    next_attempt_at = now + timedelta(seconds=retry_delay(
+                        email.attempts, config['MAIL_RETRY_DELAY'],
+                        config['MAIL_RETRY_MAX_DELAY']))
+                results.append({
+                    'id': email.id, 'status': status,
+                    'next_attempt_at': next_attempt_at,
+                    'last_error': str(error)[:1000]})
+            # Bulk UPDATEs by primary key; each needs rows with the same keys
+            for delivered in (True, False):
+                rows = [
+                    r for r in results if (r['status'] == 'sent') == delivered]
+                if rows:
+                    db.session.execute(update(OutboxEmail), rows)
+            db.session.commit()
+            db.session.expunge_all()
+            sent += len(emails) - len(errors)
+            if len(claimed) < batch_size:
+                break
+
+        db.session.execute(
+            delete(OutboxEmail)
+            .where(
+                OutboxEmail.status == 'sent',
+                OutboxEmail.sent_at < datetime.now(timezone.utc) - timedelta(
+                    seconds=config['MAIL_SENT_RETENTION']))
+            .execution_options(synchronize_session=False))
+        db.session.commit()
+    return sent
+
+
+def start_outbox_sender(app, db, interval):
+    """
+    Deliver the outbox in a daemon thread of the current process, as soon
+    as a transaction queuing an email commits and at least every `interval`
+    seconds (for retries and emails queued by other processes).
+    """
+    wakeup = threading.Event()
+    app.extensions['mail_outbox_wakeup'] = wakeup
+
+    def run():
+        while True:
+            wakeup.wait(interval)
+            wakeup.clear()
+            try:
+                send_outbox(app, db)
+            except Exception as e:
+                app.logger.error(f"Failed to send the email outbox: {e}")
+
+    thread = threading.Thread(
+        target=run, name='outbox-sender', daemon=True)
+    thread.start()
+    return thread
@@ -1,4 +1,7 @@
+from contextlib import contextmanager
+
 import pytest
+from sqlalchemy import event
 from src.app.models import User
 
 from src.app import create_app, db
@@ -22,6 +25,27 @@ def client(app):
     return app.test_client()
 
 
+@pytest.fixture
+def count_queries(app):
+    """
+    Context manager collecting the SQL statements executed in its block.
+    """
+    @contextmanager
+    def _count_queries():
+        statements = []
+
+        def before_cursor_execute(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        event.listen(db.engine, "before_cursor_execute", before_cursor_execute)
+        try:
+            yield statements
+        finally:
+            event.remove(
+                db.engine, "before_cursor_execute", before_cursor_execute)
+    return _count_queries
+
+
 @pytest.fixture
 def artist_user(app):
     """
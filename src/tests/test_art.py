@@ -1,4 +1,13 @@
-from src.app.models import Artwork
+import io
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import text
+
+from src.app import db
+from src.app.models import Artwork, ArtworkDailyStats, Tag
+from src.app.models.art import Upvote
+from src.app.utils.cache import TTLCache
+from src.app.utils.taxonomy import insert_ignoring_conflicts
 
 
 def test_create_artwork(client, auth_headers):
@@ -142,3 +151,396 @@ def test_delete_artwork(client, auth_headers, create_artwork):
     # Verify the artwork is deleted from the database
     artwork = Artwork.query.get(artwork_id)
     assert artwork is None
+
+
+def test_artist_dashboard_engagement_counts(
+        client, auth_headers, create_artwork):
+    """
+    Test that the dashboard reports upvote and comment counts per artwork.
+    """
+    upvoted_id = create_artwork()
+    other_id = create_artwork()
+    client.post(f"/store/upvote/artwork/{upvoted_id}", headers=auth_headers)
+    client.post(
+        f"/store/artworks/{upvoted_id}/comments",
+        json={"content": "Work in progress"},
+        headers=auth_headers)
+
+    response = client.get("/artist/dashboard", headers=auth_headers)
+    assert response.status_code == 200
+    artworks = {
+        artwork["id"]: artwork for artwork in response.get_json()["data"]}
+    assert artworks[upvoted_id]["upvotes"] == 1
+    assert artworks[upvoted_id]["comments_count"] == 1
+    assert artworks[other_id]["upvotes"] == 0
+    assert artworks[other_id]["comments_count"] == 0
+
+
+def test_artist_dashboard_sorted_and_paginated(
+        client, auth_headers, general_auth_headers, create_artwork,
+        count_queries):
+    first, second, third = (create_artwork() for _ in range(3))
+    for headers in (auth_headers, general_auth_headers):
+        client.post(f"/store/upvote/artwork/{second}", headers=headers)
+    client.post(f"/store/upvote/artwork/{third}", headers=auth_headers)
+    for _ in range(3):
+        client.post(
+            f"/store/artworks/{first}/comments", json={"content": "Hi"},
+            headers=general_auth_headers)
+
+    def ids(query):
+        seen, cursor = [], None
+        while True:
+            url = f"/artist/dashboard?limit=2&{query}"
+            if cursor:
+                url += f"&cursor={cursor}"
+            response = client.get(url, headers=auth_headers)
+            assert response.status_code == 200
+            data = response.get_json()
+            seen.extend(item["id"] for item in data["data"])
+            cursor = data["next_cursor"]
+            if cursor is None:
+                return seen
+
+    assert ids("sort=new") == [third, second, first]
+    assert ids("sort=upvotes") == [second, third, first]
+    assert ids("sort=comments") == [first, third, second]
+    assert ids("sort=activity") == [first, third, second]
+
+    with count_queries() as statements:
+        response = client.get("/artist/dashboard", headers=auth_headers)
+    item = next(
+        a for a in response.get_json()["data"] if a["id"] == first)
+    assert item["comments_count"] == 3
+    assert item["category"] == "Default Category"
+    assert item["last_activity_at"] == item["last_comment_at"]
+    assert "tags" not in item
+    # Guard lookups aside, the page and its stats are a single query
+    assert sum("FROM artwork" in s for s in statements) == 1
+
+    response = client.get(
+        "/artist/dashboard?sort=price", headers=auth_headers)
+    assert response.status_code == 400
+
+
+def test_reference_data_cached_and_invalidated(
+        client, auth_headers, create_artwork, count_queries):
+    """
+    Test that tags and categories are served from the cache and that new
+    ones show up immediately.
+    """
+    create_artwork()
+    response = client.get("/artist/tags", headers=auth_headers)
+    assert {t["title"] for t in response.get_json()} == {"default", "tag"}
+
+    with count_queries() as statements:
+        client.get("/artist/tags", headers=auth_headers)
+        client.get("/artist/categories", headers=auth_headers)
+        client.get("/artist/currencies", headers=auth_headers)
+        client.get("/artist/categories", headers=auth_headers)
+    assert not any("FROM tag" in s for s in statements)
+    assert sum("FROM category" in s for s in statements) == 1
+    assert sum("FROM currency" in s for s in statements) == 1
+
+    create_artwork({
+        "title": "New",
+        "price": 10.0,
+        "currency_id": 1,
+        "stock": 1,
+        "description": "New artwork.",
+        "category_name": "Sculpture",
+        "tag_names": ["bronze"]
+    })
+    tags = client.get("/artist/tags", headers=auth_headers).get_json()
+    assert "bronze" in {t["title"] for t in tags}
+    categories = client.get(
+        "/artist/categories", headers=auth_headers).get_json()
+    assert "Sculpture" in {c["title"] for c in categories}
+
+
+def test_cache_skips_values_loaded_across_an_invalidation():
+    """
+    Test that a value loaded before an invalidation is not cached after it.
+    """
+    cache = TTLCache(ttl=60)
+
+    def stale_loader():
+        cache.invalidate("tags")
+        return "stale"
+
+    assert cache.get_or_set("tags", stale_loader) == "stale"
+    assert cache.get_or_set("tags", lambda: "fresh") == "fresh"
+    assert cache.get_or_set("tags", lambda: "newer") == "fresh"
+
+
+def test_artist_guard_uses_role_claim(client, auth_headers, count_queries):
+    """
+    Test that the artist guard reads the role from the token and the role
+    cache instead of loading the user on every request.
+    """
+    client.get("/artist/dashboard", headers=auth_headers)
+    with count_queries() as statements:
+        response = client.get("/artist/dashboard", headers=auth_headers)
+    assert response.status_code == 200
+    assert not any('FROM user' in s for s in statements)
+
+
+def test_artist_guard_rejects_general_user(client, general_auth_headers):
+    response = client.get("/artist/dashboard", headers=general_auth_headers)
+    assert response.status_code == 403
+
+
+def test_demoted_artist_token_rejected(app, client, auth_headers):
+    """
+    Test that a token issued before a demotion no longer grants access.
+    """
+    assert client.get(
+        "/artist/dashboard", headers=auth_headers).status_code == 200
+    result = app.test_cli_runner().invoke(
+        args=["set-role", "artist@example.com", "user"])
+    assert result.exit_code == 0
+    assert client.get(
+        "/artist/dashboard", headers=auth_headers).status_code == 403
+
+    # Promoting again does not revive the old token either
+    app.test_cli_runner().invoke(
+        args=["set-role", "artist@example.com", "artist"])
+    assert client.get(
+        "/artist/dashboard", headers=auth_headers).status_code == 403
+
+
+def test_bulk_import_artworks(client, auth_headers, count_queries):
+    rows = [
+        {
+            "title": f"Imported {i}",
+            "price": 10.0 * (i + 1),
+            "currency_id": 2,
+            "stock": 1,
+            "description": "Imported.",
+            "category_name": "Prints" if i % 2 else "Painting",
+            "tag_names": ["imported", f"batch{i % 3}"]
+        }
+        for i in range(6)
+    ]
+    rows[2] = {"title": "Missing fields"}
+    rows[4]["currency_id"] = 999
+
+    with count_queries() as statements:
+        response = client.post(
+            "/artist/artworks/bulk", json=rows, headers=auth_headers)
+    assert response.status_code == 201
+    data = response.get_json()
+    assert len(data["artwork_ids"]) == 4
+    assert [e["index"] for e in data["errors"]] == [2, 4]
+    assert "currency_id" in data["errors"][1]["errors"]
+    # Categories, tags and artworks are resolved and inserted in bulk
+    assert len(statements) < 20
+
+    artwork = db.session.get(Artwork, data["artwork_ids"][-1])
+    assert artwork.title == "Imported 5"
+    assert artwork.category.title == "Prints"
+    assert {t.title for t in artwork.tags} == {"imported", "batch2"}
+    assert artwork.price_base == 60.0
+    assert artwork.hot_score.score == 0
+    response = client.get("/store/search?q=imported")
+    assert len(response.get_json()["data"]) == 4
+
+    csv_body = (
+        "title,price,currency_id,stock,description,category_name,tag_names\n"
+        'From CSV,12.5,2,3,Row one,Prints,"csv, imported"\n'
+        "Bad price,cheap,2,3,Row two,Prints,\n"
+    )
+    response = client.post(
+        "/artist/artworks/bulk",
+        data={"file": (io.BytesIO(csv_body.encode()), "works.csv")},
+        headers=auth_headers)
+    assert response.status_code == 201
+    data = response.get_json()
+    assert len(data["artwork_ids"]) == 1
+    assert data["errors"][0]["index"] == 1
+    artwork = db.session.get(Artwork, data["artwork_ids"][0])
+    assert {t.title for t in artwork.tags} == {"csv", "imported"}
+
+    response = client.post(
+        "/artist/artworks/bulk",
+        data='{"title": "NDJSON", "price": 1}\n',
+        content_type="application/x-ndjson",
+        headers=auth_headers)
+    assert response.status_code == 400
+    assert response.get_json()["artwork_ids"] == []
+
+    response = client.post(
+        "/artist/artworks/bulk", json={"title": "Not a list"},
+        headers=auth_headers)
+    assert response.status_code == 400
+
+
+def test_tag_and_category_names_are_normalized(
+        client, auth_headers, create_artwork, count_queries):
+    data = {
+        "title": "Normalized",
+        "price": 100.0,
+        "currency_id": 1,
+        "stock": 5,
+        "description": "Default description.",
+        "category_name": " Nature ",
+        "tag_names": ["Sunset", " sunset", "SEA"]
+    }
+    first_id = create_artwork(data)
+    second_id = create_artwork(
+        {**data, "category_name": "nature", "tag_names": ["sea", "sunset"]})
+
+    first = db.session.get(Artwork, first_id)
+    second = db.session.get(Artwork, second_id)
+    assert first.category_id == second.category_id
+    assert first.category.title == "Nature"
+    assert {t.title for t in first.tags} == {"Sunset", "SEA"}
+    assert {t.id for t in first.tags} == {t.id for t in second.tags}
+    assert Tag.query.count() == 2
+
+    # Known names are served from the cache, not looked up by title
+    with count_queries() as statements:
+        create_artwork(data)
+    assert not any("title_key IN" in s for s in statements)
+
+    # A row created concurrently is reused rather than violating the
+    # unique constraint
+    db.session.execute(
+        insert_ignoring_conflicts(Tag),
+        [{"title": "Sea", "title_key": "sea"}])
+    assert Tag.query.filter_by(title_key="sea").count() == 1
+
+    # A row whose key disagrees with its title cannot be silently skipped
+    db.session.execute(
+        insert_ignoring_conflicts(Tag),
+        [{"title": "ÉTÉ", "title_key": "ÉtÉ"}])
+    response = client.post(
+        "/artist/artwork", json={**data, "tag_names": ["ÉTÉ"]},
+        headers=auth_headers)
+    assert response.status_code == 409
+    assert "ÉTÉ" in response.get_json()["message"]
+
+
+def test_artist_stats_rollup(
+        app, client, auth_headers, general_auth_headers, create_artwork):
+    first, second = create_artwork(), create_artwork()
+    for headers in (auth_headers, general_auth_headers):
+        client.post(f"/store/upvote/artwork/{first}", headers=headers)
+    client.post(f"/store/upvote/artwork/{second}", headers=auth_headers)
+    client.delete(f"/store/upvote/artwork/{second}", headers=auth_headers)
+    comment_id = client.post(
+        f"/store/artworks/{first}/comments", json={"content": "Hi"},
+        headers=general_auth_headers).get_json()["comment_id"]
+    client.post(f"/store/comments/{comment_id}", json={"content": "Thanks"},
+                headers=auth_headers)
+    client.post(
+        f"/store/artworks/{second}/comments", json={"content": "Nice"},
+        headers=general_auth_headers)
+
+    def stats(query=""):
+        response = client.get(f"/artist/stats?{query}", headers=auth_headers)
+        assert response.status_code == 200
+        return response.get_json()
+
+    today = datetime.now(timezone.utc).date()
+    data = stats()
+    assert data["totals"] == {"upvotes": 2, "comments": 3}
+    assert len(data["series"]) == 30
+    assert data["series"][-1] == {
+        "period": today.isoformat(), "upvotes": 2, "comments": 3}
+    assert stats(f"artwork_id={second}")["totals"] == {
+        "upvotes": 0, "comments": 1}
+
+    # Deleting a comment also removes its replies from the rollup
+    client.delete(
+        f"/store/comments/{comment_id}", headers=general_auth_headers)
+    assert stats()["totals"] == {"upvotes": 2, "comments": 1}
+
+    # The rebuild from the raw tables agrees with the incremental updates,
+    # and older activity is bucketed by week
+    Upvote.query.filter_by(target_id=first).update(
+        {"created_at": datetime.now(timezone.utc) - timedelta(days=14)})
+    db.session.commit()
+    before = stats()
+    result = app.test_cli_runner().invoke(args=["rebuild-stats"])
+    assert result.exit_code == 0
+    assert stats("granularity=day")["totals"] == before["totals"]
+    weeks = stats("granularity=week")["series"]
+    assert sum(w["upvotes"] for w in weeks) == 2
+    assert weeks[-1]["upvotes"] == 0
+
+    assert client.get(
+        "/artist/stats?granularity=year", headers=auth_headers
+    ).status_code == 400
+    assert client.get(
+        "/artist/stats?from=2025-02-01&to=2025-01-01", headers=auth_headers
+    ).status_code == 400
+
+
+def test_upload_artwork_image(
+        app, client, auth_headers, create_artwork, tmp_path):
+    from PIL import Image
+    app.config['UPLOAD_FOLDER'] = str(tmp_path)
+    app.extensions['image_processor'].upload_folder = str(tmp_path)
+    artwork_id = create_artwork()
+
+    buffer = io.BytesIO()
+    Image.new("RGB", (600, 300), "red").save(buffer, "PNG")
+    png = buffer.getvalue()
+    url = f"/artist/artwork/{artwork_id}/image"
+    response = client.post(
+        url, data=png, content_type="image/png", headers=auth_headers)
+    assert response.status_code == 202
+    image_path = response.get_json()["image_path"]
+    assert image_path.startswith("originals/") and image_path.endswith(".png")
+
+    # Variants are generated inline in tests; widths above the original
+    # are skipped
+    data = client.get(f"/store/artworks/{artwork_id}").get_json()["data"]
+    assert data["image_path"] == image_path
+    assert sorted(data["image_variants"], key=int) == ["160", "480", "600"]
+    with Image.open(tmp_path / data["image_variants"]["160"]) as variant:
+        assert variant.format == "WEBP"
+        assert variant.size == (160, 80)
+    response = client.get(f"/store/images/{data['image_variants']['480']}")
+    assert response.status_code == 200
+    assert "immutable" in response.headers["Cache-Control"]
+    response.close()
+
+    # The same image is stored once
+    second = create_artwork()
+    response = client.post(
+        f"/artist/artwork/{second}/image", data=png,
+        content_type="image/png", headers=auth_headers)
+    assert response.get_json()["image_path"] == image_path
+    assert len(list((tmp_path / "originals").rglob("*.png"))) == 1
+
+    assert client.post(
+        url, data=b"GIF89a", content_type="image/gif", headers=auth_headers
+    ).status_code == 415
+    assert client.post(
+        url, data=b"not a png", content_type="image/png",
+        headers=auth_headers
+    ).status_code == 400
+    app.config['MAX_IMAGE_UPLOAD_BYTES'] = 100
+    assert client.post(
+        url, data=png, content_type="image/png", headers=auth_headers
+    ).status_code == 413
+    assert list((tmp_path / "tmp").iterdir()) == []
+
+
+def test_delete_artwork_with_stats_enforcing_foreign_keys(
+        client, auth_headers, create_artwork):
+    artwork_id = create_artwork()
+    client.post(f"/store/upvote/artwork/{artwork_id}", headers=auth_headers)
+    assert ArtworkDailyStats.query.filter_by(artwork_id=artwork_id).count()
+
+    db.session.execute(text("PRAGMA foreign_keys=ON"))
+    try:
+        response = client.delete(
+            f"/artist/artwork/{artwork_id}", headers=auth_headers)
+    finally:
+        db.session.execute(text("PRAGMA foreign_keys=OFF"))
+    assert response.status_code == 200
+    assert not ArtworkDailyStats.query.filter_by(
+        artwork_id=artwork_id).count()
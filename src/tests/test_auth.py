@@ -1,3 +1,21 @@
+import json
+import threading
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from flask_jwt_extended import decode_token
+
+from src.app import db
+from src.app.models import (Currency, ExchangeRate, OutboxEmail, Role,
+                            TokenBlocklist, User)
+from src.app.utils.mail_sender import SendGridTransport, queue_email
+from src.app.utils.passwords import PasswordHasher, get_cost
+from src.app.utils.revocation import get_revocation_cache
+from src.scripts.initialize_database import (_migration_heads,
+                                             initialize_database)
+from src.scripts.send_outbox import send_outbox
+
+
 def test_register_user(client):
     response = client.post("/auth/register", json={
         "name": "pouria",
@@ -79,3 +97,238 @@ def test_logout_user(client):
     )
     assert profile_resp.status_code == 401 or profile_resp.status_code == 422
 
+
+
+def _register_and_login(client):
+    client.post("/auth/register", json={
+        "name": "pouria",
+        "email": "pouria@example.com",
+        "password": "123456"
+    })
+    login_resp = client.post("/auth/login", json={
+        "email": "pouria@example.com",
+        "password": "123456"
+    })
+    return login_resp.get_json()["access_token"]
+
+
+def test_revocation_check_served_from_memory(client, count_queries):
+    access_token = _register_and_login(client)
+    headers = {"Authorization": f"Bearer {access_token}"}
+    client.get("/auth/profile", headers=headers)
+
+    with count_queries() as statements:
+        response = client.get("/auth/profile", headers=headers)
+    assert response.status_code == 200
+    assert not any("token_blocklist" in s for s in statements)
+
+
+def test_revocation_from_another_worker(app, client):
+    access_token = _register_and_login(client)
+    headers = {"Authorization": f"Bearer {access_token}"}
+    assert client.get("/auth/profile", headers=headers).status_code == 200
+
+    # Another worker revokes the token: only the table is updated
+    db.session.add(TokenBlocklist(jti=decode_token(access_token)["jti"]))
+    db.session.commit()
+    get_revocation_cache().refresh()
+
+    response = client.get("/auth/profile", headers=headers)
+    assert response.status_code == 401
+
+
+def test_logout_stores_token_expiry(client):
+    access_token = _register_and_login(client)
+    client.post(
+        "/auth/logout", headers={"Authorization": f"Bearer {access_token}"})
+    row = TokenBlocklist.query.one()
+    assert row.expires_at == datetime.fromtimestamp(
+        decode_token(access_token)["exp"], timezone.utc
+    ).replace(tzinfo=None)
+
+
+def test_prune_blocklist_command(app):
+    now = datetime.now(timezone.utc)
+    db.session.add_all(
+        [TokenBlocklist(jti=f"expired-{i}", expires_at=now - timedelta(
+            minutes=1)) for i in range(5)]
+        + [TokenBlocklist(jti="active", expires_at=now + timedelta(hours=1)),
+           # Legacy row without expiry, older than the token lifetime
+           TokenBlocklist(jti="legacy", created_at=now - timedelta(days=1))]
+    )
+    db.session.commit()
+
+    result = app.test_cli_runner().invoke(
+        args=["prune-blocklist", "--batch-size", "2"])
+    assert result.exit_code == 0
+    assert "Pruned 6" in result.output
+    assert [row.jti for row in TokenBlocklist.query.all()] == ["active"]
+
+
+def test_cache_stats_admins_only(client, auth_headers):
+    response = client.get("/auth/cache-stats", headers=auth_headers)
+    assert response.status_code == 403
+
+    admin = User(name="Admin", email="admin@example.com", role_id=1)
+    admin.set_password("password")
+    db.session.add(admin)
+    db.session.commit()
+    token = client.post("/auth/login", json={
+        "email": "admin@example.com", "password": "password"
+    }).get_json()["access_token"]
+    response = client.get(
+        "/auth/cache-stats", headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 200
+    assert response.get_json() == {"hits": 0, "misses": 0, "hit_ratio": 0.0}
+
+
+def test_database_seeding_is_idempotent(app, count_queries):
+    with count_queries() as statements:
+        initialize_database(app, db, mode="create")
+    # One bulk upsert per table, without reading the existing rows first
+    assert len([s for s in statements if s.startswith("INSERT")]) == 3
+    assert not any(
+        s.startswith("SELECT") and ("role" in s or "currency" in s)
+        for s in statements)
+    assert Role.query.count() == 3
+    assert Currency.query.count() == 8
+    usd = Currency.query.filter_by(code="USD").one()
+    assert db.session.get(ExchangeRate, usd.id).rate == 1.0
+
+    with count_queries() as statements:
+        initialize_database(app, db, mode="none")
+    assert statements == []
+
+    # Flask-Migrate is set up when its commands are first used
+    result = app.test_cli_runner().invoke(args=["db", "--help"])
+    assert result.exit_code == 0
+    assert "upgrade" in result.output
+
+
+def test_migration_heads_match_alembic(app):
+    from alembic.script import ScriptDirectory
+    script = ScriptDirectory(app.config["MIGRATIONS_DIR"])
+    assert _migration_heads(app) == set(script.get_heads())
+
+
+def test_login_upgrades_outdated_hash_cost(app, client):
+    _register_and_login(client)
+    user = User.query.filter_by(email="pouria@example.com").one()
+    assert get_cost(user.password_hash) == app.config["BCRYPT_LOG_ROUNDS"]
+
+    # Raise the configured work factor: the next login rehashes
+    app.extensions["password_hasher"].rounds = 5
+    _register_and_login(client)
+    db.session.refresh(user)
+    assert get_cost(user.password_hash) == 5
+    assert user.check_password("123456")
+
+
+def test_login_rejected_when_hasher_saturated(app, client):
+    _register_and_login(client)
+    hasher = app.extensions["password_hasher"]
+    for _ in range(hasher.max_pending):
+        hasher._slots.acquire()
+    response = client.post("/auth/login", json={
+        "email": "pouria@example.com",
+        "password": "123456"
+    })
+    assert response.status_code == 503
+
+
+def test_password_hasher_process_pool():
+    hasher = PasswordHasher(rounds=4, workers=1)
+    password_hash = hasher.hash("secret")
+    assert hasher.check(password_hash, "secret")
+    assert not hasher.check(password_hash, "wrong")
+    hasher.shutdown()
+    assert hasher._pool._executor is None
+    # A later operation starts a new pool
+    assert hasher.check(password_hash, "secret")
+    hasher.shutdown()
+
+
+class _MailAPIStandIn(BaseHTTPRequestHandler):
+    """Local stand-in for the SendGrid mail send API."""
+    protocol_version = "HTTP/1.1"
+    statuses = []
+    requests = []
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        self.requests.append((self.client_address, json.loads(body)))
+        self.send_response(self.statuses.pop(0) if self.statuses else 202)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+def test_password_reset_email_sent_through_outbox(app, client, monkeypatch):
+    # Reset tokens are signed with the SECRET_KEY environment variable
+    monkeypatch.setenv("SECRET_KEY", "test-secret-key")
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _MailAPIStandIn)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    transport = SendGridTransport(
+        "test-key", "noreply@example.com",
+        api_url=f"http://127.0.0.1:{server.server_port}")
+    _MailAPIStandIn.statuses[:] = [503]
+    _MailAPIStandIn.requests[:] = []
+    try:
+        _register_and_login(client)
+        response = client.post(
+            "/auth/forgot-password", json={"email": "pouria@example.com"})
+        assert response.status_code == 200
+        # Queued in the request transaction, nothing sent yet
+        email = OutboxEmail.query.one()
+        assert email.to_email == "pouria@example.com"
+        assert email.status == "pending"
+        assert _MailAPIStandIn.requests == []
+
+        # The API fails: the email is retried later. The sender uses its
+        # own session, so the test session is refreshed after each run
+        assert send_outbox(app, db, transport) == 0
+        db.session.expire_all()
+        email = OutboxEmail.query.one()
+        assert (email.status, email.attempts) == ("pending", 1)
+        assert "503" in email.last_error
+        retry_in = email.next_attempt_at - datetime.now(
+            timezone.utc).replace(tzinfo=None)
+        assert timedelta(seconds=20) < retry_in <= timedelta(seconds=30)
+        assert send_outbox(app, db, transport) == 0
+
+        email.next_attempt_at -= timedelta(minutes=1)
+        for _ in range(2):
+            queue_email("news@example.com", "Hello", "<p>Same body</p>")
+        db.session.commit()
+        assert send_outbox(app, db, transport) == 3
+        db.session.expire_all()
+        assert {e.status for e in OutboxEmail.query} == {"sent"}
+        # Sent emails do not keep their reset links
+        assert {e.html_content for e in OutboxEmail.query} == {""}
+        # Identical emails share one request, over one pooled connection
+        payloads = [payload for _, payload in _MailAPIStandIn.requests]
+        assert len(payloads) == 3
+        assert len(payloads[-1]["personalizations"]) == 2
+        assert len({addr for addr, _ in _MailAPIStandIn.requests}) == 1
+
+        # Rejected emails are not retried
+        _MailAPIStandIn.statuses[:] = [400]
+        queue_email("bad@example", "Hello", "<p>Hi</p>")
+        db.session.commit()
+        assert send_outbox(app, db, transport) == 0
+        db.session.expire_all()
+        assert OutboxEmail.query.filter_by(
+            to_email="bad@example").one().status == "failed"
+
+        # Sent emails are deleted after MAIL_SENT_RETENTION
+        OutboxEmail.query.filter_by(status="sent").update(
+            {"sent_at": datetime.now(timezone.utc) - timedelta(days=8)})
+        db.session.commit()
+        send_outbox(app, db, transport)
+        db.session.expire_all()
+        assert [e.status for e in OutboxEmail.query] == ["failed"]
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -1,3 +1,20 @@
+import gzip
+import json
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from fnmatch import fnmatch
+
+import pytest
+
+from src.app import db
+from src.app.models import Artwork, ArtworkScore, ExchangeRate, Tag
+from src.app.models.art import Upvote
+from src.app.utils.cache import (ArtworkDetailCache, RedisBackend,
+                                 get_artwork_cache)
+from src.app.utils.representations import (dumps_orjson, dumps_stdlib,
+                                           orjson)
+from src.scripts.initialize_currencies import initialize_currencies
+
 def test_get_all_artworks_no_artworks(client):
     response = client.get("/store/artworks")
     assert response.status_code == 404
@@ -19,6 +36,255 @@ def test_get_all_artworks_with_artwork(client, create_artwork):
     assert item["title"] is not None
 
 
+def test_get_all_artworks_paginated(client, create_artwork):
+    artwork_ids = [create_artwork() for _ in range(5)]
+    seen = []
+    cursor = None
+    while True:
+        url = "/store/artworks?limit=2"
+        if cursor:
+            url += f"&cursor={cursor}"
+        response = client.get(url)
+        assert response.status_code == 200
+        data = response.get_json()
+        assert len(data["data"]) <= 2
+        seen.extend(item["id"] for item in data["data"])
+        cursor = data["next_cursor"]
+        if cursor is None:
+            break
+    # Newest first, every artwork exactly once
+    assert seen == sorted(artwork_ids, reverse=True)
+
+
+def test_get_all_artworks_invalid_cursor(client, create_artwork):
+    create_artwork()
+    response = client.get("/store/artworks?cursor=not-a-cursor")
+    assert response.status_code == 400
+    response = client.get("/store/artworks?limit=zero")
+    assert response.status_code == 400
+
+
+def test_get_all_artworks_query_count_is_constant(
+        client, create_artwork, count_queries):
+    for i in range(6):
+        create_artwork({
+            "title": f"Artwork {i}",
+            "price": 100.0,
+            "currency_id": 1,
+            "stock": 5,
+            "description": "Default description.",
+            "category_name": f"Category {i}",
+            "tag_names": [f"tag{i}", "shared"]
+        })
+
+    def page_queries(limit):
+        with count_queries() as statements:
+            response = client.get(f"/store/artworks?limit={limit}")
+        assert response.status_code == 200
+        assert len(response.get_json()["data"]) == limit
+        return len(statements)
+
+    assert page_queries(1) == page_queries(6)
+
+
+def test_get_all_artworks_engagement_counts(
+        client, auth_headers, general_auth_headers, create_artwork):
+    first_id = create_artwork()
+    second_id = create_artwork()
+    client.post(f"/store/upvote/artwork/{first_id}", headers=auth_headers)
+    client.post(
+        f"/store/upvote/artwork/{first_id}", headers=general_auth_headers)
+    client.post(
+        f"/store/artworks/{second_id}/comments",
+        json={"content": "Nice"},
+        headers=general_auth_headers
+    )
+    client.post("/store/comments/1", json={"content": "Thanks"},
+                headers=auth_headers)
+
+    response = client.get("/store/artworks")
+    assert response.status_code == 200
+    items = {item["id"]: item for item in response.get_json()["data"]}
+    assert items[first_id]["upvotes"] == 2
+    assert items[first_id]["comments_count"] == 0
+    assert items[second_id]["upvotes"] == 0
+    assert items[second_id]["comments_count"] == 2
+
+
+def test_get_all_artworks_filters_and_facets(client, create_artwork):
+    def artwork(price, category, tags, stock=5):
+        return create_artwork({
+            "title": "Artwork",
+            "price": price,
+            "currency_id": 2,  # USD, the base currency
+            "stock": stock,
+            "description": "Default description.",
+            "category_name": category,
+            "tag_names": tags
+        })
+
+    cheap = artwork(20.0, "Painting", ["nature", "blue"])
+    mid = artwork(250.0, "Painting", ["nature"], stock=0)
+    pricey = artwork(2000.0, "Sculpture", ["blue"])
+
+    def ids(query):
+        response = client.get(f"/store/artworks?{query}")
+        assert response.status_code == 200
+        return sorted(item["id"] for item in response.get_json()["data"])
+
+    tags = {t.title: t.id for t in Tag.query.all()}
+    painting = db.session.get(Artwork, cheap).category_id
+    assert ids(f"category_id={painting}") == [cheap, mid]
+    assert ids("min_price=100&max_price=1000") == [mid]
+    assert ids("in_stock=true") == [cheap, pricey]
+    assert ids(f"tag_id={tags['nature']},{tags['blue']}") == [
+        cheap, mid, pricey]
+    assert ids(
+        f"tag_id={tags['nature']}&tag_id={tags['blue']}&tag_mode=all"
+    ) == [cheap]
+
+    data = client.get(f"/store/artworks?tag_id={tags['blue']}").get_json()
+    facets = data["facets"]
+    assert {c["title"]: c["count"] for c in facets["categories"]} == {
+        "Painting": 1, "Sculpture": 1}
+    assert {t["title"]: t["count"] for t in facets["tags"]} == {
+        "blue": 2, "nature": 1}
+    assert facets["price"] == [
+        {"min": 0, "max": 50, "count": 1},
+        {"min": 1000, "max": 5000, "count": 1},
+    ]
+
+    # Facets are only computed for the first page
+    data = client.get("/store/artworks?limit=1").get_json()
+    assert "facets" in data
+    next_page = client.get(
+        f"/store/artworks?limit=1&cursor={data['next_cursor']}").get_json()
+    assert "facets" not in next_page
+
+    response = client.get("/store/artworks?min_price=cheap")
+    assert response.status_code == 400
+    response = client.get("/store/artworks?tag_mode=some")
+    assert response.status_code == 400
+
+
+def test_price_base_and_sort_by_price(app, client, create_artwork):
+    def artwork(price, currency_id):
+        return create_artwork({
+            "title": "Artwork",
+            "price": price,
+            "currency_id": currency_id,
+            "stock": 5,
+            "description": "Default description.",
+            "category_name": "Painting",
+            "tag_names": []
+        })
+
+    dollars = artwork(150.0, 2)
+    euros = artwork(100.0, 1)
+    yen = artwork(20000.0, 8)
+    # Without an exchange rate the price cannot be compared
+    assert db.session.get(Artwork, euros).price_base is None
+    assert db.session.get(Artwork, dollars).price_base == 150.0
+
+    result = app.test_cli_runner().invoke(
+        args=["set-exchange-rates", "EUR=1.1", "JPY=0.0065"])
+    assert result.exit_code == 0
+    assert "Repriced 2 artwork(s)" in result.output
+    db.session.expire_all()
+    assert db.session.get(Artwork, euros).price_base == pytest.approx(110)
+    assert db.session.get(Artwork, yen).price_base == pytest.approx(130)
+
+    def ids(query):
+        response = client.get(f"/store/artworks?{query}")
+        assert response.status_code == 200
+        return [item["id"] for item in response.get_json()["data"]]
+
+    assert ids("sort=price") == [euros, yen, dollars]
+    assert ids("sort=price_desc") == [dollars, yen, euros]
+    assert ids("sort=price&min_price=120") == [yen, dollars]
+    page = client.get("/store/artworks?sort=price&limit=2").get_json()
+    rest = ids(f"sort=price&limit=2&cursor={page['next_cursor']}")
+    assert [a["id"] for a in page["data"]] + rest == [euros, yen, dollars]
+
+    result = app.test_cli_runner().invoke(
+        args=["set-exchange-rates", "XYZ=2"])
+    assert result.exit_code != 0
+
+    # Artworks created before the base rate existed are priced once the
+    # seeder creates it
+    ExchangeRate.query.filter_by(currency_id=2).delete()
+    Artwork.query.update({"price_base": None})
+    db.session.commit()
+    initialize_currencies(app, db)
+    db.session.expire_all()
+    assert db.session.get(Artwork, dollars).price_base == 150.0
+    assert db.session.get(Artwork, euros).price_base is None
+
+
+def test_search_artworks(client, auth_headers, create_artwork):
+    def artwork(title, description, category, tags):
+        return create_artwork({
+            "title": title,
+            "price": 100.0,
+            "currency_id": 1,
+            "stock": 5,
+            "description": description,
+            "category_name": category,
+            "tag_names": tags
+        })
+
+    sunset = artwork("Sunset over the sea", "Warm colors.", "Painting",
+                     ["nature"])
+    mountain = artwork("Mountain", "A sunset behind peaks.", "Photography",
+                       ["landscape"])
+    bronze = artwork("Bronze horse", "Cast metal.", "Sculpture", ["animal"])
+
+    # Title matches rank above description matches; prefixes match
+    r = client.get("/store/search?q=suns")
+    assert r.status_code == 200
+    assert [a["id"] for a in r.get_json()["data"]] == [sunset, mountain]
+
+    # Tags and categories are searchable, all words must match
+    r = client.get("/store/search?q=sculpt animal")
+    assert [a["id"] for a in r.get_json()["data"]] == [bronze]
+
+    # Updates are indexed incrementally
+    client.put(f"/artist/artwork/{bronze}", json={
+        "title": "Bronze horse",
+        "price": 100.0,
+        "currency_id": 1,
+        "stock": 5,
+        "description": "Cast metal at sunset.",
+        "category_name": "Sculpture",
+        "tag_names": ["animal"]
+    }, headers=auth_headers)
+    r = client.get("/store/search?q=sunset&limit=2")
+    data = r.get_json()
+    assert [a["id"] for a in data["data"]][0] == sunset
+    assert data["next_cursor"] is not None
+    r = client.get(f"/store/search?q=sunset&cursor={data['next_cursor']}")
+    assert len(r.get_json()["data"]) == 1
+    assert r.get_json()["next_cursor"] is None
+
+    client.delete(f"/artist/artwork/{sunset}", headers=auth_headers)
+    r = client.get("/store/search?q=sunset")
+    assert sunset not in [a["id"] for a in r.get_json()["data"]]
+
+    assert client.get("/store/search?q=%20").status_code == 400
+
+
+def test_rebuild_search_index_command(app, client, create_artwork):
+    artwork_id = create_artwork()
+    db.session.execute(db.text("DELETE FROM artwork_search"))
+    db.session.commit()
+    assert client.get("/store/search?q=default").get_json()["data"] == []
+
+    result = app.test_cli_runner().invoke(args=["rebuild-search-index"])
+    assert result.exit_code == 0
+    r = client.get("/store/search?q=default")
+    assert [a["id"] for a in r.get_json()["data"]] == [artwork_id]
+
+
 def test_get_single_artwork_not_found(client):
     response = client.get("/store/artworks/999")
     assert response.status_code == 404
@@ -38,6 +304,143 @@ def test_get_single_artwork_success(client, create_artwork):
     assert payload["title"] is not None
 
 
+def test_get_single_artwork_conditional(
+        client, auth_headers, create_artwork):
+    artwork_id = create_artwork()
+    r1 = client.get(f"/store/artworks/{artwork_id}")
+    assert r1.status_code == 200
+    etag = r1.headers["ETag"]
+    # comments_count is not tracked by any timestamp
+    assert "Last-Modified" not in r1.headers
+
+    r2 = client.get(
+        f"/store/artworks/{artwork_id}", headers={"If-None-Match": etag})
+    assert r2.status_code == 304
+    assert r2.data == b""
+    assert r2.headers["ETag"] == etag
+
+    r3 = client.get(
+        f"/store/artworks/{artwork_id}",
+        headers={"If-Modified-Since": "Fri, 01 Jan 2100 00:00:00 GMT"})
+    assert r3.status_code == 200
+
+    # An upvote changes the representation
+    client.post(f"/store/upvote/artwork/{artwork_id}", headers=auth_headers)
+    r4 = client.get(
+        f"/store/artworks/{artwork_id}", headers={"If-None-Match": etag})
+    assert r4.status_code == 200
+    assert r4.headers["ETag"] != etag
+    assert r4.get_json()["data"]["upvotes"] == 1
+
+
+def test_list_conditional(client, auth_headers, create_artwork):
+    artwork_id = create_artwork()
+    etag = client.get("/store/artworks").headers["ETag"]
+    assert client.get(
+        "/store/artworks", headers={"If-None-Match": etag}
+    ).status_code == 304
+
+    comments_url = f"/store/artworks/{artwork_id}/comments"
+    comments_etag = client.get(comments_url).headers["ETag"]
+    assert client.get(
+        comments_url, headers={"If-None-Match": comments_etag}
+    ).status_code == 304
+
+    client.post(
+        comments_url, json={"content": "Nice"}, headers=auth_headers)
+    r = client.get("/store/artworks", headers={"If-None-Match": etag})
+    assert r.status_code == 200
+    assert r.get_json()["data"][0]["comments_count"] == 1
+    r = client.get(comments_url, headers={"If-None-Match": comments_etag})
+    assert r.status_code == 200
+    assert len(r.get_json()["data"]) == 1
+
+    # Deleting a comment moves no timestamp, so only the ETag validates
+    assert "Last-Modified" not in r.headers
+    comments_etag = r.headers["ETag"]
+    comment_id = r.get_json()["data"][0]["id"]
+    client.delete(f"/store/comments/{comment_id}", headers=auth_headers)
+    r = client.get(comments_url, headers={"If-None-Match": comments_etag})
+    assert r.status_code == 200
+    assert r.get_json()["data"] == []
+
+
+def test_get_single_artwork_cached(
+        client, auth_headers, create_artwork, count_queries):
+    artwork_id = create_artwork()
+    cache = get_artwork_cache()
+    r1 = client.get(f"/store/artworks/{artwork_id}")
+    assert r1.headers["X-Cache"] == "MISS"
+    with count_queries() as statements:
+        r2 = client.get(f"/store/artworks/{artwork_id}")
+    assert r2.headers["X-Cache"] == "HIT"
+    assert r2.get_json() == r1.get_json()
+    assert not any("FROM tag" in s for s in statements)
+    assert cache.stats["hits"] == 1 and cache.stats["misses"] == 1
+
+    # Updating the artwork invalidates its entry
+    client.put(f"/artist/artwork/{artwork_id}", json={
+        "title": "Renamed",
+        "price": 10.0,
+        "currency_id": 1,
+        "stock": 1,
+        "description": "Updated.",
+        "category_name": "Default Category",
+        "tag_names": ["default"]
+    }, headers=auth_headers)
+    r3 = client.get(f"/store/artworks/{artwork_id}")
+    assert r3.headers["X-Cache"] == "MISS"
+    assert r3.get_json()["data"]["title"] == "Renamed"
+
+    # So does renaming a related tag
+    Tag.query.filter_by(title="default").one().title = "renamed-tag"
+    db.session.commit()
+    r4 = client.get(f"/store/artworks/{artwork_id}")
+    assert r4.headers["X-Cache"] == "MISS"
+    assert r4.get_json()["data"]["tags"][0]["title"] == "renamed-tag"
+
+    # Upvotes only change the counters, served outside the cached entry
+    client.post(f"/store/upvote/artwork/{artwork_id}", headers=auth_headers)
+    r5 = client.get(f"/store/artworks/{artwork_id}")
+    assert r5.headers["X-Cache"] == "HIT"
+    assert r5.get_json()["data"]["upvotes"] == 1
+
+
+class FakeRedis:
+    """Local stand-in for a redis-py client."""
+
+    def __init__(self):
+        self.store = {}
+
+    def get(self, key):
+        return self.store.get(key)
+
+    def set(self, key, value, ex=None):
+        self.store[key] = value.encode()
+
+    def delete(self, *keys):
+        for key in keys:
+            self.store.pop(key, None)
+
+    def scan_iter(self, match):
+        return [key for key in self.store if fnmatch(key, match)]
+
+
+def test_redis_artwork_cache_backend(app, client, create_artwork):
+    artwork_id = create_artwork()
+    redis = FakeRedis()
+    app.extensions["artwork_cache"] = ArtworkDetailCache(RedisBackend(redis))
+
+    client.get(f"/store/artworks/{artwork_id}")
+    assert f"artwork-cache:{artwork_id}" in redis.store
+    r = client.get(f"/store/artworks/{artwork_id}")
+    assert r.headers["X-Cache"] == "HIT"
+    assert r.get_json()["data"]["id"] == artwork_id
+
+    get_artwork_cache().invalidate()
+    assert redis.store == {}
+
+
 def test_upvote_artwork_unauthorized(client):
     # no auth header
     response = client.post("/store/upvote/artwork/1")
@@ -98,6 +501,89 @@ def test_upvotes_count(client, auth_headers, create_artwork):
     assert r1.get_json()["data"]["upvotes"] == 1
 
 
+def test_upvote_counter_is_denormalized(
+        client, auth_headers, general_auth_headers, create_artwork):
+    artwork_id = create_artwork()
+    client.post(f"/store/upvote/artwork/{artwork_id}", headers=auth_headers)
+    client.post(
+        f"/store/upvote/artwork/{artwork_id}", headers=general_auth_headers)
+    assert db.session.get(Artwork, artwork_id).upvote_count == 2
+    client.delete(f"/store/upvote/artwork/{artwork_id}", headers=auth_headers)
+    db.session.expire_all()
+    assert db.session.get(Artwork, artwork_id).upvote_count == 1
+
+
+def test_upvote_target_type_stored_as_integer(
+        client, auth_headers, create_artwork):
+    artwork_id = create_artwork()
+    client.post(f"/store/upvote/artwork/{artwork_id}", headers=auth_headers)
+    raw = db.session.execute(
+        db.text("SELECT target_type FROM upvote")).scalar_one()
+    assert raw == 1
+    assert Artwork.query.get(artwork_id).get_upvotes()[0].target_type == (
+        "artwork")
+
+
+def test_reconcile_upvotes_command(app, client, auth_headers, create_artwork):
+    artwork_id = create_artwork()
+    client.post(f"/store/upvote/artwork/{artwork_id}", headers=auth_headers)
+    # Simulate drift
+    Artwork.query.filter_by(id=artwork_id).update({"upvote_count": 7})
+    db.session.commit()
+
+    result = app.test_cli_runner().invoke(args=["reconcile-upvotes"])
+    assert result.exit_code == 0
+    assert "1 artwork(s)" in result.output
+    db.session.expire_all()
+    assert db.session.get(Artwork, artwork_id).upvote_count == 1
+    r = client.get(f"/store/upvote/artwork/{artwork_id}")
+    assert r.get_json()["data"]["upvotes"] == 1
+
+
+def test_hot_ranking(
+        app, client, auth_headers, general_auth_headers, create_artwork):
+    old, fresh, quiet = (create_artwork() for _ in range(3))
+    for headers in (auth_headers, general_auth_headers):
+        client.post(f"/store/upvote/artwork/{old}", headers=headers)
+    client.post(f"/store/upvote/artwork/{fresh}", headers=auth_headers)
+
+    def hot_ids(query=""):
+        response = client.get(f"/store/artworks?sort=hot{query}")
+        assert response.status_code == 200
+        return response.get_json()
+
+    assert [a["id"] for a in hot_ids()["data"]] == [old, fresh, quiet]
+
+    # Paginating the hot listing visits every artwork once
+    page = hot_ids("&limit=2")
+    rest = hot_ids(f"&limit=2&cursor={page['next_cursor']}")
+    assert [a["id"] for a in page["data"] + rest["data"]] == [
+        old, fresh, quiet]
+
+    # Once decayed, two day-old upvotes weigh less than a fresh one
+    Upvote.query.filter_by(target_id=old).update(
+        {"created_at": datetime.now(timezone.utc) - timedelta(days=2)})
+    db.session.commit()
+    result = app.test_cli_runner().invoke(args=["decay-hot-scores"])
+    assert result.exit_code == 0
+    assert "2 artwork(s)" in result.output
+    assert [a["id"] for a in hot_ids()["data"]] == [fresh, old, quiet]
+
+    client.delete(f"/store/upvote/artwork/{fresh}", headers=auth_headers)
+    db.session.expire_all()
+    assert db.session.get(ArtworkScore, fresh).score == pytest.approx(
+        0, abs=1e-3)
+
+    # Upvotes of a deleted artwork are left out of the next decay
+    client.delete(f"/artist/artwork/{old}", headers=auth_headers)
+    result = app.test_cli_runner().invoke(args=["decay-hot-scores"])
+    assert result.exit_code == 0
+    assert "0 artwork(s)" in result.output
+
+    response = client.get("/store/artworks?sort=top")
+    assert response.status_code == 400
+
+
 def test_add_comment(client, auth_headers, create_artwork):
     artwork_id = create_artwork()
     data = {
@@ -164,6 +650,64 @@ def test_reply_comment(
     assert r2.status_code == 201
 
 
+def test_comment_tree(
+        client, auth_headers, general_auth_headers, create_artwork,
+        count_queries):
+    artwork_id = create_artwork()
+
+    def comment(content, parent_id=None):
+        if parent_id is None:
+            r = client.post(
+                f"/store/artworks/{artwork_id}/comments",
+                json={"content": content},
+                headers=general_auth_headers)
+            return r.get_json()["comment_id"]
+        client.post(
+            f"/store/comments/{parent_id}",
+            json={"content": content},
+            headers=auth_headers)
+
+    first = comment("first")
+    second = comment("second")
+    comment("reply to first", parent_id=first)
+    client.post(f"/store/upvote/comment/{first}", headers=auth_headers)
+
+    with count_queries() as small_thread:
+        client.get(f"/store/artworks/{artwork_id}/comments")
+
+    # Grow the thread a few levels deep
+    for i in range(3):
+        comment(f"reply {i} to second", parent_id=second)
+    reply_ids = [
+        reply["id"] for reply in client.get(
+            f"/store/comments/{second}").get_json()["data"]]
+    comment("nested reply", parent_id=reply_ids[0])
+
+    with count_queries() as large_thread:
+        r = client.get(f"/store/artworks/{artwork_id}/comments")
+    assert len(small_thread) == len(large_thread)
+
+    assert r.status_code == 200
+    data = r.get_json()["data"]
+    assert [c["content"] for c in data] == ["second", "first"]
+    assert data[1]["upvotes"] == 1
+    assert [c["content"] for c in data[1]["replies"]] == ["reply to first"]
+    assert len(data[0]["replies"]) == 3
+    assert data[0]["replies"][0]["replies"][0]["content"] == "nested reply"
+
+    # Depth-limited thread
+    r = client.get(f"/store/artworks/{artwork_id}/comments?max_depth=0")
+    assert r.status_code == 200
+    assert all(c["replies"] == [] for c in r.get_json()["data"])
+    r = client.get(f"/store/artworks/{artwork_id}/comments?max_depth=1")
+    assert r.get_json()["data"][0]["replies"][0]["replies"] == []
+
+    for max_depth in ("-1", "deep", "\u00b2"):
+        r = client.get(
+            f"/store/artworks/{artwork_id}/comments?max_depth={max_depth}")
+        assert r.status_code == 400
+
+
 def test_delete_comment(
         client, create_artwork, general_auth_headers, auth_headers
 ):
@@ -258,3 +802,48 @@ def test_comment_upvotes_count(client, auth_headers, comment_artwork):
     r1 = client.get(f"/store/upvote/comment/{comment_id}")
     assert r1.status_code == 200
     assert r1.get_json()["data"]["upvotes"] == 1
+
+
+def test_json_encoders_agree(app, client, create_artwork):
+    for _ in range(3):
+        create_artwork()
+    fast = client.get("/store/artworks")
+    app.config["JSON_FAST_ENCODER"] = False
+    slow = client.get("/store/artworks")
+    assert fast.headers["Content-Type"] == "application/json"
+    assert json.loads(fast.data) == json.loads(slow.data)
+
+    payload = {
+        1: Decimal("9.50"),
+        "at": datetime(2025, 1, 2, 3, 4, 5, tzinfo=timezone.utc),
+    }
+    expected = {"1": 9.5, "at": "2025-01-02T03:04:05+00:00"}
+    with app.app_context():
+        assert json.loads(dumps_stdlib(payload)) == expected
+        if orjson is not None:
+            assert json.loads(dumps_orjson(payload)) == expected
+
+
+def test_export_artworks(app, client, create_artwork):
+    app.config["CATALOG_EXPORT_CHUNK_SIZE"] = 2
+    artwork_ids = [create_artwork() for _ in range(5)]
+
+    response = client.get("/store/artworks/export")
+    assert response.status_code == 200
+    assert response.mimetype == "application/x-ndjson"
+    lines = [json.loads(line) for line in response.data.splitlines()]
+    assert [item["id"] for item in lines] == artwork_ids
+    assert lines[0]["category"]["title"] == "Default Category"
+    assert {t["title"] for t in lines[-1]["tags"]} == {"default", "tag"}
+
+    # Resume after the last received artwork, compressed
+    response = client.get(
+        f"/store/artworks/export?after_id={artwork_ids[2]}",
+        headers={"Accept-Encoding": "gzip"})
+    assert response.headers["Content-Encoding"] == "gzip"
+    lines = gzip.decompress(response.data).splitlines()
+    assert [json.loads(line)["id"] for line in lines] == artwork_ids[3:]
+
+    for after_id in ("last", "-1", "\u00b2"):
+        response = client.get(f"/store/artworks/export?after_id={after_id}")
+        assert response.status_code == 400